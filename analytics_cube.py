@@ -0,0 +1,110 @@
+"""
+analytics_cube.py — Materialized rework / QC aggregates over Projects
+=====================================================================
+One cube per process, kept as additive sums so charts never re-scan the
+table:
+
+  cells[dimension] — per value of Designer / BU / Complexity / Month / QC:
+                     Projects, TotalAssets, TotalGDRework, TotalPOCRework, InQC
+
+Rates (GD% = TotalGDRework / TotalAssets) are taken from the sums when read.
+The cube remembers each row's contribution (RowID → UpdatedAt + dimension
+values + measures), so changing a row is "subtract old, add new":
+
+  apply(rows)    — submit_project / update_project, right after the commit
+  remove(ids)    — delete_project
+  sync(df)       — a new cached frame (e.g. another worker wrote): only rows
+                   whose UpdatedAt differs, or that appeared / disappeared,
+                   move; an unchanged frame is a no-op.
+"""
+
+import threading
+
+import numpy as np
+import pandas as pd
+
+DIMENSIONS = {"Designer": "DesignerAssigned", "BU": "BU", "Complexity": "Complexity",
+    "Month": "AssignedDate", "QC": "QCReviewer"}
+MEASURES = ["Projects", "TotalAssets", "TotalGDRework", "TotalPOCRework", "InQC"]
+_TOTALS = ["TotalAssets", "TotalGDRework", "TotalPOCRework"]
+
+
+def facts(df):
+    """Per project: RowIDs, UpdatedAt stamps, dimension values (n × dims), measures (n × MEASURES)."""
+    n = len(df)
+    text = lambda col: df[col].fillna("").astype(str).str.strip() if col in df.columns else pd.Series([""] * n)
+    dims = np.empty((n, len(DIMENSIONS)), dtype=object)
+    for j, (dim, col) in enumerate(DIMENSIONS.items()):
+        dims[:, j] = (text(col).str[:7] if dim == "Month" else text(col)).to_numpy(dtype=object)
+    measures = np.zeros((n, len(MEASURES)))
+    measures[:, 0] = 1
+    for j, col in enumerate(_TOTALS, 1):
+        if col in df.columns:
+            measures[:, j] = pd.to_numeric(df[col], errors="coerce").fillna(0).to_numpy(dtype=float)
+    measures[:, 4] = (text("InternalStatus").str.upper() == "MOVE TO QC").to_numpy(dtype=float)
+    return text("RowID").tolist(), text("UpdatedAt").tolist(), dims, measures
+
+
+class Cube:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._rows = {}   # RowID -> (UpdatedAt, dimension values, measures) as contributed
+        self._cells = {dim: {} for dim in DIMENSIONS}   # dim -> value -> measure sums
+        self._frame = None
+
+    def _shift(self, dims, measures, sign):
+        for j, dim in enumerate(DIMENSIONS):
+            values, inverse = np.unique(dims[:, j].astype(str), return_inverse=True)
+            sums = np.zeros((len(values), len(MEASURES)))
+            np.add.at(sums, inverse.ravel(), measures)
+            cells = self._cells[dim]
+            for value, delta in zip(values, sums):
+                if not value:
+                    continue
+                cell = cells.get(value, 0) + sign * delta
+                if cell[0] > 0: cells[value] = cell
+                else: cells.pop(value, None)
+
+    def _move(self, ids, stamps, dims, measures, gone=()):
+        """Replace the contribution of ids (and drop gone) — lock held."""
+        old = [self._rows.pop(rid) for rid in [*ids, *gone] if rid in self._rows]
+        if old:
+            self._shift(np.array([o[1] for o in old], dtype=object), np.array([o[2] for o in old]), -1)
+        if len(ids):
+            self._shift(dims, measures, 1)
+            self._rows.update(zip(ids, zip(stamps, dims, measures)))
+
+    def apply(self, rows):
+        """Rows just written (list of dicts or a frame), full rows incl. RowID / UpdatedAt."""
+        with self._lock:
+            self._move(*facts(pd.DataFrame(rows)))
+
+    def remove(self, row_ids):
+        with self._lock:
+            self._move([], [], None, None, row_ids)
+
+    def sync(self, df):
+        """Catch up with a (new) cached Projects frame."""
+        with self._lock:
+            if df is self._frame:
+                return
+            ids = df["RowID"].astype(str).tolist() if "RowID" in df.columns else []
+            stamps = df["UpdatedAt"].astype(str).tolist() if "UpdatedAt" in df.columns else [""] * len(ids)
+            changed = [i for i, (rid, ts) in enumerate(zip(ids, stamps)) if self._rows.get(rid, ("\0",))[0] != ts]
+            gone = self._rows.keys() - set(ids)
+            if changed or gone:
+                self._move(*facts(df.iloc[changed]), gone)
+            self._frame = df
+
+    def view(self, dim):
+        """Sums per value of dim plus GDReworkPct / POCReworkPct, sorted by value."""
+        with self._lock:
+            cells = dict(self._cells[dim])
+        view = pd.DataFrame(list(cells.values()), index=list(cells), columns=MEASURES).sort_index()
+        assets = view["TotalAssets"].where(view["TotalAssets"] > 0)
+        view["GDReworkPct"] = (view["TotalGDRework"] / assets * 100).round(1).fillna(0)
+        view["POCReworkPct"] = (view["TotalPOCRework"] / assets * 100).round(1).fillna(0)
+        return view
+
+
+cube = Cube()
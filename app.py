@@ -7,24 +7,187 @@ Security: User identity from Posit Connect header + AD group check + RLS
 """
 
 import os
+import gzip
+import functools
 import json
+import time
+import tempfile
+import threading
+import traceback
+import uuid
 import dash
-from dash import dcc, html, dash_table, Input, Output, State, callback, ctx, ALL
+from dash import dcc, html, dash_table, Input, Output, State, callback, ctx, ALL, DiskcacheManager
+from dash import clientside_callback, ClientsideFunction, Patch
+import diskcache
 import dash_bootstrap_components as dbc
+import plotly.graph_objects as go
 import pandas as pd
 from datetime import date, datetime, timedelta
 import calendar
 
 from db_operations import (
-    get_all_projects, submit_project, update_project, delete_project,
-    get_all_resources, get_all_resources_unfiltered, submit_resource, delete_resource,
+    get_all_projects, search_projects, submit_project, update_project, delete_project,
+    get_all_resources_unfiltered, submit_resource, delete_resource,
     get_dropdown_options, get_lookup_values, save_lookup_values,
-    get_all_lookup_fields, clear_cache, REVIEWER_EMAILS,
+    get_all_lookup_fields, REVIEWER_EMAILS,
     is_admin, get_current_user, get_user_display_name, check_ad_group,
+    get_resources_by_date, get_export_frame, get_lookup_options,
+    data_version, RESOURCE_TABLE, CACHE_TTL, get_project_analytics,
+    project_changes, cached_version, get_tables, PROJECTS_TABLE, LOOKUPS_TABLE,
 )
+from exports import EXPORT_WRITERS, EXPORT_MIMETYPES
+import metrics
+import profiling
+
+# ── Background callbacks ──────────────────────────────────────────────
+# Writes and the manager report run in job processes instead of the request,
+# so a slow OneLake write or a big month never hits the gunicorn timeout.
+# The diskcache directory is shared by all workers on the host.
+#   job_manager    → writes; results are handed over once, never cached
+#   report_manager → manager report; rendered summaries memoized by callback
+#                    inputs (year, month, filters) + ResourceUtilization data
+#                    version, in an LRU bounded by REPORT_CACHE_MB. A hit starts
+#                    no job at all, so flipping back to a month is one poll.
+#                    submit_resource / delete_resource bump the data version
+#                    (clear_cache), which retires every older entry.
+BACKGROUND_CACHE_DIR = os.getenv("BACKGROUND_CACHE_DIR", os.path.join(tempfile.gettempdir(), "mcut-jobs"))
+REPORT_CACHE_MB = int(os.getenv("REPORT_CACHE_MB", "64"))
+# Jobs run in JOB_WORKERS long-lived processes per gunicorn worker, started
+# from a forkserver (deltalake's tokio runtime panics in a fork of a process
+# that has already used it, and a threaded worker is unsafe to fork). Like a
+# gunicorn worker they keep their token and table cache between jobs, with
+# the refreshers running, so a job pays no cold reads or token fetch.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+_job_pool = None
+
+
+class _JobPool:
+    """JOB_WORKERS job processes fed from one queue; dead ones are replaced on submit."""
+
+    def __init__(self, size):
+        import multiprocess
+        self.ctx = multiprocess.get_context("forkserver")
+        self.ctx.set_forkserver_preload([__name__])
+        self.size, self.queue, self.procs = size, self.ctx.Queue(), []
+        self.pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def fill(self):
+        with self._lock:
+            self.procs = [p for p in self.procs if p.is_alive()]
+            while len(self.procs) < self.size:
+                p = self.ctx.Process(target=_job_worker, args=(self.queue,), name="dash-job", daemon=True)
+                p.start()
+                self.procs.append(p)
+
+    def submit(self, *job):
+        self.fill()
+        self.queue.put(job)
+
+
+def start_job_workers():
+    """Start this process's job workers (gunicorn.conf.py post_fork), so they warm before the first job."""
+    global _job_pool
+    if _job_pool is None or _job_pool.pid != os.getpid():
+        _job_pool = _JobPool(JOB_WORKERS)
+    _job_pool.fill()
+    return _job_pool
+
+
+def _job_worker(queue):
+    """A pooled job process: warm up like a gunicorn worker, then run jobs as they come."""
+    from db_connection import start_token_refresher
+    from db_operations import start_cache_refresher
+    from queue import Empty
+    start_token_refresher()
+    start_cache_refresher()
+    metrics.start_flusher()
+    parent = os.getppid()  # the forkserver, which exits with its gunicorn worker
+    while True:
+        try: manager, job, key, job_fn, args, context, profile = queue.get(timeout=5)
+        except Empty:
+            if os.getppid() != parent: return
+            continue
+        manager = globals()[manager]
+        record = f"job-{job}"
+        with manager.handle.transact():
+            if manager.handle.get(record) is None:
+                continue  # cancelled while queued
+            manager.handle.set(record, (os.getpid(), key))
+        prof = profiling.Profile() if profile else None
+        if prof is not None and not prof.start():
+            prof = None
+        try:
+            job_fn(key, manager._make_progress_key(key), args, context)
+        except Exception:  # dash stores callback errors itself; anything else must not end the worker
+            traceback.print_exc()
+        finally:
+            if prof is not None:
+                prof.finish(f"{profile}_job")
+            manager.handle.delete(record)
+            metrics.flush()  # its writes show on /metrics now, not at the next tick
+
+
+class ForkServerManager(DiskcacheManager):
+    """DiskcacheManager whose jobs run in the warm job workers (_JobPool).
+    A job id is a token; its record in the cache is 0 while queued and
+    (pid, key) while a worker runs it. Cancelling a running job kills its worker.
+    Overrides and uses DiskcacheManager internals (call_job_fn, job_running,
+    terminate_job, _make_progress_key, handle) as of dash 4.4 — hence the
+    dash[diskcache]>=4.4,<4.5 pin in requirements.txt; recheck on upgrade."""
+
+    def __init__(self, cache, name, **kwargs):
+        super().__init__(cache, **kwargs)
+        self.name = name
+
+    def call_job_fn(self, key, job_fn, args, context):
+        from flask import g
+        if self.cache_by is not None:
+            hit = self.result_ready(key)
+            metrics.inc("report_cache_requests_total", result="hit" if hit else "miss")
+            if hit:
+                return 0  # no job; the first poll reads the memoized result
+        job = uuid.uuid4().hex
+        self.handle.set(f"job-{job}", 0)
+        profile = _callback_name() if "profile" in g else None  # the job body is profiled too
+        start_job_workers().submit(self.name, job, key, job_fn, args, context, profile)
+        return job
+
+    def job_running(self, job):
+        import psutil
+        state = self.handle.get(f"job-{job}") if job else None
+        return state == 0 or (state is not None and psutil.pid_exists(state[0]))
+
+    def terminate_job(self, job):
+        import psutil
+        if not job:
+            return
+        state = self.handle.pop(f"job-{job}", None)
+        if state and not self.result_ready(state[1]):  # still running (not just finishing)
+            try:
+                proc = psutil.Process(state[0])
+                proc.kill()
+                proc.wait(1)
+            except (psutil.NoSuchProcess, psutil.TimeoutExpired):
+                pass
+
+    def terminate_unhealthy_job(self, job):
+        return False  # job workers outlive their jobs
+
+
+job_manager = ForkServerManager(diskcache.Cache(os.path.join(BACKGROUND_CACHE_DIR, "jobs")), "job_manager")
+report_manager = ForkServerManager(diskcache.Cache(os.path.join(BACKGROUND_CACHE_DIR, "reports"),
+        eviction_policy="least-recently-used", size_limit=REPORT_CACHE_MB * 2**20), "report_manager",
+    cache_by=[lambda: data_version(RESOURCE_TABLE)], expire=CACHE_TTL)
+
+
+def bg_write(button, progress_id):
+    """Background-callback kwargs for a write: button disabled and a status line while the job runs."""
+    return dict(background=True, manager=job_manager, interval=500, progress=Output(progress_id, "children"),
+        running=[(Output(button, "disabled"), True, False), (Output(progress_id, "style"), None, {"display": "none"})])
 
 app = dash.Dash(__name__, external_stylesheets=[dbc.themes.FLATLY, dbc.icons.FONT_AWESOME],
-    suppress_callback_exceptions=True, title="Medical Creatives UT")
+    suppress_callback_exceptions=True, title="Medical Creatives UT", background_callback_manager=job_manager)
 server = app.server
 
 # ═══════════════════════════════════════════════════════════════════════
@@ -35,6 +198,7 @@ server = app.server
 # Leave empty to skip AD group check.
 
 _auth_cache = {}  # Cache AD checks to avoid calling adquery on every request
+_auth_locks = {}  # cache key -> Lock; concurrent first requests share one adquery
 
 @server.before_request
 def enforce_ad_group():
@@ -58,18 +222,15 @@ def enforce_ad_group():
 
     # Cache the result for 5 minutes per user
     cache_key = f"{user_id}:{required_group}"
-    now = datetime.now().timestamp()
-    if cache_key in _auth_cache:
-        result, ts = _auth_cache[cache_key]
-        if now - ts < 300:  # 5 min cache
-            if result:
-                return
-            else:
-                return Response(ACCESS_DENIED_HTML, status=403, content_type="text/html")
-
-    # Check AD group
-    authorized = check_ad_group(user_id, required_group)
-    _auth_cache[cache_key] = (authorized, now)
+    with _auth_locks.setdefault(cache_key, threading.Lock()):
+        now = datetime.now().timestamp()
+        cached = _auth_cache.get(cache_key)
+        if cached and now - cached[1] < 300:  # 5 min cache
+            authorized = cached[0]
+        else:
+            # Check AD group
+            authorized = check_ad_group(user_id, required_group)
+            _auth_cache[cache_key] = (authorized, now)
 
     if not authorized:
         return Response(ACCESS_DENIED_HTML, status=403, content_type="text/html")
@@ -87,6 +248,165 @@ ACCESS_DENIED_HTML = """
 </div></body></html>
 """
 
+# ═══════════════════════════════════════════════════════════════════════
+#  EXPORT: streamed CSV / Parquet download of the filtered views
+# ═══════════════════════════════════════════════════════════════════════
+# /export/projects.csv?q=&BU=…&InternalStatus=…          → Project Summary search + facets (RLS applied)
+# /export/resources.parquet?year=2025&month=3&designer=&bu=  → Manager View filters
+# Goes through enforce_ad_group like every other request.
+
+@server.route("/export/<view>.<fmt>")
+def export_view(view, fmt):
+    from flask import request, Response, abort, stream_with_context
+    if view not in ("projects", "resources") or fmt not in EXPORT_WRITERS:
+        abort(404)
+    args = request.args
+    try:
+        year = int(args["year"]) if args.get("year") else None
+        month = int(args["month"]) if args.get("month") else None
+    except ValueError:
+        abort(400)
+    facets = {f: args.getlist(f) for f in PROJECT_FACETS if args.getlist(f)}
+    df = get_export_frame(view, year, month, args.get("designer") or None, args.get("bu") or None,
+        args.get("q", ""), facets)
+    stem = view if not (year and month) else f"{view}_{year}-{month:02d}"
+    return Response(stream_with_context(EXPORT_WRITERS[fmt](df)), mimetype=EXPORT_MIMETYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{stem}.{fmt}"'})
+
+
+def export_href(view, fmt, **params):
+    from urllib.parse import urlencode
+    q = urlencode({k: v for k, v in params.items() if v}, doseq=True)
+    return app.get_relative_path(f"/export/{view}.{fmt}") + (f"?{q}" if q else "")
+
+
+# ═══════════════════════════════════════════════════════════════════════
+#  METRICS: callback timings + /metrics (Prometheus text, all workers)
+# ═══════════════════════════════════════════════════════════════════════
+# Timed around the whole /_dash-update-component request so JSON
+# serialization of the figure / table payload is part of the number.
+
+@server.before_request
+def _start_callback_timer():
+    from flask import request, g
+    if request.path.endswith("/_dash-update-component"):
+        g.cb_started = time.perf_counter()
+
+
+def _callback_name():
+    """Name of the callback function the current /_dash-update-component request runs."""
+    from flask import request
+    body = request.get_json(silent=True) or {}
+    cb = app.callback_map.get(body.get("output", ""), {}).get("callback")
+    return getattr(cb, "__name__", "unknown")
+
+
+@server.after_request
+def _record_callback(response):
+    from flask import request, g
+    started = g.pop("cb_started", None)
+    if started is None:
+        return response
+    name = _callback_name()
+    metrics.observe("dash_callback_seconds", time.perf_counter() - started, callback=name)
+    metrics.inc("dash_callback_response_bytes_total", response.calculate_content_length() or 0, callback=name)
+    if response.status_code >= 500:
+        metrics.inc("dash_callback_errors_total", callback=name)
+    return response
+
+
+@server.route("/metrics")
+def metrics_view():
+    from flask import Response
+    return Response(metrics.render(), mimetype="text/plain; version=0.0.4")
+
+
+# ── Compression ───────────────────────────────────────────────────────
+# Store payloads (table rows, option lists) are repetitive JSON that gzip
+# shrinks several-fold. Registered after _record_callback, so it runs first
+# and dash_callback_response_bytes_total counts bytes on the wire.
+GZIP_MIN_BYTES = int(os.getenv("GZIP_MIN_BYTES", "1024"))
+_GZIP_PATHS = ("/_dash-update-component", "/_dash-layout", "/_dash-dependencies")
+
+@server.after_request
+def _gzip_response(response):
+    from flask import request
+    if (response.status_code != 200 or response.direct_passthrough or "Content-Encoding" in response.headers
+            or not request.path.endswith(_GZIP_PATHS) or "gzip" not in request.headers.get("Accept-Encoding", "")):
+        return response
+    data = response.get_data()
+    if len(data) < GZIP_MIN_BYTES:
+        return response
+    response.set_data(gzip.compress(data, compresslevel=5))
+    response.headers["Content-Encoding"] = "gzip"
+    response.vary.add("Accept-Encoding")
+    return response
+
+
+# ═══════════════════════════════════════════════════════════════════════
+#  PROFILING: opt-in per-callback profiles + admin page
+# ═══════════════════════════════════════════════════════════════════════
+# PROFILE_CALLBACKS=1 profiles every callback; otherwise an admin opens the
+# app with ?profile=1 and only their own callbacks are profiled (cookie).
+# /profiling lists the slowest recent ones — see profiling.py.
+
+@server.before_request
+def _start_profile():
+    from flask import request, g
+    flag = request.args.get("profile")
+    if flag in ("0", "1") and is_admin():
+        g.profile_cookie = flag
+    if not request.path.endswith("/_dash-update-component"):
+        return
+    if profiling.PROFILE_CALLBACKS or (request.cookies.get(profiling.PROFILE_COOKIE) == "1" and is_admin()):
+        prof = profiling.Profile()
+        if prof.start():
+            g.profile = prof
+
+
+@server.after_request
+def _save_profile(response):
+    from flask import g
+    prof = g.pop("profile", None)
+    if prof is not None:
+        prof.finish(_callback_name())
+    flag = g.pop("profile_cookie", None)
+    if flag == "1":
+        response.set_cookie(profiling.PROFILE_COOKIE, "1", max_age=8 * 3600, httponly=True, samesite="Lax")
+    elif flag == "0":
+        response.delete_cookie(profiling.PROFILE_COOKIE)
+    return response
+
+
+@server.route("/profiling")
+@server.route("/profiling/<name>")
+def profiling_view(name=None):
+    from flask import request, abort, send_file
+    from html import escape
+    if not is_admin():
+        abort(403)
+    if name:
+        path = profiling.profile_path(name)
+        if path is None:
+            abort(404)
+        if request.args.get("download"):
+            return send_file(path, as_attachment=True)
+        return (f'<p><a href="?download=1">download {escape(name)}</a></p>'
+                f"<pre>{escape(profiling.summary(path))}</pre>")
+    rows = "".join(
+        f'<tr><td>{datetime.fromtimestamp(p["ts"]):%Y-%m-%d %H:%M:%S}</td><td>{escape(p["callback"])}</td>'
+        f'<td style="text-align:right">{p["ms"]}</td><td>{p["kind"]}</td>'
+        f'<td><a href="{app.get_relative_path("/profiling/" + p["file"])}">view</a></td></tr>'
+        for p in profiling.slowest())
+    state = "on for all callbacks" if profiling.PROFILE_CALLBACKS else (
+        "on for your session" if request.cookies.get(profiling.PROFILE_COOKIE) == "1" else "off")
+    return (f"<h3>Slowest profiled callbacks</h3><p>Profiling {state} "
+            f'(<a href="?profile=1">enable</a> / <a href="?profile=0">disable</a> for your session) — '
+            f"mode {profiling.PROFILE_MODE}, last {profiling.PROFILE_KEEP} kept in {escape(profiling.PROFILE_DIR)}</p>"
+            f'<table border="1" cellpadding="4" style="border-collapse:collapse;font-family:monospace">'
+            f"<tr><th>when</th><th>callback</th><th>ms</th><th>kind</th><th></th></tr>{rows}</table>")
+
+
 C = {"primary": "#1E2761", "accent": "#3B82F6", "success": "#10B981",
     "danger": "#EF4444", "bg": "#F8FAFC", "text": "#1E293B", "muted": "#64748B"}
 TH = {"backgroundColor": C["primary"], "color": "white", "fontWeight": "bold", "fontSize": "11px"}
@@ -104,10 +424,18 @@ def mi(fid, t="text", ph="", v=""):
 def mdt(fid):
     return dcc.DatePickerSingle(id=fid, date=None, display_format="YYYY-MM-DD", className="w-100")
 
+def job_progress(pid):
+    """Status line a background write reports into while its job runs."""
+    return html.Small(id=pid, className="text-muted fst-italic")
+
 def section_header(title, color=C["accent"]):
     return html.H6(title, className="mt-3 mb-2 py-1 px-2 text-white small fw-bold",
         style={"backgroundColor": color, "borderRadius": "4px"})
 
+def tab_shown(tab):
+    """Marker store inside a tab's content, bumped by ui.showTab each time the tab is shown again."""
+    return {"type": "tab-shown", "index": tab}
+
 
 # ═══════════════════════════════════════════════════════════════════════
 #  TAB 1: PROJECT SUMMARY (80 columns from MDCL)
@@ -133,16 +461,32 @@ def revision_group(prefix, label, show_smcd=True):
     ]), className="mb-2", style={"backgroundColor": "#F8FAFC"})
 
 
+PROJECT_FACETS = {"BU": "BU", "InternalStatus": "Status", "DesignerAssigned": "Designer",
+    "QCReviewer": "QC Reviewer", "Complexity": "Complexity"}
+
 def tab_project_summary():
     return dbc.Container([
         dbc.Row([
             dbc.Col(html.H4("Project Summary", className="text-primary fw-bold"), md=6),
             dbc.Col([
                 dbc.Button([html.I(className="fas fa-plus me-1"), "New Project"], id="proj-new-btn", color="success", size="sm", className="me-2"),
-                dbc.Button([html.I(className="fas fa-sync me-1"), "Refresh"], id="proj-refresh-btn", color="secondary", size="sm", outline=True),
+                dbc.Button([html.I(className="fas fa-sync me-1"), "Refresh"], id="proj-refresh-btn", color="secondary", size="sm", outline=True, className="me-2"),
+                dbc.ButtonGroup([
+                    dbc.Button([html.I(className="fas fa-file-csv me-1"), "CSV"], id="proj-export-csv",
+                        href=export_href("projects", "csv"), external_link=True, color="secondary", size="sm", outline=True),
+                    dbc.Button([html.I(className="fas fa-download me-1"), "Parquet"], id="proj-export-parquet",
+                        href=export_href("projects", "parquet"), external_link=True, color="secondary", size="sm", outline=True),
+                ]),
             ], md=6, className="text-end"),
         ], className="mb-3 align-items-center"),
 
+        # Search + facet filters (search_index) — typing filters as you go
+        dbc.Row([
+            dbc.Col(dbc.Input(id="proj-search", type="search", size="sm", debounce=0.3,
+                placeholder="Search name, Project ID, Veeva ID, comments…"), md=3),
+        ] + [dbc.Col(dcc.Dropdown(id=f"proj-facet-{f}", multi=True, placeholder=label, className="small"), md=True)
+            for f, label in PROJECT_FACETS.items()], className="mb-2 g-2"),
+
         dbc.Collapse(dbc.Card(dbc.CardBody([
             html.H5("Add New Project", className="mb-3 text-primary"),
 
@@ -203,18 +547,22 @@ def tab_project_summary():
             dbc.Row([
                 dbc.Col(dbc.Button("Submit", id="proj-submit-btn", color="primary", className="me-2"), width="auto"),
                 dbc.Col(dbc.Button("Cancel", id="proj-cancel-btn", color="secondary", outline=True), width="auto"),
-                dbc.Col(html.Div(id="proj-submit-msg"), className="align-self-center"),
+                dbc.Col([html.Div(id="proj-submit-msg"), job_progress("proj-submit-progress")], className="align-self-center"),
             ]),
         ]), className="shadow-sm mb-3"), id="proj-form-collapse", is_open=False),
 
         html.Div(id="proj-table-container"),
+        dcc.Store(id="proj-store"), dcc.Store(id="proj-sync"), dcc.Store(id="proj-view"),
+        dcc.Store(id="proj-lookup-store"), dcc.Store(id="proj-lookup-sync"),
 
         # View/Edit Modal
         dbc.Modal([dbc.ModalHeader(dbc.ModalTitle(id="proj-modal-title")), dbc.ModalBody(id="proj-modal-body"),
             dbc.ModalFooter([dbc.Button("Save Changes", id="proj-modal-save", color="primary", className="me-2", style={"display": "none"}),
                 dbc.Button("Close", id="proj-modal-close", color="secondary")])],
             id="proj-modal", size="xl", scrollable=True, is_open=False),
-        dcc.Store(id="proj-selected-row-id"), dcc.Store(id="proj-modal-mode"), html.Div(id="proj-delete-msg"),
+        dcc.Store(id="proj-selected-row-id"), dcc.Store(id="proj-modal-mode"), dcc.Store(id="proj-edit-base"),
+        html.Div(id="proj-delete-msg"),
+        job_progress("proj-edit-progress"), job_progress("proj-delete-progress"),
 
         # Delete Confirmation
         dbc.Modal([dbc.ModalHeader(dbc.ModalTitle("Confirm Delete")),
@@ -227,11 +575,18 @@ def tab_project_summary():
 
 
 # ── Project Callbacks ─────────────────────────────────────────────────
-@callback(Output("proj-form-collapse", "is_open"),
+# Pure UI state runs in the browser (assets/ui.js) — no round trip, no worker slot
+clientside_callback(ClientsideFunction("ui", "openProjectForm"), Output("proj-form-collapse", "is_open"),
     [Input("proj-new-btn", "n_clicks"), Input("proj-cancel-btn", "n_clicks"), Input("proj-submit-btn", "n_clicks")],
-    State("proj-form-collapse", "is_open"), prevent_initial_call=True)
-def toggle_pf(n1, n2, n3, o):
-    return True if ctx.triggered_id == "proj-new-btn" else False
+    prevent_initial_call=True)
+
+# Live preview of the totals _calc_project_totals saves
+_REV_RANGE = range(1, 12)
+clientside_callback(ClientsideFunction("ui", "projectTotals"),
+    [Output("proj-gd-pct", "value"), Output("proj-poc-pct", "value"), Output("proj-total-assets", "value"),
+     Output("proj-total-gd", "value"), Output("proj-total-poc", "value")],
+    [Input("proj-r1-asset", "value")] + [Input(f"proj-r{i}-{k}", "value") for k in ("total", "gd", "poc") for i in _REV_RANGE],
+    prevent_initial_call=True)
 
 
 # Build all State fields for project form
@@ -287,8 +642,9 @@ _proj_clear_outputs = [
 _proj_empty = [None, '', None, '', '', None, None, '', None, None, None, None, None, '', None, '', None, None, None, None, None, None, None, ''] + [''] * 55
 
 @callback([Output("proj-submit-msg", "children"), Output("proj-table-container", "children", allow_duplicate=True)] + _proj_clear_outputs,
-    Input("proj-submit-btn", "n_clicks"), _proj_states, prevent_initial_call=True)
-def submit_p(n, ad, name, bu, pid, vid, pt, media, ps, tactic, status, pf, assigner, designer, qc, mail, qce,
+    Input("proj-submit-btn", "n_clicks"), _proj_states, prevent_initial_call=True,
+    **bg_write("proj-submit-btn", "proj-submit-progress"))
+def submit_p(set_progress, n, ad, name, bu, pid, vid, pt, media, ps, tactic, status, pf, assigner, designer, qc, mail, qce,
     stage, sh, comp, cs, r1, r2, r3, comments, r1_asset,
     r1s, r1m, r1c, r1d, r1t, r1g, r1p, r2s, r2m, r2c, r2d, r2t, r2g, r2p,
     r3s, r3m, r3c, r3d, r3t, r3g, r3p, r4s, r4m, r4c, r4d, r4t, r4g, r4p,
@@ -315,42 +671,60 @@ def submit_p(n, ad, name, bu, pid, vid, pt, media, ps, tactic, status, pf, assig
         "R10_Total": r10t, "R10_GDRework": r10g, "R10_POCRework": r10p,
         "R11_Total": r11t, "R11_GDRework": r11g, "R11_POCRework": r11p,
     }
+    set_progress("Saving project…")
     r = submit_project(data)
-    color = "success" if r["status"] == "success" else "danger"
+    color = {"success": "success", "pending": "warning"}.get(r["status"], "danger")
     msg = dbc.Alert(r["message"] + " Click Refresh to see changes.", color=color, duration=6000)
     table_msg = dbc.Alert("Project saved! Click Refresh.", color="success", duration=5000)
     return [msg, table_msg] + _proj_empty
 
 
-@callback(Output("proj-table-container", "children"),
-    [Input("proj-refresh-btn", "n_clicks"), Input("tabs", "active_tab")])
-def refresh_pt(n, tab):
-    if tab != "tab-projects" and not n: return dash.no_update
-    return build_pt()
-
-def build_pt():
-    df = get_all_projects(force=True)
-    if df.empty: return dbc.Alert("No projects yet.", color="info")
-    rows = []
-    for _, row in df.iterrows():
-        rid = row.get("RowID", "")
-        rows.append(html.Tr([
-            html.Td(str(row.get("ProjectName", ""))[:40], className="small"),
-            html.Td(row.get("BU", ""), className="small"),
-            html.Td(row.get("InternalStatus", ""), className="small"),
-            html.Td(row.get("Complexity", ""), className="small"),
-            html.Td(row.get("DesignerAssigned", ""), className="small"),
-            html.Td(row.get("QCReviewer", ""), className="small"),
-            html.Td(str(row.get("AssignedDate", ""))[:10], className="small"),
-            html.Td([
-                dbc.Button([html.I(className="fas fa-eye")], id={"type": "proj-view-btn", "index": rid}, color="info", size="sm", className="me-1"),
-                dbc.Button([html.I(className="fas fa-edit")], id={"type": "proj-edit-btn", "index": rid}, color="warning", size="sm", className="me-1"),
-                dbc.Button([html.I(className="fas fa-trash")], id={"type": "proj-del-btn", "index": rid}, color="danger", size="sm", outline=True),
-            ], className="text-nowrap"),
-        ]))
-    return dbc.Table([
-        html.Thead(html.Tr([html.Th(c, style=TH) for c in ["Project Name", "BU", "Status", "Complexity", "Designer", "QC Reviewer", "Date", "Actions"]])),
-        html.Tbody(rows)], bordered=True, hover=True, responsive=True, size="sm", className="mt-2")
+# ── Projects table: rows synced into proj-store, rendered in the browser ──
+# proj-store  {"rows": {RowID: [name, BU, status, complexity, designer, QC, date]}}
+# proj-sync   {"version", "user"} of the rows the browser holds (small — the
+#             only part sent back); unchanged → nothing sent, else a Patch
+# proj-view   the search box / facet result: {"ids": [RowID…]}, ids None for all
+# assets/render.js (mcut.projectTable) turns store + view into the table.
+PT_COLUMNS = ["ProjectName", "BU", "InternalStatus", "Complexity", "DesignerAssigned", "QCReviewer", "AssignedDate"]
+
+def _pt_rows(df):
+    """RowID → display cells, as in the table (name cut to 40, date to 10 chars)."""
+    if "RowID" not in df.columns: return {}
+    cells = pd.DataFrame({c: df[c].fillna("").astype(str) if c in df.columns else "" for c in PT_COLUMNS}, index=df.index)
+    cells["ProjectName"] = cells["ProjectName"].str[:40]
+    cells["AssignedDate"] = cells["AssignedDate"].str[:10]
+    return dict(zip(df["RowID"].astype(str), cells.to_numpy().tolist()))
+
+@callback([Output("proj-store", "data"), Output("proj-sync", "data")],
+    [Input("proj-refresh-btn", "n_clicks"), Input(tab_shown("tab-projects"), "data")], State("proj-sync", "data"))
+def sync_pt(n, shown, synced):
+    # Tab switches are served from the (background-refreshed) cache; Refresh forces a read
+    tag, rows, gone = project_changes(synced, force=ctx.triggered_id == "proj-refresh-btn")
+    if rows is None: return dash.no_update, dash.no_update
+    if gone is None: return {"rows": _pt_rows(rows)}, tag
+    patch = Patch()
+    for rid, cells in _pt_rows(rows).items(): patch["rows"][rid] = cells
+    for rid in gone: del patch["rows"][rid]
+    return patch, tag
+
+# The export links carry the same search and facets as the table
+@callback([Output("proj-view", "data")] + [Output(f"proj-facet-{f}", "options") for f in PROJECT_FACETS]
+    + [Output("proj-export-csv", "href"), Output("proj-export-parquet", "href")],
+    [Input("proj-refresh-btn", "n_clicks"), Input(tab_shown("tab-projects"), "data"), Input("proj-search", "value")]
+    + [Input(f"proj-facet-{f}", "value") for f in PROJECT_FACETS])
+def search_pt(n, shown, text, *chosen):
+    facets = dict(zip(PROJECT_FACETS, chosen))
+    searching = bool(text) or any(chosen)
+    df, counts = search_projects(text, facets)
+    ids = df["RowID"].astype(str).tolist() if searching and "RowID" in df.columns else None
+    options = [[{"label": f"{v} ({c})", "value": v} for v, c in sorted(counts.get(f, {}).items())
+        if c or v in (facets[f] or [])] for f in PROJECT_FACETS]
+    params = {"q": text, **facets}
+    return [{"ids": ids, "searching": searching}] + options + [
+        export_href("projects", "csv", **params), export_href("projects", "parquet", **params)]
+
+clientside_callback(ClientsideFunction("mcut", "projectTable"), Output("proj-table-container", "children"),
+    [Input("proj-store", "data"), Input("proj-view", "data")])
 
 
 # View/Edit Modal
@@ -360,32 +734,24 @@ DROPDOWN_EDIT_FIELDS = {"BU", "ProjectType", "ClassificationMedia", "TacticType"
 
 @callback([Output("proj-modal", "is_open"), Output("proj-modal-title", "children"),
     Output("proj-modal-body", "children"), Output("proj-modal-save", "style"),
-    Output("proj-selected-row-id", "data"), Output("proj-modal-mode", "data")],
+    Output("proj-selected-row-id", "data"), Output("proj-modal-mode", "data"), Output("proj-edit-base", "data")],
     [Input({"type": "proj-view-btn", "index": ALL}, "n_clicks"),
-     Input({"type": "proj-edit-btn", "index": ALL}, "n_clicks"),
-     Input("proj-modal-close", "n_clicks")], prevent_initial_call=True)
-def open_pm(vc, ec, cc):
-    if ctx.triggered_id == "proj-modal-close":
-        return False, dash.no_update, dash.no_update, dash.no_update, dash.no_update, dash.no_update
+     Input({"type": "proj-edit-btn", "index": ALL}, "n_clicks")], prevent_initial_call=True)
+def open_pm(vc, ec):
     t = ctx.triggered_id
-    if not t or not isinstance(t, dict): return [dash.no_update]*6
-    if not any(c for c in (vc or []) + (ec or []) if c): return [dash.no_update]*6
+    if not t or not isinstance(t, dict): return [dash.no_update]*7
+    if not any(c for c in (vc or []) + (ec or []) if c): return [dash.no_update]*7
     rid = t["index"]; mode = "edit" if t["type"] == "proj-edit-btn" else "view"
+    if mode == "edit": get_tables([PROJECTS_TABLE, LOOKUPS_TABLE], copy=False)  # cold cache → one concurrent read
     df = get_all_projects()
-    if df.empty or "RowID" not in df.columns: return False, "", "", {"display": "none"}, None, None
+    if df.empty or "RowID" not in df.columns: return False, "", "", {"display": "none"}, None, None, None
     row = df[df["RowID"] == rid]
-    if row.empty: return False, "", "", {"display": "none"}, None, None
+    if row.empty: return False, "", "", {"display": "none"}, None, None, None
     row = row.iloc[0]
     title = f"{'Edit' if mode == 'edit' else 'View'}: {row.get('ProjectName', '')}"
     edit_options = {}
     if mode == "edit":
-        try:
-            from db_connection import read_table as _rt
-            ldf = _rt("Lookups")
-            if not ldf.empty:
-                for f in DROPDOWN_EDIT_FIELDS:
-                    vals = ldf[ldf["FieldName"] == f].sort_values("Value")["Value"].tolist()
-                    edit_options[f] = [{"label": v, "value": v} for v in vals]
+        try: edit_options = {f: o for f, o in get_lookup_options(DROPDOWN_EDIT_FIELDS).items() if o}
         except: pass
     fields = []
     skip = {"RowID", "CreatedBy", "CreatedAt", "UpdatedBy", "UpdatedAt"}
@@ -406,30 +772,42 @@ def open_pm(vc, ec, cc):
     fields.append(html.Hr())
     fields.append(html.Small(f"Created by {row.get('CreatedBy', '')} at {row.get('CreatedAt', '')}", className="text-muted"))
     save_style = {"display": "inline-block"} if mode == "edit" else {"display": "none"}
-    return True, title, html.Div(fields), save_style, rid, mode
+    # The row as opened — save_pe writes only what the user changed and detects clashing edits
+    base = None
+    if mode == "edit":
+        base = {"values": {c: "" if pd.isna(row.get(c)) else str(row.get(c)) for c in df.columns if c not in skip},
+            "UpdatedAt": None if pd.isna(row.get("UpdatedAt")) else str(row.get("UpdatedAt")),
+            "version": df.attrs.get("delta_version")}
+    return True, title, html.Div(fields), save_style, rid, mode, base
+
+clientside_callback(ClientsideFunction("ui", "closeProjectModal"),
+    [Output("proj-modal", "is_open", allow_duplicate=True), Output("proj-edit-base", "data", allow_duplicate=True)],
+    Input("proj-modal-close", "n_clicks"), prevent_initial_call=True)
 
 @callback([Output("proj-modal", "is_open", allow_duplicate=True), Output("proj-submit-msg", "children", allow_duplicate=True)],
     Input("proj-modal-save", "n_clicks"),
     [State("proj-selected-row-id", "data"), State({"type": "proj-edit-field", "index": ALL}, "value"),
-     State({"type": "proj-edit-field", "index": ALL}, "id")], prevent_initial_call=True)
-def save_pe(n, rid, vals, ids):
+     State({"type": "proj-edit-field", "index": ALL}, "id"), State("proj-edit-base", "data")], prevent_initial_call=True,
+    **bg_write("proj-modal-save", "proj-edit-progress"))
+def save_pe(set_progress, n, rid, vals, ids, base):
     if not rid or not vals: return dash.no_update, dash.no_update
     changes = {id_obj["index"]: val for val, id_obj in zip(vals, ids) if val is not None}
-    r = update_project(rid, changes)
+    set_progress("Saving changes…")
+    r = update_project(rid, changes, base)
     return False, dbc.Alert(f"{r['message']} Click Refresh.", color="success" if r["status"] == "success" else "danger", duration=5000)
 
 # Delete with confirmation
-@callback([Output("proj-delete-modal", "is_open"), Output("proj-delete-row-id", "data")],
+clientside_callback(ClientsideFunction("ui", "askDelete"),
+    [Output("proj-delete-modal", "is_open"), Output("proj-delete-row-id", "data")],
     Input({"type": "proj-del-btn", "index": ALL}, "n_clicks"), prevent_initial_call=True)
-def ask_dp(nc):
-    if not ctx.triggered_id or not isinstance(ctx.triggered_id, dict) or not any(c for c in nc if c): return False, None
-    return True, ctx.triggered_id["index"]
 
 @callback([Output("proj-delete-msg", "children"), Output("proj-delete-modal", "is_open", allow_duplicate=True)],
     [Input("proj-confirm-delete", "n_clicks"), Input("proj-cancel-delete", "n_clicks")],
-    State("proj-delete-row-id", "data"), prevent_initial_call=True)
-def conf_dp(y, n, rid):
+    State("proj-delete-row-id", "data"), prevent_initial_call=True,
+    **bg_write("proj-confirm-delete", "proj-delete-progress"))
+def conf_dp(set_progress, y, n, rid):
     if ctx.triggered_id == "proj-cancel-delete" or not rid: return dash.no_update, False
+    set_progress("Deleting project…")
     delete_project(rid)
     return dbc.Alert("Project deleted. Click Refresh.", color="warning", duration=4000), False
 
@@ -437,7 +815,7 @@ def conf_dp(y, n, rid):
 # ═══════════════════════════════════════════════════════════════════════
 #  TAB 2: RESOURCE UTILIZATION (Calendar View)
 # ═══════════════════════════════════════════════════════════════════════
-def tab_resource():
+def tab_resource(admin=False):
     today = date.today()
     return dbc.Container([
         dbc.Row([
@@ -450,11 +828,12 @@ def tab_resource():
             dbc.Col([
                 dbc.Button([html.I(className="fas fa-sync me-1"), "Refresh"], id="res-refresh-btn", color="secondary", size="sm", outline=True, className="me-2"),
                 dbc.Button([html.I(className="fas fa-table me-1"), "Manager View"], id="res-manager-btn", color="primary", size="sm",
-                    style={"display": "none"}),  # Hidden by default, shown for admins via callback
+                    style={"display": "inline-block" if admin else "none"}),  # admins only
             ], md=4, className="text-end"),
         ], className="mb-3 align-items-center"),
         dcc.Store(id="cal-year", data=today.year), dcc.Store(id="cal-month", data=today.month),
-        html.Div(id="cal-grid"),
+        html.Div(id="cal-grid"), dcc.Store(id="cal-store"),
+        dcc.Store(id="res-lookup-store"), dcc.Store(id="res-lookup-sync"),
         dbc.Collapse(dbc.Card(dbc.CardBody([
             html.H5("Manager Summary", className="text-primary mb-3"),
 
@@ -473,8 +852,17 @@ def tab_resource():
                         dbc.Button([html.I(className="fas fa-times me-1"), "Clear"], id="mgr-clear-btn",
                             color="secondary", size="sm", outline=True),
                     ], className="mt-1")], md=3),
+                dbc.Col([dbc.Label(" ", className="small mb-1"),
+                    dbc.ButtonGroup([
+                        dbc.Button([html.I(className="fas fa-file-csv me-1"), "CSV"], id="mgr-export-csv",
+                            external_link=True, color="secondary", size="sm", outline=True),
+                        dbc.Button([html.I(className="fas fa-download me-1"), "Parquet"], id="mgr-export-parquet",
+                            external_link=True, color="secondary", size="sm", outline=True),
+                    ], className="mt-1")], md=2, className="text-end"),
             ], className="mb-3"),
             html.Hr(),
+            dcc.Store(id="mgr-filters", data={}),
+            dbc.Progress(id="mgr-progress", value=0, style={"display": "none"}, className="mb-2"),
             html.Div(id="manager-summary-content"),
         ]), className="shadow-sm mt-3"), id="manager-collapse", is_open=False),
 
@@ -508,6 +896,7 @@ def tab_resource():
                 dbc.Button("Close", id="res-modal-close", color="secondary")])],
             id="res-modal", size="xl", scrollable=True, is_open=False),
         dcc.Store(id="res-selected-date"), html.Div(id="res-submit-msg"), html.Div(id="res-delete-msg"),
+        job_progress("res-submit-progress"), job_progress("res-delete-progress"),
 
         # Delete Confirmation
         dbc.Modal([dbc.ModalHeader(dbc.ModalTitle("Confirm Delete")),
@@ -520,63 +909,43 @@ def tab_resource():
 
 
 # Calendar callbacks
-@callback([Output("cal-year", "data"), Output("cal-month", "data")],
+clientside_callback(ClientsideFunction("ui", "navMonth"), [Output("cal-year", "data"), Output("cal-month", "data")],
     [Input("cal-prev", "n_clicks"), Input("cal-next", "n_clicks")],
     [State("cal-year", "data"), State("cal-month", "data")], prevent_initial_call=True)
-def nav_m(p, nx, y, m):
-    if ctx.triggered_id == "cal-prev": return (y-1, 12) if m == 1 else (y, m-1)
-    return (y+1, 1) if m == 12 else (y, m+1)
-
-@callback([Output("cal-grid", "children"), Output("cal-month-label", "children")],
-    [Input("cal-year", "data"), Input("cal-month", "data"), Input("res-refresh-btn", "n_clicks"), Input("tabs", "active_tab")])
-def build_cal(year, month, ref, tab):
-    if tab != "tab-resource" and not ref: return dash.no_update, dash.no_update
-    label = f"{calendar.month_name[month]} {year}"
+
+# Calendar month as data — cal-store {"month", "version", "days": {date: [entries, hours]}},
+# re-sent only for another month or a newer ResourceUtilization version and
+# drawn by mcut.calendar in assets/render.js.
+@callback(Output("cal-store", "data"),
+    [Input("cal-year", "data"), Input("cal-month", "data"), Input("res-refresh-btn", "n_clicks"),
+     Input(tab_shown("tab-resource"), "data")], State("cal-store", "data"))
+def sync_cal(year, month, ref, shown, held):
     # Only force refresh on explicit Refresh click, use cache for tab switch/month nav
     force = bool(ref and ctx.triggered_id == "res-refresh-btn")
-    df = get_all_resources(force_refresh=force)
-    ebd = {}
-    if not df.empty and "Date" in df.columns:
-        for _, row in df.iterrows():
-            d = str(row.get("Date", ""))[:10]
-            if d.startswith(f"{year}-{month:02d}"): ebd.setdefault(d, []).append(row)
-    cal = calendar.monthcalendar(year, month); today = date.today()
-    header = html.Tr([html.Th(d, className="text-center small fw-bold text-muted", style={"padding": "8px"})
-        for d in ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]])
-    rows = []
-    for week in cal:
-        cells = []
-        for day in week:
-            if day == 0:
-                cells.append(html.Td("", style={"backgroundColor": "#F1F5F9", "height": "80px", "width": "14.28%"}))
-            else:
-                ds = f"{year}-{month:02d}-{day:02d}"; it = date(year, month, day) == today
-                entries = ebd.get(ds, []); ec = len(entries)
-                dc = [html.Div(str(day), className="fw-bold small" + (" text-white" if it else ""),
-                    style={"backgroundColor": C["accent"] if it else "transparent", "borderRadius": "50%",
-                           "width": "24px", "height": "24px", "display": "flex", "alignItems": "center", "justifyContent": "center"})]
-                if ec > 0:
-                    th = sum(float(e.get("TotalHours", 0) or 0) for e in entries)
-                    dc.append(dbc.Badge(f"{ec} | {th:.0f}h", color="success", className="mt-1", style={"fontSize": "9px"}))
-                cells.append(html.Td(html.Div(dc, id={"type": "cal-day", "index": ds},
-                    style={"cursor": "pointer", "height": "70px", "padding": "4px"}, className="h-100"),
-                    style={"backgroundColor": "#ECFDF5" if ec > 0 else "white",
-                           "border": f"2px solid {C['accent']}" if it else "1px solid #E2E8F0",
-                           "verticalAlign": "top", "width": "14.28%"}))
-        rows.append(html.Tr(cells))
-    return dbc.Table([html.Thead(header), html.Tbody(rows)], bordered=True, className="mb-0", style={"tableLayout": "fixed"}), label
+    key = f"{year}-{month:02d}"
+    df = get_resources_by_date(key, force_refresh=force, copy=False)
+    version = cached_version(RESOURCE_TABLE)
+    if held and held.get("month") == key and held.get("version") == version: return dash.no_update
+    days = {}
+    if not df.empty:
+        hours = pd.to_numeric(df["TotalHours"], errors="coerce").fillna(0) if "TotalHours" in df.columns else pd.Series(0.0, index=df.index)
+        g = hours.groupby(df["Date"].astype(str).str[:10]).agg(["size", "sum"])
+        days = {d: [int(n), float(h)] for d, (n, h) in zip(g.index, g.to_numpy())}
+    return {"month": key, "year": year, "mon": month, "label": f"{calendar.month_name[month]} {year}",
+        "version": version, "days": days}
+
+clientside_callback(ClientsideFunction("mcut", "calendar"),
+    [Output("cal-grid", "children"), Output("cal-month-label", "children")], Input("cal-store", "data"))
 
 @callback([Output("res-modal", "is_open"), Output("res-modal-title", "children"),
     Output("res-selected-date", "data"), Output("res-existing-entries", "children")],
-    [Input({"type": "cal-day", "index": ALL}, "n_clicks"), Input("res-modal-close", "n_clicks")], prevent_initial_call=True)
-def open_rm(dc, cc):
-    if ctx.triggered_id == "res-modal-close": return False, "", None, ""
+    Input({"type": "cal-day", "index": ALL}, "n_clicks"), prevent_initial_call=True)
+def open_rm(dc):
     t = ctx.triggered_id
     if not t or not isinstance(t, dict) or not any(c for c in dc if c): return [dash.no_update]*4
-    ds = t["index"]; df = get_all_resources()  # uses cache, fast
+    ds = t["index"]; de = get_resources_by_date(ds)  # one day off the date index
     existing = []
-    if not df.empty and "Date" in df.columns:
-        de = df[df["Date"].astype(str).str.startswith(ds)]
+    if not de.empty:
         for _, row in de.iterrows():
             rid = row.get("RowID", "")
             existing.append(dbc.Card(dbc.CardBody(dbc.Row([
@@ -588,6 +957,17 @@ def open_rm(dc, cc):
         html.Div(existing or [html.P("No entries.", className="text-muted small")])])
     return True, f"Resource Entry — {ds}", ds, ed
 
+clientside_callback(ClientsideFunction("ui", "closeResourceModal"),
+    [Output("res-modal", "is_open", allow_duplicate=True), Output("res-modal-title", "children", allow_duplicate=True),
+     Output("res-selected-date", "data", allow_duplicate=True), Output("res-existing-entries", "children", allow_duplicate=True)],
+    Input("res-modal-close", "n_clicks"), prevent_initial_call=True)
+
+# Live preview of the TotalHours submit_resource saves
+RES_HOUR_INPUTS = ["res-proj-task", "res-stakeholder", "res-meetings", "res-gch", "res-tools", "res-innovation",
+    "res-cross", "res-site", "res-townhall", "res-oneone", "res-sf", "res-other-train", "res-hiring", "res-leaves", "res-open"]
+clientside_callback(ClientsideFunction("ui", "totalHours"), Output("res-total-hours", "value", allow_duplicate=True),
+    [Input(i, "value") for i in RES_HOUR_INPUTS], prevent_initial_call=True)
+
 @callback([Output("res-submit-msg", "children"), Output("res-modal", "is_open", allow_duplicate=True),
     Output("res-bu", "value", allow_duplicate=True), Output("res-designer", "value", allow_duplicate=True),
     Output("res-manager", "value"), Output("res-proj-task", "value"), Output("res-stakeholder", "value"),
@@ -603,8 +983,9 @@ def open_rm(dc, cc):
      State("res-innovation", "value"), State("res-cross", "value"), State("res-site", "value"),
      State("res-townhall", "value"), State("res-oneone", "value"), State("res-sf", "value"),
      State("res-other-train", "value"), State("res-hiring", "value"), State("res-leaves", "value"),
-     State("res-open", "value"), State("res-total-hours", "value")], prevent_initial_call=True)
-def submit_r(n, dt, bu, des, mgr, pt, sh, mtg, gch, tools, innov, cross, site, town, oo, sf, ot, hire, leave, opn, tot):
+     State("res-open", "value"), State("res-total-hours", "value")], prevent_initial_call=True,
+    **bg_write("res-submit-btn", "res-submit-progress"))
+def submit_r(set_progress, n, dt, bu, des, mgr, pt, sh, mtg, gch, tools, innov, cross, site, town, oo, sf, ot, hire, leave, opn, tot):
     # Validate required fields — prevent empty/dummy rows
     if not bu or not des:
         return [dbc.Alert("BU and Designer Name are required.", color="danger", duration=3000), dash.no_update] + [dash.no_update] * 17
@@ -613,29 +994,29 @@ def submit_r(n, dt, bu, des, mgr, pt, sh, mtg, gch, tools, innov, cross, site, t
         "InnovationProcessImprovement": innov, "CrossFunctionalSupports": cross, "SiteGCHActivities": site,
         "TownhallsHRIT": town, "OneOne": oo, "SuccessFactorLinkedIn": sf, "OtherTrainings": ot,
         "HiringOnboarding": hire, "LeavesHolidays": leave, "OpenTime": opn, "TotalHours": tot}
+    set_progress("Saving entry…")
     r = submit_resource(data)
     msg = dbc.Alert(r["message"], color="success" if r["status"] == "success" else "danger", duration=4000)
     return [msg, False] + [None, None, "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", "", ""]
 
 # Delete with confirmation
-@callback([Output("res-delete-modal", "is_open"), Output("res-delete-row-id", "data")],
+clientside_callback(ClientsideFunction("ui", "askDelete"),
+    [Output("res-delete-modal", "is_open"), Output("res-delete-row-id", "data")],
     Input({"type": "res-del-btn", "index": ALL}, "n_clicks"), prevent_initial_call=True)
-def ask_dr(nc):
-    if not ctx.triggered_id or not isinstance(ctx.triggered_id, dict) or not any(c for c in nc if c): return False, None
-    return True, ctx.triggered_id["index"]
 
 @callback([Output("res-delete-msg", "children"), Output("res-delete-modal", "is_open", allow_duplicate=True)],
     [Input("res-confirm-delete", "n_clicks"), Input("res-cancel-delete", "n_clicks")],
-    State("res-delete-row-id", "data"), prevent_initial_call=True)
-def conf_dr(y, n, rid):
+    State("res-delete-row-id", "data"), prevent_initial_call=True,
+    **bg_write("res-confirm-delete", "res-delete-progress"))
+def conf_dr(set_progress, y, n, rid):
     if ctx.triggered_id == "res-cancel-delete" or not rid: return dash.no_update, False
+    set_progress("Deleting entry…")
     delete_resource(rid)
     return dbc.Alert("Deleted. Click Refresh.", color="warning", duration=4000), False
 
 # Manager view
-@callback(Output("manager-collapse", "is_open"), Input("res-manager-btn", "n_clicks"),
-    State("manager-collapse", "is_open"), prevent_initial_call=True)
-def toggle_mgr(n, o): return not o
+clientside_callback(ClientsideFunction("ui", "toggle"), Output("manager-collapse", "is_open"),
+    Input("res-manager-btn", "n_clicks"), State("manager-collapse", "is_open"), prevent_initial_call=True)
 
 # Populate filter dropdowns when manager view opens
 @callback([Output("mgr-filter-designer", "options"), Output("mgr-filter-bu", "options")],
@@ -653,44 +1034,57 @@ def init_mgr_filters(is_open):
     return designers, bus
 
 # Clear filters
-@callback([Output("mgr-filter-designer", "value"), Output("mgr-filter-bu", "value")],
+clientside_callback(ClientsideFunction("ui", "clearMgrFilters"),
+    [Output("mgr-filter-designer", "value"), Output("mgr-filter-bu", "value")],
     Input("mgr-clear-btn", "n_clicks"), prevent_initial_call=True)
-def clear_mgr_filters(n):
-    return None, None
+
+# Applied filters — Apply copies the dropdowns, Clear empties them. The
+# summary and export links depend on this store rather than on the buttons,
+# so identical requests have identical inputs (report_manager cache key).
+clientside_callback(ClientsideFunction("ui", "setMgrFilters"), Output("mgr-filters", "data"),
+    [Input("mgr-apply-btn", "n_clicks"), Input("mgr-clear-btn", "n_clicks")],
+    [State("mgr-filter-designer", "value"), State("mgr-filter-bu", "value")], prevent_initial_call=True)
+
+# Export links follow the same filters as the summary below
+@callback([Output("mgr-export-csv", "href"), Output("mgr-export-parquet", "href")],
+    [Input("manager-collapse", "is_open"), Input("cal-year", "data"), Input("cal-month", "data"),
+     Input("mgr-filters", "data")], prevent_initial_call=True)
+def mgr_export_links(is_open, cal_y, cal_m, filters):
+    if not is_open: return dash.no_update, dash.no_update
+    filters = filters or {}
+    params = {"year": cal_y, "month": cal_m, "designer": filters.get("designer"), "bu": filters.get("bu")}
+    return export_href("resources", "csv", **params), export_href("resources", "parquet", **params)
 
 # Load manager data — synced with calendar month/year + filters
 @callback(Output("manager-summary-content", "children"),
-    [Input("manager-collapse", "is_open"), Input("mgr-apply-btn", "n_clicks"),
-     Input("mgr-clear-btn", "n_clicks"), Input("cal-year", "data"), Input("cal-month", "data")],
-    [State("mgr-filter-designer", "value"), State("mgr-filter-bu", "value")],
-    prevent_initial_call=True)
-def load_mgr(is_open, apply_n, clear_n, cal_y, cal_m, f_designer, f_bu):
+    [Input("manager-collapse", "is_open"), Input("cal-year", "data"), Input("cal-month", "data"),
+     Input("mgr-filters", "data")],
+    prevent_initial_call=True, background=True, manager=report_manager, interval=250,
+    progress=Output("mgr-progress", "value"),
+    running=[(Output("mgr-progress", "style"), {"height": "6px"}, {"display": "none"})])
+def load_mgr(set_progress, is_open, cal_y, cal_m, filters):
     if not is_open: return dash.no_update
+    f_designer, f_bu = (filters or {}).get("designer"), (filters or {}).get("bu")
 
-    # Use cache for Apply/Clear, no need to hit OneLake every time
-    df = get_all_resources_unfiltered()
-    if df.empty: return dbc.Alert("No data.", color="info")
+    set_progress(10)
+    # Always filter by calendar's month/year
+    df = get_resources_by_date(f"{cal_y}-{cal_m:02d}", unfiltered=True)
+    set_progress(40)
 
     mn = calendar.month_name[cal_m]
 
-    # Always filter by calendar's month/year
-    if "Date" in df.columns:
-        mp = f"{cal_y}-{cal_m:02d}"
-        df = df[df["Date"].astype(str).str.startswith(mp)]
-
     if df.empty: return dbc.Alert(f"No entries for {mn} {cal_y}.", color="info")
 
-    # Apply dropdown filters (only if not Clear button)
-    if ctx.triggered_id != "mgr-clear-btn":
-        if f_designer and "DesignerName" in df.columns:
-            df = df[df["DesignerName"] == f_designer]
-        if f_bu and "BU" in df.columns:
-            df = df[df["BU"] == f_bu]
+    # Apply dropdown filters
+    if f_designer and "DesignerName" in df.columns:
+        df = df[df["DesignerName"] == f_designer]
+    if f_bu and "BU" in df.columns:
+        df = df[df["BU"] == f_bu]
 
     # Build filter description
     filter_parts = [f"{mn} {cal_y}"]
-    if f_designer and ctx.triggered_id != "mgr-clear-btn": filter_parts.append(f"Designer: {f_designer}")
-    if f_bu and ctx.triggered_id != "mgr-clear-btn": filter_parts.append(f"BU: {f_bu}")
+    if f_designer: filter_parts.append(f"Designer: {f_designer}")
+    if f_bu: filter_parts.append(f"BU: {f_bu}")
     filter_label = " | ".join(filter_parts)
 
     if df.empty:
@@ -702,6 +1096,7 @@ def load_mgr(is_open, apply_n, clear_n, cal_y, cal_m, f_designer, f_bu):
     for c in nc:
         if c in df.columns: df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0)
 
+    set_progress(70)
     content = []
 
     content.append(html.Small(f"Showing: {filter_label}", className="text-info fw-bold d-block mb-2"))
@@ -816,7 +1211,16 @@ DD_FIELDS = [
     {"label": "Reporting Manager", "value": "ReportingManager"},
 ]
 
-def tab_settings():
+def restricted(what):
+    return dbc.Container([
+        html.Div([
+            html.H4("Access Restricted", className="text-danger mt-4"),
+            html.P(f"{what} available to administrators only.", className="text-muted"),
+        ], className="text-center py-5"),
+    ], fluid=True)
+
+def tab_settings(admin=False):
+    if not admin: return restricted("Settings tab is")
     return dbc.Container([
         html.H4("Settings — Manage Dropdowns", className="text-primary fw-bold mb-3"),
         dbc.Row([
@@ -825,11 +1229,13 @@ def tab_settings():
                 html.H6("Or Add New", className="text-muted mb-2"),
                 dbc.InputGroup([dbc.Input(id="settings-new-field", placeholder="Field name"),
                     dbc.Button("Add", id="settings-add-field-btn", color="primary", size="sm")]),
-                html.Div(id="settings-add-field-msg", className="mt-2")]), className="shadow-sm"), md=4),
+                html.Div(id="settings-add-field-msg", className="mt-2"), job_progress("settings-add-progress")]),
+                className="shadow-sm"), md=4),
             dbc.Col(dbc.Card(dbc.CardBody([html.H6(id="settings-edit-title", children="Select a field", className="text-muted mb-2"),
                 dbc.Textarea(id="settings-values-textarea", placeholder="One value per line...", style={"height": "300px"}), html.Hr(),
                 dbc.Row([dbc.Col(dbc.Button("Save Values", id="settings-save-btn", color="success", className="me-2"), width="auto"),
-                    dbc.Col(html.Div(id="settings-save-msg"), className="align-self-center")])]), className="shadow-sm"), md=8)])
+                    dbc.Col([html.Div(id="settings-save-msg"), job_progress("settings-save-progress")],
+                        className="align-self-center")])]), className="shadow-sm"), md=8)])
     ], fluid=True, className="py-3")
 
 @callback([Output("settings-values-textarea", "value"), Output("settings-edit-title", "children")],
@@ -839,22 +1245,74 @@ def load_fv(f):
     return "\n".join(get_lookup_values(f)), f"Editing: {f}"
 
 @callback(Output("settings-save-msg", "children"), Input("settings-save-btn", "n_clicks"),
-    [State("settings-field-select", "value"), State("settings-values-textarea", "value")], prevent_initial_call=True)
-def save_fv(n, f, txt):
+    [State("settings-field-select", "value"), State("settings-values-textarea", "value")], prevent_initial_call=True,
+    **bg_write("settings-save-btn", "settings-save-progress"))
+def save_fv(set_progress, n, f, txt):
     if not f: return dbc.Alert("Select a field.", color="warning", duration=3000)
     vals = [v.strip() for v in txt.strip().split("\n") if v.strip()]
+    set_progress(f"Saving {len(vals)} values…")
     try: save_lookup_values(f, vals); return dbc.Alert(f"Saved {len(vals)} values!", color="success", duration=3000)
     except Exception as e: return dbc.Alert(f"Error: {e}", color="danger", duration=5000)
 
 @callback([Output("settings-field-select", "options"), Output("settings-add-field-msg", "children")],
-    Input("settings-add-field-btn", "n_clicks"), State("settings-new-field", "value"), prevent_initial_call=True)
-def add_f(n, nf):
+    Input("settings-add-field-btn", "n_clicks"), State("settings-new-field", "value"), prevent_initial_call=True,
+    **bg_write("settings-add-field-btn", "settings-add-progress"))
+def add_f(set_progress, n, nf):
     if not nf: return dash.no_update, dbc.Alert("Enter name.", color="warning", duration=3000)
-    fn = nf.strip().replace(" ", ""); save_lookup_values(fn, []); clear_cache()
+    set_progress("Adding field…")
+    fn = nf.strip().replace(" ", ""); save_lookup_values(fn, [])
     opts = sorted(set([d["value"] for d in DD_FIELDS] + get_all_lookup_fields() + [fn]))
     return [{"label": f, "value": f} for f in opts], dbc.Alert(f"Added: {fn}", color="success", duration=3000)
 
 
+# ═══════════════════════════════════════════════════════════════════════
+#  TAB 4: ANALYTICS (rework rates + QC load, from analytics_cube)
+# ═══════════════════════════════════════════════════════════════════════
+def tab_analytics(admin=False):
+    if not admin: return restricted("Analytics are")
+    return dbc.Container([
+        dbc.Row([
+            dbc.Col(html.H4("Project Analytics", className="text-primary fw-bold mb-0"), width="auto"),
+            dbc.Col(dbc.Button([html.I(className="fas fa-sync me-1"), "Refresh"], id="analytics-refresh-btn",
+                color="secondary", size="sm", outline=True), width="auto"),
+        ], className="mb-3 align-items-center"),
+        dcc.Loading(html.Div(id="analytics-content")),
+    ], fluid=True, className="py-3")
+
+def _rework_chart(view, title, line=False):
+    fig = go.Figure()
+    for name, col, color in [("GD rework %", "GDReworkPct", C["accent"]), ("POC rework %", "POCReworkPct", C["danger"])]:
+        if line: fig.add_scatter(x=view.index, y=view[col], name=name, mode="lines+markers", line_color=color)
+        else: fig.add_bar(x=view.index, y=view[col], name=name, marker_color=color)
+    fig.update_traces(customdata=view[["TotalAssets", "Projects"]],
+        hovertemplate="%{y}%<br>%{customdata[0]:.0f} assets / %{customdata[1]:.0f} projects")
+    return _chart(fig, title, "Rework %")
+
+def _chart(fig, title, ytitle):
+    fig.update_layout(title={"text": title, "font": {"size": 14, "color": C["primary"]}}, yaxis_title=ytitle,
+        template="plotly_white", height=320, margin={"l": 50, "r": 10, "t": 40, "b": 60}, legend={"orientation": "h", "y": 1.12})
+    return dbc.Card(dbc.CardBody(dcc.Graph(figure=fig, config={"displayModeBar": False})), className="shadow-sm mb-3")
+
+@callback(Output("analytics-content", "children"),
+    [Input(tab_shown("tab-analytics"), "data"), Input("analytics-refresh-btn", "n_clicks")])
+def load_analytics(shown, n):
+    if not is_admin():
+        return dbc.Alert("Analytics are available to administrators only.", color="warning")
+    cube = get_project_analytics(force=ctx.triggered_id == "analytics-refresh-btn")
+    if cube["BU"].empty: return dbc.Alert("No projects yet.", color="info")
+    qc = cube["QC"].sort_values("Projects", ascending=False)
+    qc_fig = go.Figure([go.Bar(x=qc.index, y=qc["Projects"] - qc["InQC"], name="Reviewed", marker_color=C["success"]),
+        go.Bar(x=qc.index, y=qc["InQC"], name="In QC now", marker_color=C["accent"])])
+    qc_fig.update_layout(barmode="stack")
+    return html.Div([
+        dbc.Row([dbc.Col(_rework_chart(cube["Designer"], "Rework by Designer"), md=12)]),
+        dbc.Row([dbc.Col(_rework_chart(cube["BU"], "Rework by BU"), md=6),
+            dbc.Col(_rework_chart(cube["Complexity"], "Rework by Complexity"), md=6)]),
+        dbc.Row([dbc.Col(_rework_chart(cube["Month"], "Rework by Month (assigned)", line=True), md=6),
+            dbc.Col(_chart(qc_fig, "QC Load per Reviewer", "Projects"), md=6)]),
+    ])
+
+
 # ═══════════════════════════════════════════════════════════════════════
 #  LAZY LOAD DROPDOWNS
 # ═══════════════════════════════════════════════════════════════════════
@@ -868,81 +1326,127 @@ DD_MAP = {
     "res-bu": "BU", "res-designer": "DesignerAssigned", "res-manager": "ReportingManager",
 }
 
-@callback([Output(dd, "options") for dd in DD_MAP.keys()],
-    [Input("proj-new-btn", "n_clicks"), Input("res-submit-btn", "n_clicks"),
-     Input("proj-refresh-btn", "n_clicks"), Input("res-refresh-btn", "n_clicks"),
-     Input("tabs", "active_tab")])
-def load_dd(n1, n2, n3, n4, tab):
-    if tab not in ("tab-projects", "tab-resource") and not any([n1, n2, n3, n4]):
-        return [dash.no_update] * len(DD_MAP)
-    try:
-        from db_connection import read_table; df = read_table("Lookups")
-    except: df = pd.DataFrame()
-    results = []
-    for dd, ln in DD_MAP.items():
-        if df.empty or "FieldName" not in df.columns: results.append([])
-        else: results.append([{"label": v, "value": v} for v in df[df["FieldName"] == ln].sort_values("Value")["Value"].tolist()])
-    return results
+# Each tab holds its own <prefix>lookup-store, filled once per Lookups version
+# (<prefix>lookup-sync holds the version the browser has) — a tab's callbacks
+# never reach into a tab that may not be rendered yet. mcut.lookupOptions fans
+# the lists out to the dropdowns.
+PROJ_DD = [dd for dd in DD_MAP if dd.startswith("proj-")]
+RES_DD = [dd for dd in DD_MAP if dd.startswith("res-")]
+
+def _lookup_store(dropdowns, synced):
+    try: version = cached_version(LOOKUPS_TABLE)
+    except: version = None
+    if version is not None and synced == version: return dash.no_update, dash.no_update
+    try: opts = get_lookup_options({DD_MAP[dd] for dd in dropdowns})
+    except: opts = {}
+    return {"options": [opts.get(DD_MAP[dd], []) for dd in dropdowns]}, version
+
+@callback([Output("proj-lookup-store", "data"), Output("proj-lookup-sync", "data")],
+    [Input("proj-new-btn", "n_clicks"), Input("proj-refresh-btn", "n_clicks"), Input(tab_shown("tab-projects"), "data")],
+    State("proj-lookup-sync", "data"))
+def load_dd(n1, n2, shown, synced):
+    return _lookup_store(PROJ_DD, synced)
+
+@callback([Output("res-lookup-store", "data"), Output("res-lookup-sync", "data")],
+    [Input("res-submit-btn", "n_clicks"), Input("res-refresh-btn", "n_clicks"), Input(tab_shown("tab-resource"), "data")],
+    State("res-lookup-sync", "data"))
+def load_res_dd(n1, n2, shown, synced):
+    return _lookup_store(RES_DD, synced)
+
+clientside_callback(ClientsideFunction("mcut", "lookupOptions"),
+    [Output(dd, "options") for dd in PROJ_DD], Input("proj-lookup-store", "data"))
+clientside_callback(ClientsideFunction("mcut", "lookupOptions"),
+    [Output(dd, "options") for dd in RES_DD], Input("res-lookup-store", "data"))
 
 
 # ═══════════════════════════════════════════════════════════════════════
 #  LAYOUT
 # ═══════════════════════════════════════════════════════════════════════
-app.layout = html.Div([
-    dbc.Navbar(dbc.Container([
-        dbc.NavbarBrand([html.I(className="fas fa-palette me-2"), "Medical Creatives UT"], className="fw-bold text-white"),
-        html.Span(id="navbar-user-display", className="text-light small"),
-    ], fluid=True), color=C["primary"], dark=True, className="mb-0"),
-    dbc.Tabs(id="tabs", active_tab="tab-projects", className="px-3 pt-2", children=[
-        dbc.Tab(tab_project_summary(), label="Project Summary", tab_id="tab-projects", label_style={"fontWeight": "600"}),
-        dbc.Tab(tab_resource(), label="Resource Utilization", tab_id="tab-resource", label_style={"fontWeight": "600"}),
-        dbc.Tab(html.Div(id="settings-tab-content"), label="Settings", tab_id="tab-settings",
-            id="settings-tab", label_style={"fontWeight": "600"}),
-    ]),
-], style={"backgroundColor": C["bg"], "minHeight": "100vh"})
-
-
-# Display authenticated user + control admin-only visibility
-@callback([Output("navbar-user-display", "children"),
-    Output("res-manager-btn", "style"),
-    Output("settings-tab-content", "children"),
-    Output("settings-tab", "disabled"),
-    Output("settings-tab", "label_style")],
-    Input("tabs", "active_tab"))
-def show_user_and_admin_controls(tab):
+# app.layout is a function of the user: the page carries the navbar and only the
+# first tab's content. Other tabs are built on first activation (render_tab) and
+# stay in the page after that; ui.showTab bumps a shown tab's tab_shown marker so
+# its data callbacks re-sync. Tab content depends only on the role (and the
+# month the calendar opens on), so it is built once per (tab, role) per process.
+TABS = {
+    "tab-projects": ("Project Summary", lambda admin: tab_project_summary()),
+    "tab-resource": ("Resource Utilization", tab_resource),
+    "tab-analytics": ("Analytics", tab_analytics),
+    "tab-settings": ("Settings", tab_settings),
+}
+FIRST_TAB = "tab-projects"
+
+@functools.lru_cache(maxsize=32)
+def _tab_body(tab, admin, month):
+    return [TABS[tab][1](admin), dcc.Store(id=tab_shown(tab))]
+
+def tab_body(tab, admin):
+    # Keyed by month as well: the Resource tab opens on the current one
+    return _tab_body(tab, admin, date.today().strftime("%Y-%m"))
+
+def page(user, admin, rendered=(FIRST_TAB,)):
+    """Navbar + tabs, with content for the tabs in rendered (the rest are empty until shown)."""
+    muted = {"fontWeight": "600", "color": "#94A3B8"}
+    return html.Div([
+        dbc.Navbar(dbc.Container([
+            dbc.NavbarBrand([html.I(className="fas fa-palette me-2"), "Medical Creatives UT"], className="fw-bold text-white"),
+            html.Span(user, id="navbar-user-display", className="text-light small"),
+        ], fluid=True), color=C["primary"], dark=True, className="mb-0"),
+        dbc.Tabs(id="tabs", active_tab=FIRST_TAB, className="px-3 pt-2", children=[
+            dbc.Tab(html.Div(tab_body(tab, admin) if tab in rendered else None, id=f"{tab}-body"), label=label, tab_id=tab,
+                label_style=muted if tab == "tab-settings" and not admin else {"fontWeight": "600"})
+            for tab, (label, _) in TABS.items()]),
+        dcc.Store(id="tabs-built", data=list(rendered)), dcc.Store(id="tab-wanted"),
+    ], style={"backgroundColor": C["bg"], "minHeight": "100vh"})
+
+def serve_layout():
+    # Display authenticated user (+ Admin badge)
     uid = get_current_user()
     name = get_user_display_name(uid)
-    display = f"User: {uid}"
-    if name:
-        display = f"{name} ({uid})"
-
     admin = is_admin(uid)
-
-    # Navbar user display
-    parts = [html.Span(display)]
+    user = [html.Span(f"{name} ({uid})" if name else f"User: {uid}")]
     if admin:
-        parts.append(dbc.Badge("Admin", color="warning", className="ms-2", style={"fontSize": "10px"}))
+        user.append(dbc.Badge("Admin", color="warning", className="ms-2", style={"fontSize": "10px"}))
+    return page(user, admin)
 
-    # Manager View button visibility
-    mgr_style = {"display": "inline-block"} if admin else {"display": "none"}
+app.layout = serve_layout
 
-    # Settings tab: show content for admins, access denied for others
-    if admin:
-        settings_content = tab_settings()
-        tab_disabled = False
-        tab_label_style = {"fontWeight": "600"}
-    else:
-        settings_content = dbc.Container([
-            html.Div([
-                html.H4("Access Restricted", className="text-danger mt-4"),
-                html.P("Settings tab is available to administrators only.", className="text-muted"),
-            ], className="text-center py-5"),
-        ], fluid=True)
-        tab_disabled = False  # Keep clickable but show restricted message
-        tab_label_style = {"fontWeight": "600", "color": "#94A3B8"}
+# Showing a tab: clientside unless it was never rendered — then tab-wanted asks the server for it
+clientside_callback(ClientsideFunction("ui", "showTab"),
+    [Output(tab_shown(ALL), "data"), Output("tab-wanted", "data")],
+    Input("tabs", "active_tab"), State("tabs-built", "data"), prevent_initial_call=True)
 
-    return parts, mgr_style, settings_content, tab_disabled, tab_label_style
+@callback([Output(f"{tab}-body", "children") for tab in TABS] + [Output("tabs-built", "data")],
+    Input("tab-wanted", "data"), State("tabs-built", "data"), prevent_initial_call=True)
+def render_tab(tab, built):
+    if tab not in TABS or tab in built: return [dash.no_update] * (len(TABS) + 1)
+    return [tab_body(t, is_admin()) if t == tab else dash.no_update for t in TABS] + [built + [tab]]
+
+
+# ═══════════════════════════════════════════════════════════════════════
+#  PRELOAD (gunicorn preload_app)
+# ═══════════════════════════════════════════════════════════════════════
+def preload():
+    """
+    Run once in the gunicorn master, after the import and before any worker
+    forks (gunicorn.conf.py when_ready). Loads what the first requests would
+    otherwise load in every worker, so the workers share those pages
+    copy-on-write: plotly's lazily imported figure classes, the export
+    writers and the tab layouts. Then closes the diskcache SQLite handles the
+    import opened — a connection must not cross a fork (reopened on use).
+    """
+    import pyarrow.csv, pyarrow.parquet  # noqa: F401 — exports.py imports these on first download
+    go.Figure([go.Bar(), go.Scatter()])
+    for tab in TABS:
+        for admin in (False, True):
+            tab_body(tab, admin)
+    for manager in (job_manager, report_manager):
+        manager.handle.close()
 
 
 if __name__ == "__main__":
+    # Tabs render on demand, so in development the dev tools check callbacks
+    # against every tab (production keeps suppress_callback_exceptions: the
+    # validation layout would otherwise ride along in every index page)
+    app.validation_layout = page([], True, tuple(TABS))
+    app.config.suppress_callback_exceptions = False
     app.run(debug=True, host="0.0.0.0", port=8050)
@@ -0,0 +1,92 @@
+/*
+ * render.js — clientside rendering for the data stores (app.py)
+ * ==============================================================
+ * The server sends data (proj-store, proj-view, cal-store, *-lookup-store),
+ * tagged with a version so it is only sent when it changed; these functions
+ * build the component trees in the browser. Colours mirror C / TH in app.py.
+ */
+(function () {
+    var C = {primary: "#1E2761", accent: "#3B82F6"};
+    var TH = {backgroundColor: C.primary, color: "white", fontWeight: "bold", fontSize: "11px"};
+    var no_update = function () { return window.dash_clientside.no_update; };
+
+    function el(type, props, ns) {
+        return {type: type, namespace: ns || "dash_html_components", props: props || {}};
+    }
+    function dbc(type, props) { return el(type, props, "dash_bootstrap_components"); }
+    function pad(n) { return (n < 10 ? "0" : "") + n; }
+
+    // ── Projects table ──
+    var HEADERS = ["Project Name", "BU", "Status", "Complexity", "Designer", "QC Reviewer", "Date", "Actions"];
+    var ACTIONS = [["proj-view-btn", "fa-eye", "info"], ["proj-edit-btn", "fa-edit", "warning"], ["proj-del-btn", "fa-trash", "danger"]];
+
+    function projectRow(rid, cells) {
+        var tds = cells.map(function (c) { return el("Td", {children: c, className: "small"}); });
+        tds.push(el("Td", {className: "text-nowrap", children: ACTIONS.map(function (a, i) {
+            return dbc("Button", {id: {type: a[0], index: rid}, color: a[2], size: "sm",
+                outline: i === 2, className: i < 2 ? "me-1" : undefined,
+                children: [el("I", {className: "fas " + a[1]})]});
+        })}));
+        return el("Tr", {children: tds});
+    }
+
+    function projectTable(store, view) {
+        if (!store) return no_update();
+        var rows = store.rows || {};
+        var ids = view && view.ids ? view.ids : Object.keys(rows);
+        var body = [];
+        ids.forEach(function (rid) { if (rows[rid]) body.push(projectRow(rid, rows[rid])); });
+        if (!body.length) {
+            return dbc("Alert", {color: "info", children: view && view.searching ? "No projects match." : "No projects yet."});
+        }
+        return dbc("Table", {bordered: true, hover: true, responsive: true, size: "sm", className: "mt-2", children: [
+            el("Thead", {children: el("Tr", {children: HEADERS.map(function (h) { return el("Th", {children: h, style: TH}); })})}),
+            el("Tbody", {children: body})]});
+    }
+
+    // ── Calendar ──
+    function calendar(store) {
+        if (!store) return [no_update(), no_update()];
+        var year = store.year, mon = store.mon, days = store.days || {};
+        var now = new Date(), first = new Date(year, mon - 1, 1);
+        var lead = (first.getDay() + 6) % 7, count = new Date(year, mon, 0).getDate();
+        var header = el("Tr", {children: ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"].map(function (d) {
+            return el("Th", {children: d, className: "text-center small fw-bold text-muted", style: {padding: "8px"}});
+        })});
+        var rows = [], cells = [];
+        for (var slot = 0; slot < Math.ceil((lead + count) / 7) * 7; slot++) {
+            var day = slot - lead + 1;
+            if (day < 1 || day > count) {
+                cells.push(el("Td", {children: "", style: {backgroundColor: "#F1F5F9", height: "80px", width: "14.28%"}}));
+            } else {
+                var ds = year + "-" + pad(mon) + "-" + pad(day), entry = days[ds];
+                var today = now.getFullYear() === year && now.getMonth() + 1 === mon && now.getDate() === day;
+                var dc = [el("Div", {children: String(day), className: "fw-bold small" + (today ? " text-white" : ""),
+                    style: {backgroundColor: today ? C.accent : "transparent", borderRadius: "50%", width: "24px",
+                        height: "24px", display: "flex", alignItems: "center", justifyContent: "center"}})];
+                if (entry) {
+                    dc.push(dbc("Badge", {children: entry[0] + " | " + Math.round(entry[1]) + "h", color: "success",
+                        className: "mt-1", style: {fontSize: "9px"}}));
+                }
+                cells.push(el("Td", {children: el("Div", {children: dc, id: {type: "cal-day", index: ds}, className: "h-100",
+                        style: {cursor: "pointer", height: "70px", padding: "4px"}}),
+                    style: {backgroundColor: entry ? "#ECFDF5" : "white", border: today ? "2px solid " + C.accent : "1px solid #E2E8F0",
+                        verticalAlign: "top", width: "14.28%"}}));
+            }
+            if (cells.length === 7) { rows.push(el("Tr", {children: cells})); cells = []; }
+        }
+        return [dbc("Table", {bordered: true, className: "mb-0", style: {tableLayout: "fixed"},
+            children: [el("Thead", {children: header}), el("Tbody", {children: rows})]}), store.label];
+    }
+
+    // ── Dropdown options ──
+    function lookupOptions(store) {
+        var n = window.dash_clientside.callback_context.outputs_list.length;
+        if (!store) return Array(n).fill(no_update());
+        return store.options;
+    }
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {
+        mcut: {projectTable: projectTable, calendar: calendar, lookupOptions: lookupOptions}
+    });
+})();
@@ -0,0 +1,74 @@
+/*
+ * ui.js — pure-UI callbacks that run in the browser (app.py, namespace "ui")
+ * ==========================================================================
+ * Tab switches, toggles, modal closes, calendar month arithmetic, manager
+ * filter state and the live total previews: no server round trip, no worker
+ * slot. The saved totals are still computed on the server
+ * (_calc_project_totals, submit_resource); these only mirror them while the
+ * user types.
+ */
+(function () {
+    var no_update = function () { return window.dash_clientside.no_update; };
+    var triggered = function () {
+        var t = window.dash_clientside.callback_context.triggered;
+        return t && t.length ? t[0].prop_id.split(".")[0] : null;
+    };
+    // Which pattern-matching button fired, if it really was clicked (not just rendered)
+    var clicked = function () {
+        var t = window.dash_clientside.callback_context.triggered;
+        if (!t || !t.length || !t[0].value) return null;
+        try { return JSON.parse(t[0].prop_id.split(".")[0]); } catch (e) { return null; }
+    };
+    var int = function (v) { var n = parseFloat(v); return isFinite(n) ? Math.trunc(n) : 0; };
+    var num = function (v) { var n = parseFloat(v); return isFinite(n) ? n : 0; };
+    var pct = function (part, whole) { return whole > 0 ? Math.round(part / whole * 1000) / 10 : 0; };
+
+    window.dash_clientside = Object.assign({}, window.dash_clientside, {ui: {
+        openProjectForm: function () { return triggered() === "proj-new-btn"; },
+        toggle: function (n, isOpen) { return !isOpen; },
+        closeProjectModal: function () { return [false, null]; },
+        closeResourceModal: function () { return [false, "", null, ""]; },
+
+        // Bump the shown tab's tab_shown marker (its callbacks re-sync), or ask
+        // render_tab for the tab if it was never rendered
+        showTab: function (tab, built) {
+            var markers = window.dash_clientside.callback_context.outputs_list[0], stamp = Date.now();
+            var seen = (built || []).indexOf(tab) >= 0;
+            return [markers.map(function (o) { return o.id.index === tab ? stamp : no_update(); }),
+                seen ? no_update() : tab];
+        },
+
+        askDelete: function () {
+            var id = clicked();
+            return id ? [true, id.index] : [false, null];
+        },
+
+        navMonth: function (prev, next, y, m) {
+            if (triggered() === "cal-prev") return m === 1 ? [y - 1, 12] : [y, m - 1];
+            return m === 12 ? [y + 1, 1] : [y, m + 1];
+        },
+
+        clearMgrFilters: function () { return [null, null]; },
+        // "no filter" is always {} — the report_manager cache key
+        setMgrFilters: function (applyN, clearN, designer, bu) {
+            var f = {};
+            if (triggered() !== "mgr-clear-btn") {
+                if (designer) f.designer = designer;
+                if (bu) f.bu = bu;
+            }
+            return f;
+        },
+
+        // Mirrors _calc_project_totals: args = R1_Asset, R1..R11 Total, GD, POC
+        projectTotals: function (asset) {
+            var r = Array.prototype.slice.call(arguments, 1), assets = int(asset), gd = 0, poc = 0;
+            for (var i = 0; i < 11; i++) { assets += int(r[i]); gd += int(r[11 + i]); poc += int(r[22 + i]); }
+            return [pct(gd, assets), pct(poc, assets), assets, gd, poc];
+        },
+
+        // Mirrors submit_resource's TotalHours
+        totalHours: function () {
+            return Array.prototype.reduce.call(arguments, function (sum, v) { return sum + num(v); }, 0);
+        }
+    }});
+})();
@@ -0,0 +1,167 @@
+"""
+batch_check.py — Multi-table batches: parallel commit latency and idempotent replay
+===================================================================================
+Against a fresh local Delta store (benchmarks/synthetic_data.py):
+
+1. Latency of a "Move to QC" save — ReviewerState count bump + Projects row —
+   committed one table after the other (two single-table batches, the old
+   order) vs as one Batch. --latency adds a fixed delay to every Delta commit
+   (OneLake commits take tens to hundreds of ms; local ones take a few).
+2. Failure and replay: the Projects commit of a batch is made to fail (I/O),
+   then the batch is replayed — serially, again from a restored journal, and
+   from several threads at once. Each table must hold the batch's change
+   exactly once. A batch with bad data must fail without leaving a journal.
+
+Exit code 1 on any mismatch.
+
+    python benchmarks/batch_check.py
+    python benchmarks/batch_check.py --latency 0.2 --runs 10
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+os.environ.setdefault("STORAGE_BACKEND", "local")
+
+import synthetic_data  # noqa: E402
+
+SEED_ROWS = 200
+
+
+def _row(tag):
+    return {**synthetic_data.make_projects(1).iloc[0].to_dict(), "RowID": tag, "InternalStatus": "Move to QC"}
+
+
+def _state(backend):
+    return int(backend.read("ReviewerState")["Count"].astype(int).sum()), len(backend.read("Projects"))
+
+
+def latency(dbc, reviewer, runs, delay):
+    backend, write_delta = dbc.get_backend(), dbc.DeltaBackend.write_delta
+
+    def slow_write(self, *args, **kwargs):
+        time.sleep(delay)
+        return write_delta(self, *args, **kwargs)
+
+    dbc.DeltaBackend.write_delta = slow_write
+    try:
+        serial, batched = [], []
+        for i in range(runs):
+            t0 = time.perf_counter()
+            dbc.Batch().increment("ReviewerState", ("Reviewer", reviewer), "Count").commit()
+            dbc.Batch().append("Projects", _row(f"serial-{i}")).commit()
+            serial.append(time.perf_counter() - t0)
+            t0 = time.perf_counter()
+            (dbc.Batch().increment("ReviewerState", ("Reviewer", reviewer), "Count")
+                .append("Projects", _row(f"batch-{i}")).commit())
+            batched.append(time.perf_counter() - t0)
+    finally:
+        dbc.DeltaBackend.write_delta = write_delta
+    return statistics.median(serial), statistics.median(batched), backend
+
+
+def replay(dbc, backend, reviewer, replayers):
+    """[(check, got, want)] for a batch whose Projects commit failed, then replayed."""
+    checks = []
+    write_delta = dbc.DeltaBackend.write_delta
+
+    def failing(self, table_name, *args, **kwargs):
+        if table_name == "Projects":
+            raise OSError("injected Projects failure")
+        return write_delta(self, table_name, *args, **kwargs)
+
+    count0, rows0 = _state(backend)
+    batch = dbc.Batch().increment("ReviewerState", ("Reviewer", reviewer), "Count").append("Projects", _row("replayed"))
+    dbc.DeltaBackend.write_delta = failing
+    try:
+        batch.commit()
+        checks.append(("commit raised BatchError", False, True))
+    except dbc.BatchError as e:
+        checks.append(("commit raised BatchError", sorted(e.errors) == ["Projects"], True))
+    finally:
+        dbc.DeltaBackend.write_delta = write_delta
+    journal = dbc._journal_path(batch.key)
+    checks.append(("journal kept", os.path.exists(journal), True))
+    checks.append(("after failure: count, rows", _state(backend), (count0 + 1, rows0)))
+    saved = open(journal).read()
+
+    dbc.replay_batch(batch.key)
+    checks.append(("journal gone after replay", os.path.exists(journal), False))
+    checks.append(("after replay: count, rows", _state(backend), (count0 + 1, rows0 + 1)))
+
+    with open(journal, "w") as f:
+        f.write(saved)
+    dbc.replay_batch(batch.key)
+    checks.append(("after second replay", _state(backend), (count0 + 1, rows0 + 1)))
+
+    # Bad data fails the same way every time: reported, journal dropped
+    batch = dbc.Batch().append("Projects", {"RowID": "bad", "PageSlide": "not a number"})
+    try:
+        batch.commit()
+        checks.append(("bad data: not replayable", None, True))
+    except dbc.BatchError as e:
+        checks.append(("bad data: not replayable", not e.replayable, True))
+    checks.append(("bad data: journal dropped", os.path.exists(dbc._journal_path(batch.key)), False))
+
+    # A fresh failed batch, replayed by several workers at once
+    batch = dbc.Batch().increment("ReviewerState", ("Reviewer", reviewer), "Count").append("Projects", _row("raced"))
+    dbc._write_journal(batch.key, batch.changes)
+    with ThreadPoolExecutor(replayers) as pool:
+        outcomes = list(pool.map(lambda _: _try_replay(dbc, batch.key), range(replayers)))
+    checks.append((f"{replayers} concurrent replays", _state(backend), (count0 + 2, rows0 + 2)))
+    checks.append(("replays that raised", sum(o is not None for o in outcomes), 0))
+    return checks
+
+
+def _try_replay(dbc, key):
+    try:
+        dbc.replay_batch(key)
+    except FileNotFoundError:  # another replayer finished first
+        pass
+    except Exception as e:
+        return e
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--latency", type=float, default=0.1, help="seconds added to every Delta commit")
+    ap.add_argument("--replayers", type=int, default=4)
+    args = ap.parse_args()
+
+    root = tempfile.mkdtemp(prefix="mcut-batch-")
+    os.environ["BATCH_JOURNAL_DIR"] = os.path.join(root, "journal")
+    try:
+        synthetic_data.generate(root, SEED_ROWS)
+        import db_connection as dbc
+        dbc.BATCH_JOURNAL_DIR = os.environ["BATCH_JOURNAL_DIR"]
+        dbc._backend = dbc.LocalDeltaBackend(root)
+        reviewer = dbc.get_backend().read("ReviewerState")["Reviewer"].iloc[0]
+
+        serial, batched, backend = latency(dbc, reviewer, args.runs, args.latency)
+        print(f"Move to QC save, {args.latency * 1000:.0f} ms per commit (median of {args.runs})")
+        print(f"  serial  {serial * 1000:>8.1f} ms")
+        print(f"  batch   {batched * 1000:>8.1f} ms  ({serial / batched:.2f}x)\n")
+
+        ok = True
+        for name, got, want in replay(dbc, backend, reviewer, args.replayers):
+            print(f"{name:<30} {str(got):>12}  (expected {want})")
+            ok &= got == want
+        print("OK" if ok else "FAILED")
+        sys.exit(0 if ok else 1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
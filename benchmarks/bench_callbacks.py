@@ -0,0 +1,213 @@
+"""
+bench_callbacks.py — Time the key Dash callbacks against synthetic local Delta tables
+=====================================================================================
+For each size, generates Projects / ResourceUtilization with that many rows
+(benchmarks/synthetic_data.py, cached under --data-dir), points the app at it
+through the local storage backend and calls the callbacks directly inside a
+Flask request context carrying an admin's RStudio-Connect-Credentials header.
+
+Background callbacks (manager report, project writes) run in job processes,
+so calling them in-process would hide what a job pays. They are timed over
+HTTP instead against a one-worker gunicorn on the same data: dispatch, then
+polls until the job answers, like the browser (benchmarks/load_test.py).
+
+"cold" runs clear the table cache first (read + render), "warm" runs hit it.
+Over HTTP a cold run bumps the tables' generation files (clear_cache), so the
+server and its job workers reload them.
+
+    python benchmarks/bench_callbacks.py                          # 1k 10k 100k
+    python benchmarks/bench_callbacks.py --sizes 1k 1m --repeats 5
+    python benchmarks/bench_callbacks.py --save base.json
+    python benchmarks/bench_callbacks.py --baseline base.json     # exit 1 on p95 regressions
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from contextvars import copy_context
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+os.environ.setdefault("STORAGE_BACKEND", "local")
+BENCH_USER = os.environ.setdefault("BENCH_USER", "l034698")
+os.environ.setdefault("RLS_ADMINS", BENCH_USER)
+
+import report  # noqa: E402
+import synthetic_data  # noqa: E402
+from load_test import _call, _outputs  # noqa: E402
+from startup_bench import ROOT, _free_port, _stop, _wait_ok  # noqa: E402
+
+WRITE_CALLBACKS = {"submit_p", "save_pe"}
+
+
+def _trigger(prop_id, value=1):
+    from dash._callback_context import context_value
+    from dash._utils import AttributeDict
+    context_value.set(AttributeDict(triggered_inputs=[{"prop_id": prop_id, "value": value}]))
+
+
+def _scenarios(app, row_id):
+    """name -> (prop_id that triggered it, zero-arg call)."""
+    y, m = synthetic_data.BENCH_YEAR, 6
+    edit_id = json.dumps({"index": row_id, "type": "proj-edit-btn"}, separators=(",", ":"))
+    return {
+        "sync_pt": ("proj-refresh-btn.n_clicks", lambda: app.sync_pt(None, None, None)),
+        "search_pt": ("proj-search.value", lambda: app.search_pt(None, None, "00", *[None] * 5)),
+        "sync_cal": ("cal-month.data", lambda: app.sync_cal(y, m, None, None, None)),
+        "open_pm": (f"{edit_id}.n_clicks", lambda: app.open_pm([], [1])),
+        "load_dd": ("proj-refresh-btn.n_clicks", lambda: app.load_dd(None, None, None, None)),
+        "render_tab": ("tab-wanted.data", lambda: app.render_tab("tab-resource", [])),
+    }
+
+
+def _background_scenarios(app, row_id):
+    """name -> (prop_id that triggered it, run i -> Input + State values; [(id, value)] for ALL)."""
+    y, m = synthetic_data.BENCH_YEAR, 6
+    submit_args = [1] + [None] * len(app._proj_states)
+    submit_args[2] = "Bench project"
+    field = {"index": "Comments", "type": "proj-edit-field"}
+    return {
+        # a run tag in the filters misses the report memo, so every call runs a job
+        "load_mgr": ("manager-collapse.is_open", lambda i: [True, y, m, {"run": i}]),
+        "submit_p": ("proj-submit-btn.n_clicks", lambda i: submit_args),
+        "save_pe": ("proj-modal-save.n_clicks", lambda i: [1, row_id, [(field, f"bench edit {i}")], [(field, field)], None]),
+    }
+
+
+def _payload(name, prop_id, values):
+    """/_dash-update-component body for the callback function called name."""
+    from dash._callback import GLOBAL_CALLBACK_MAP
+    output, spec = next((k, v) for k, v in GLOBAL_CALLBACK_MAP.items()
+        if getattr(v.get("callback"), "__name__", None) == name)
+
+    def item(dep, value):
+        if '["ALL"]' in dep["id"]:
+            return [{"id": i, "property": dep["property"], "value": v} for i, v in value]
+        return {**dep, "value": value}
+    deps = spec["inputs"] + spec["state"]
+    items = [item(d, v) for d, v in zip(deps, values)]
+    return {"output": output, "outputs": _outputs(output), "inputs": items[:len(spec["inputs"])],
+        "state": items[len(spec["inputs"]):], "changedPropIds": [prop_id]}
+
+
+def _time(app, prop_id, fn, cold):
+    import db_operations
+    headers = {"RStudio-Connect-Credentials": json.dumps({"user": BENCH_USER})}
+    with app.server.test_request_context(headers=headers):
+        if cold:
+            db_operations.clear_cache()
+        def run():
+            _trigger(prop_id)
+            t0 = time.perf_counter()
+            fn()
+            return time.perf_counter() - t0
+        return copy_context().run(run)
+
+
+def _server(root, scratch):
+    """One-worker gunicorn on root, sharing this process's CACHE_GEN_DIR. Returns (process, url)."""
+    port = _free_port()
+    env = {**os.environ, "LOCAL_DELTA_ROOT": root, "GUNICORN_WORKERS": "1",
+        "METRICS_DIR": os.path.join(scratch, "metrics"), "BACKGROUND_CACHE_DIR": os.path.join(scratch, "jobs"),
+        "TABLE_LOCK_DIR": os.path.join(scratch, "locks")}
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}",
+        "--log-level", "warning", "app:server"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f"http://127.0.0.1:{port}"
+    _wait_ok(url + "/_dash-layout")
+    return proc, url
+
+
+def bench_background(label, root, row_id, repeats, write_repeats, only):
+    """Background callbacks over HTTP: dispatch → job → polled result."""
+    import requests
+    import db_operations
+    import app as dash_app
+    scratch = tempfile.mkdtemp(prefix="mcut-bench-http-")
+    proc, url = _server(root, scratch)
+    http = requests.Session()
+    http.headers["RStudio-Connect-Credentials"] = json.dumps({"user": BENCH_USER})
+    results, run = [], 0
+    try:
+        for name, (prop_id, values) in _background_scenarios(dash_app, row_id).items():
+            if only and name not in only:
+                continue
+            n = write_repeats if name in WRITE_CALLBACKS else repeats
+            for mode in ("cold", "warm"):
+                if name in WRITE_CALLBACKS and mode == "warm":
+                    continue  # writes always re-read the table
+                times = []
+                for _ in range(n):
+                    run += 1
+                    if mode == "cold":
+                        db_operations.clear_cache()
+                    t0 = time.perf_counter()
+                    if not _call(http, url, _payload(name, prop_id, values(run)), poll=0.02):
+                        raise RuntimeError(f"{name} failed over HTTP")
+                    times.append(time.perf_counter() - t0)
+                results.append({"size": label, "callback": name, "mode": mode, **report.summarize(times)})
+                print(f"  {label:>5} {name:<10} {mode:<5} p50 {results[-1]['p50_ms']:>9.1f} ms (HTTP)", flush=True)
+    finally:
+        _stop(proc)
+        shutil.rmtree(scratch, ignore_errors=True)
+    return results
+
+
+def bench_size(label, rows, data_dir, repeats, write_repeats, only):
+    import db_connection
+    import db_operations
+    import app as dash_app
+    root = synthetic_data.ensure(os.path.join(data_dir, label), rows)
+    db_connection._backend = db_connection.LocalDeltaBackend(root)
+    db_operations.clear_cache()
+    row_id = db_operations._get_cached(db_operations.PROJECTS_TABLE)["RowID"].iloc[0]
+    results = []
+    for name, (prop_id, fn) in _scenarios(dash_app, row_id).items():
+        if only and name not in only:
+            continue
+        for mode in ("cold", "warm"):
+            times = [_time(dash_app, prop_id, fn, cold=mode == "cold") for _ in range(repeats)]
+            results.append({"size": label, "callback": name, "mode": mode, **report.summarize(times)})
+            print(f"  {label:>5} {name:<10} {mode:<5} p50 {results[-1]['p50_ms']:>9.1f} ms", flush=True)
+    results += bench_background(label, root, row_id, repeats, write_repeats, only)
+    if WRITE_CALLBACKS & set(only or WRITE_CALLBACKS):
+        synthetic_data.generate(root, rows)  # writes appended rows; leave the data set as generated
+    return results
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", nargs="+", default=["1k", "10k", "100k"], choices=list(synthetic_data.SIZES))
+    ap.add_argument("--repeats", type=int, default=5)
+    ap.add_argument("--write-repeats", type=int, default=2)
+    ap.add_argument("--callbacks", nargs="*", help="subset of callbacks to time")
+    ap.add_argument("--data-dir", default=os.path.join(HERE, "..", "bench_lakehouse"))
+    ap.add_argument("--save", help="write results JSON here")
+    ap.add_argument("--baseline", help="compare with a saved results JSON")
+    ap.add_argument("--tolerance", type=float, default=0.2, help="allowed p95 growth vs baseline")
+    args = ap.parse_args()
+
+    os.environ.setdefault("CACHE_GEN_DIR", tempfile.mkdtemp(prefix="mcut-bench-gen-"))  # shared with the server
+    results = []
+    for label in args.sizes:
+        results += bench_size(label, synthetic_data.SIZES[label], args.data_dir,
+            args.repeats, args.write_repeats, args.callbacks)
+    keys = ["size", "callback", "mode"]
+    report.print_table(results, keys)
+    if args.save:
+        report.save(args.save, results)
+    if args.baseline:
+        bad = report.regressions(args.baseline, results, keys, args.tolerance)
+        for r, b in bad:
+            print(f"REGRESSION {r['size']} {r['callback']} {r['mode']}: p95 {b['p95_ms']} → {r['p95_ms']} ms")
+        sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+bench_http_pool.py — Pooled session vs. per-call connections for OneLake I/O
+=============================================================================
+Runs db_connection's parquet read / write paths against the local OneLake stub,
+once through the shared keep-alive session and once with module-level
+requests.* calls (a new connection per request, as before pooling).
+
+    python benchmarks/bench_http_pool.py --ops 200 --latency 0.002
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from onelake_stub import start_stub  # noqa: E402
+
+
+def _run(dbc, table, df, ops):
+    times, errors = [], 0
+    for _ in range(ops):
+        t0 = time.perf_counter()
+        try:
+            dbc._write_parquet_fallback(table, df)
+            dbc._read_parquet_fallback(table)
+        except Exception:
+            errors += 1
+        times.append(time.perf_counter() - t0)
+    return times, errors
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--ops", type=int, default=200, help="write+read round trips per mode")
+    ap.add_argument("--rows", type=int, default=500)
+    ap.add_argument("--latency", type=float, default=0.0, help="stub delay per request (s)")
+    ap.add_argument("--fail-every", type=int, default=0, help="stub answers every Nth request with 503")
+    args = ap.parse_args()
+
+    stub = start_stub(latency=args.latency, fail_every=args.fail_every)
+    os.environ["ONELAKE_DFS_URL"] = stub.url
+    os.environ["AZURE_AUTHORITY_HOST"] = stub.url
+
+    import pandas as pd
+    import requests
+    import db_connection as dbc
+
+    df = pd.DataFrame({"RowID": [str(i) for i in range(args.rows)], "Value": range(args.rows)})
+    pooled_session = dbc._session
+
+    results = {}
+    for mode in ("unpooled", "pooled"):
+        dbc._token_cache.clear()
+        dbc._session = (lambda: requests) if mode == "unpooled" else pooled_session
+        conns_before, reqs_before = stub.connections, stub.requests
+        times, errors = _run(dbc, f"bench_{mode}", df, args.ops)
+        results[mode] = (times, errors, stub.connections - conns_before, stub.requests - reqs_before)
+    dbc._session = pooled_session
+
+    print(f"{'mode':<10}{'ops':>6}{'errors':>8}{'requests':>10}{'conns':>8}{'mean ms':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for mode, (times, errors, conns, reqs) in results.items():
+        ms = sorted(t * 1000 for t in times)
+        print(f"{mode:<10}{len(ms):>6}{errors:>8}{reqs:>10}{conns:>8}{statistics.mean(ms):>10.2f}"
+              f"{ms[len(ms) // 2]:>9.2f}{ms[int(len(ms) * 0.95) - 1]:>9.2f}")
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+bench_read_tables.py — Cold multi-table reads: one after another vs read_tables
+===============================================================================
+1. Local Delta tables (benchmarks/synthetic_data.py), --latency added to every
+   Delta read (a OneLake read takes far longer than a local one): a worker's
+   warm-up (all WARM_TABLES) and the project edit modal (Projects + Lookups)
+   with a cold cache, table by table (_get_cached) vs get_tables.
+2. OneLake backend against the local stub with the tables only in
+   Files/app_data parquet and a Delta probe that fails after --probe seconds:
+   the first read of each table (Delta probe, then parquet) vs the later ones
+   (format hint → parquet straight away).
+
+    python benchmarks/bench_read_tables.py
+    python benchmarks/bench_read_tables.py --latency 0.2 --probe 0.5 --runs 10
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+os.environ.setdefault("STORAGE_BACKEND", "local")
+
+import synthetic_data  # noqa: E402
+from onelake_stub import start_stub  # noqa: E402
+
+
+def _slow(dbc, delay, fail=False):
+    """Patch DeltaBackend.read_delta to take delay seconds longer (and fail); returns the original."""
+    read_delta = dbc.DeltaBackend.read_delta
+
+    def slow(self, *args, **kwargs):
+        time.sleep(delay)
+        if fail:
+            raise OSError("no Delta table")
+        return read_delta(self, *args, **kwargs)
+
+    dbc.DeltaBackend.read_delta = slow
+    return read_delta
+
+
+def cold_reads(ops, tables, runs):
+    """(median table-by-table seconds, median get_tables seconds) with a cold cache."""
+    serial, together = [], []
+    for _ in range(runs):
+        ops._cache.clear()
+        t0 = time.perf_counter()
+        for tn in tables:
+            ops._get_cached(tn, copy=False)
+        serial.append(time.perf_counter() - t0)
+        ops._cache.clear()
+        t0 = time.perf_counter()
+        ops.get_tables(tables, copy=False)
+        together.append(time.perf_counter() - t0)
+    return statistics.median(serial), statistics.median(together)
+
+
+def format_hint(dbc, frames, runs):
+    """(median first read, median hinted read, Delta probes per hinted round) of frames' tables on OneLake."""
+    backend, tables = dbc.OneLakeBackend(), list(frames)
+    for tn, df in frames.items():
+        dbc._write_parquet_fallback(tn, df)
+    probes = []
+    read_delta = dbc.DeltaBackend.read_delta
+
+    def counted(self, *args, **kwargs):
+        probes.append(args[0])
+        return read_delta(self, *args, **kwargs)
+
+    dbc.DeltaBackend.read_delta = counted
+    first, hinted, hinted_probes = [], [], 0
+    try:
+        for _ in range(runs):
+            backend._parquet_since.clear()
+            t0 = time.perf_counter()
+            for tn in tables:
+                backend.read(tn)
+            first.append(time.perf_counter() - t0)
+            del probes[:]
+            t0 = time.perf_counter()
+            for tn in tables:
+                backend.read(tn)
+            hinted.append(time.perf_counter() - t0)
+            hinted_probes += len(probes)
+    finally:
+        dbc.DeltaBackend.read_delta = read_delta
+    return statistics.median(first), statistics.median(hinted), hinted_probes / runs
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=5)
+    ap.add_argument("--latency", type=float, default=0.1, help="seconds added to every Delta read (part 1)")
+    ap.add_argument("--probe", type=float, default=0.3, help="seconds a failing Delta probe takes (part 2)")
+    ap.add_argument("--size", default="1k", choices=list(synthetic_data.SIZES))
+    ap.add_argument("--data-dir", default=os.path.join(os.path.dirname(HERE), "bench_lakehouse"))
+    args = ap.parse_args()
+
+    os.environ.setdefault("CACHE_GEN_DIR", tempfile.mkdtemp(prefix="mcut-read-gen-"))
+    root = synthetic_data.ensure(os.path.join(args.data_dir, args.size), synthetic_data.SIZES[args.size])
+    import db_connection as dbc
+    import db_operations as ops
+    dbc._backend = dbc.LocalDeltaBackend(root)
+
+    original = _slow(dbc, args.latency)
+    try:
+        print(f"Cold cache, {args.latency * 1000:.0f} ms added per Delta read (median of {args.runs})")
+        print(f"{'':<26} {'one by one ms':>14} {'get_tables ms':>14}")
+        for label, tables in (("warm-up (WARM_TABLES)", ops.WARM_TABLES),
+                ("edit modal", [ops.PROJECTS_TABLE, ops.LOOKUPS_TABLE])):
+            serial, together = cold_reads(ops, tables, args.runs)
+            print(f"{label:<26} {serial * 1000:>14.1f} {together * 1000:>14.1f}  ({serial / together:.2f}x)")
+    finally:
+        dbc.DeltaBackend.read_delta = original
+
+    frames = {tn: dbc._backend.read(tn) for tn in ops.WARM_TABLES}
+    stub = start_stub()
+    dbc.ONELAKE_DFS, dbc.AUTHORITY_HOST = stub.url, stub.url
+    original = _slow(dbc, args.probe, fail=True)
+    try:
+        first, hinted, probes = format_hint(dbc, frames, args.runs)
+    finally:
+        dbc.DeltaBackend.read_delta = original
+        stub.shutdown()
+    print(f"\nOneLake, parquet-only tables, Delta probe fails after {args.probe * 1000:.0f} ms "
+        f"({len(ops.WARM_TABLES)} tables, median of {args.runs})")
+    print(f"  first read (probe + parquet)  {first * 1000:>8.1f} ms")
+    print(f"  hinted read (parquet)         {hinted * 1000:>8.1f} ms  ({probes:.0f} Delta probes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,168 @@
+"""
+callback_census.py — Server round trips per user session
+========================================================
+Reads the app's /_dash-dependencies (no server, no data needed) and replays a
+scripted session of UI interactions against it. Each interaction triggers the
+callbacks listening on it, then whatever listens on their outputs (chained
+callbacks), and is counted as:
+
+  server      — POST /_dash-update-component
+  background  — same, plus at least one job poll (counted as 2 requests)
+  clientside  — runs in the browser, no request
+
+Callbacks that would return no_update still count (the request is made), but
+only callbacks whose ids are all on the page can fire. Where tabs are rendered
+on first activation (app.TABS / app.tab_body), the page starts with the served
+layout, and a tab's first activation adds its ids and runs their initial
+callbacks; later activations bump its tab_shown marker. Compare two trees with
+--app-dir:
+
+    python benchmarks/callback_census.py
+    python benchmarks/callback_census.py --app-dir /path/to/older/checkout
+"""
+
+import argparse
+import json
+import os
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# (what the user does, "component-id.property" it changes; pattern ids by their "type")
+SESSION = [
+    ("open new project form", "proj-new-btn.n_clicks"),
+    *[("type a revision count", "proj-r1-total.value")] * 4,
+    ("cancel form", "proj-cancel-btn.n_clicks"),
+    ("view a project", "proj-view-btn.n_clicks"),
+    ("close modal", "proj-modal-close.n_clicks"),
+    ("edit a project", "proj-edit-btn.n_clicks"),
+    ("close modal", "proj-modal-close.n_clicks"),
+    ("delete → confirm dialog", "proj-del-btn.n_clicks"),
+    ("cancel delete", "proj-cancel-delete.n_clicks"),
+    ("resource tab", "tabs.active_tab=tab-resource"),
+    ("next month", "cal-next.n_clicks"),
+    ("next month", "cal-next.n_clicks"),
+    ("previous month", "cal-prev.n_clicks"),
+    ("open a day", "cal-day.n_clicks"),
+    *[("type hours", "res-meetings.value")] * 3,
+    ("close day", "res-modal-close.n_clicks"),
+    ("manager view", "res-manager-btn.n_clicks"),
+    ("apply filters", "mgr-apply-btn.n_clicks"),
+    ("clear filters", "mgr-clear-btn.n_clicks"),
+    ("close manager view", "res-manager-btn.n_clicks"),
+    ("projects tab", "tabs.active_tab=tab-projects"),
+    ("resource tab again", "tabs.active_tab=tab-resource"),
+]
+
+
+def _id(cid):
+    """Component id as a key: the id, "type" for a wildcard pattern, "type:index" for a fixed dict id."""
+    if isinstance(cid, str) and cid.startswith("{"):
+        cid = json.loads(cid)
+    if not isinstance(cid, dict):
+        return cid
+    return cid["type"] if isinstance(cid.get("index"), list) else f"{cid['type']}:{cid['index']}"
+
+
+def _key(cid, prop):
+    return f"{_id(cid)}.{prop.split('@')[0]}"
+
+
+def layout_ids(component):
+    """Keys of every component id in a layout tree."""
+    ids, stack = set(), [component]
+    while stack:
+        c = stack.pop()
+        if isinstance(c, (list, tuple)):
+            stack += c
+        elif hasattr(c, "to_plotly_json"):
+            cid = getattr(c, "id", None)
+            if cid is not None:
+                ids.add(_id(cid))
+            stack.append(getattr(c, "children", None))
+    return ids
+
+
+def load_app(app_dir):
+    """(dependencies, ids on the first page, {tab: its ids} for tabs rendered on demand)."""
+    sys.path.insert(0, app_dir)
+    os.environ.setdefault("STORAGE_BACKEND", "local")
+    import app
+    deps = app.server.test_client().get("/_dash-dependencies").get_json()
+    for d in deps:
+        out = d["output"]
+        parts = [p.rsplit(".", 1) for p in (out[2:-2].split("...") if out.startswith("..") else [out])]
+        d["_outputs"] = {_key(*p) for p in parts}
+        d["_inputs"] = {_key(i["id"], i["property"]) for i in d["inputs"]}
+        # pattern ids (rendered rows, calendar days) may be absent; fixed ids must be on the page
+        d["_needs"] = {_id(c) for c in [p[0] for p in parts] + [i["id"] for i in d["inputs"] + d["state"]]
+            if not str(c).startswith("{") or ":" in _id(c)}
+        d["_kind"] = "clientside" if d.get("clientside_function") else "background" if d.get("background") else "server"
+    with app.server.test_request_context():
+        page = app.app.layout() if callable(app.app.layout) else app.app.layout
+    tabs = {t: layout_ids(app.tab_body(t, True)) for t in app.TABS} if hasattr(app, "tab_body") else {}
+    return deps, layout_ids(page), tabs
+
+
+def fire(deps, changed, present, fired=None, unchanged=()):
+    """Callbacks run for these changed props, chained through their outputs (each once)."""
+    fired, queue, seen = fired if fired is not None else [], list(changed), set(changed) | set(unchanged)
+    while queue:
+        prop = queue.pop(0)
+        for d in deps:
+            if prop in d["_inputs"] and d["_needs"] <= present and not any(d is f for f in fired):
+                fired.append(d)
+                queue += [o for o in d["_outputs"] if o not in seen]
+                seen |= d["_outputs"]
+    return fired
+
+
+def initial(deps, ids, present):
+    """Initial calls for ids just added to the page, and what they chain into."""
+    first = [d for d in deps if not d.get("prevent_initial_call") and d["_needs"] <= present
+        and {o.rsplit(".", 1)[0] for o in d["_inputs"] | d["_outputs"]} & ids]
+    return fire(deps, set().union(set(), *(d["_outputs"] for d in first)), present, list(first))
+
+
+def census(deps, page, tabs):
+    rows, present = [], set(page)
+    built = {t for t, ids in tabs.items() if ids <= present}
+    steps = [("page load", initial(deps, present, present))]
+    for label, prop in SESSION:
+        prop, _, tab = prop.partition("=")
+        # ui.showTab answers tab-wanted only for a tab never rendered
+        fired = fire(deps, {prop}, present, unchanged={"tab-wanted.data"} if tab in built else ())
+        if tab in tabs and tab not in built:
+            built.add(tab)
+            present |= tabs[tab]
+            fired += [d for d in initial(deps, tabs[tab], present) if not any(d is f for f in fired)]
+        elif tab in tabs:
+            fired = fire(deps, {f"tab-shown:{tab}.data"}, present, fired)
+        steps.append((label, fired))
+    for label, fired in steps:
+        kinds = [d["_kind"] for d in fired]
+        rows.append({"interaction": label, "server": kinds.count("server"), "background": kinds.count("background"),
+            "clientside": kinds.count("clientside")})
+    return rows
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--app-dir", default=os.path.dirname(HERE), help="checkout whose app.py to census")
+    args = ap.parse_args()
+
+    deps, page, tabs = load_app(os.path.abspath(args.app_dir))
+    kinds = [d["_kind"] for d in deps]
+    print(f"callbacks: {len(deps)}  server {kinds.count('server')}  background {kinds.count('background')}  "
+        f"clientside {kinds.count('clientside')}\n")
+    rows = census(deps, page, tabs)
+    print(f"{'interaction':<26} {'server':>6} {'bg':>4} {'client':>6}")
+    for r in rows:
+        print(f"{r['interaction']:<26} {r['server']:>6} {r['background']:>4} {r['clientside']:>6}")
+    server, bg = sum(r["server"] for r in rows), sum(r["background"] for r in rows)
+    print(f"\nsession: {len(SESSION)} interactions after page load → {server + 2 * bg} requests "
+        f"({server} server callbacks, {bg} background × 2), {sum(r['clientside'] for r in rows)} clientside")
+
+
+if __name__ == "__main__":
+    main()
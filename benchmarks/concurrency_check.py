@@ -0,0 +1,215 @@
+"""
+concurrency_check.py — Concurrent writers must not lose rows or QC assignments
+==============================================================================
+Runs submit_project ("Move to QC", so every call also bumps ReviewerState),
+submit_resource and update_project from many threads at once against a fresh
+local Delta store, then checks every write landed:
+
+  Projects rows           = seeded + submitted
+  ReviewerState counts    = submitted
+  ResourceUtilization     = seeded + submitted
+  each updated project    = its own Comments value (and one ProjectHistory entry)
+
+Then edits one project from several "open modals" at once (optimistic edits):
+
+  different fields        → all merged into the row
+  same field, two values  → one saved, one rejected as a conflict
+
+Then submits a burst of equal-weight "Move to QC" projects at once and checks
+they were spread by open QC load: every reviewer who got one must have had
+the lowest load when they did (final load − one project ≤ lowest final load).
+
+With --processes N the same runs in N processes (the gunicorn-workers case,
+covered by the flock half of table_lock). Exit code 1 on any mismatch.
+
+    python benchmarks/concurrency_check.py --threads 16 --writes 48
+    python benchmarks/concurrency_check.py --processes 2 --threads 8
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+sys.path.insert(0, os.path.dirname(HERE))
+
+os.environ.setdefault("STORAGE_BACKEND", "local")
+BENCH_USER = os.environ.setdefault("BENCH_USER", "l034698")
+os.environ.setdefault("RLS_ADMINS", BENCH_USER)
+
+import synthetic_data  # noqa: E402
+
+SEED_ROWS = 200
+BALANCE_DESIGNER = synthetic_data.DESIGNERS[-1]  # not a QC reviewer
+
+
+def _as_user(server, fn, *args):
+    headers = {"RStudio-Connect-Credentials": json.dumps({"user": BENCH_USER})}
+    with server.test_request_context(headers=headers):
+        return fn(*args)
+
+
+def _worker(root, tag, threads, writes, row_ids):
+    """Run one process's share of writes. Returns the list of failures."""
+    import db_connection
+    import db_operations as ops
+    from flask import Flask
+    db_connection._backend = db_connection.LocalDeltaBackend(root)
+    server = Flask(__name__)
+
+    # full rows, like the forms send
+    meta = ["RowID", "CreatedBy", "CreatedAt", "UpdatedBy", "UpdatedAt"]
+    p_row = synthetic_data.make_projects(1).drop(columns=meta).iloc[0].to_dict()
+    r_row = synthetic_data.make_resources(1).drop(columns=meta).iloc[0].to_dict()
+
+    def project(i):
+        return _as_user(server, ops.submit_project, {**p_row,
+            "ProjectName": f"{tag}-p{i}", "InternalStatus": "Move to QC",
+            "DesignerAssigned": synthetic_data.DESIGNERS[i % len(synthetic_data.DESIGNERS)]})
+
+    def resource(i):
+        return _as_user(server, ops.submit_resource, {**r_row,
+            "Date": f"{synthetic_data.BENCH_YEAR}-06-{i % 28 + 1:02d}"})
+
+    def update(i):
+        return _as_user(server, ops.update_project, row_ids[i], {"Comments": f"{tag}-u{i}"})
+
+    jobs = [(project, i) for i in range(writes)] + [(resource, i) for i in range(writes)]
+    jobs += [(update, i) for i in range(len(row_ids))]
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda j: j[0](j[1]), jobs))
+    return [r for r in results if r.get("status") != "success"]
+
+
+def _balance_worker(root, tag, threads, submits):
+    """Concurrent equal-weight Move to QC submits by a designer outside the reviewer pool."""
+    import db_connection
+    import db_operations as ops
+    from flask import Flask
+    db_connection._backend = db_connection.LocalDeltaBackend(root)
+    server = Flask(__name__)
+    meta = ["RowID", "CreatedBy", "CreatedAt", "UpdatedBy", "UpdatedAt"]
+    row = {**synthetic_data.make_projects(1).drop(columns=meta).iloc[0].to_dict(),
+        "InternalStatus": "Move to QC", "DesignerAssigned": BALANCE_DESIGNER}
+    with ThreadPoolExecutor(threads) as pool:
+        results = list(pool.map(lambda i: _as_user(server, ops.submit_project,
+            {**row, "ProjectName": f"{tag}-qc{i}"}), range(submits)))
+    return [r for r in results if r.get("status") != "success"]
+
+
+def _balance(projects, reviewers):
+    """Reviewers handed a burst project while someone else had a lower open load."""
+    import qc_scheduler
+    open_qc = projects[projects["InternalStatus"].astype(str).str.strip().str.upper() == qc_scheduler.OPEN_STATUS]
+    load = qc_scheduler.weights(open_qc).groupby(open_qc["QCReviewer"]).sum().reindex(reviewers, fill_value=0.0)
+    burst = open_qc[open_qc["ProjectName"].str.match(r"w\d+-qc\d+$")]
+    w = float(qc_scheduler.weights(burst).max())
+    return sorted(r for r in set(burst["QCReviewer"]) if load[r] - w > load.min() + 1e-9)
+
+
+def _merge_check(root, threads):
+    """Concurrent modal saves on one project. Returns (fields merged, clash results)."""
+    import pandas as pd
+    import db_connection
+    import db_operations as ops
+    from flask import Flask
+    db_connection._backend = db_connection.LocalDeltaBackend(root)
+    server = Flask(__name__)
+    meta = {"RowID", "CreatedBy", "CreatedAt", "UpdatedBy", "UpdatedAt"}
+
+    def opened(rid):
+        df = db_connection._backend.read("Projects")
+        row = df[df["RowID"] == rid].iloc[0]
+        return {"values": {c: "" if pd.isna(v) else str(v) for c, v in row.items() if c not in meta},
+            "UpdatedAt": str(row["UpdatedAt"]), "version": df.attrs.get("delta_version")}
+
+    def save(rid, base, field, value):  # the modal sends every field back
+        return _as_user(server, ops.update_project, rid, {**base["values"], field: value}, base)
+
+    df = db_connection._backend.read("Projects")
+    rid = df["RowID"].iloc[0]
+    fields = [c for c in df.columns if c not in meta and pd.api.types.is_string_dtype(df[c])][:threads]
+    base = opened(rid)
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(lambda f: save(rid, base, f, f"merged-{f}"), fields))
+    row = db_connection._backend.read("Projects").set_index("RowID").loc[rid]
+    merged = sum(row[f] == f"merged-{f}" for f in fields)
+
+    base = opened(rid)
+    with ThreadPoolExecutor(2) as pool:
+        clash = list(pool.map(lambda v: save(rid, base, fields[0], v), ["mine", "theirs"]))
+    return merged, len(fields), clash
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--threads", type=int, default=16)
+    ap.add_argument("--writes", type=int, default=32, help="projects and resources submitted per process")
+    ap.add_argument("--updates", type=int, default=16, help="distinct projects updated per process")
+    ap.add_argument("--qc-burst", type=int, default=12, help="Move to QC projects submitted at once per process")
+    ap.add_argument("--processes", type=int, default=1)
+    args = ap.parse_args()
+
+    root = tempfile.mkdtemp(prefix="mcut-concurrency-")
+    os.environ["TABLE_LOCK_DIR"] = os.path.join(root, "locks")
+    try:
+        synthetic_data.generate(root, SEED_ROWS)
+        import db_connection
+        backend = db_connection.LocalDeltaBackend(root)
+        ids = backend.read("Projects")["RowID"].tolist()
+        shares = [ids[p * args.updates:(p + 1) * args.updates] for p in range(args.processes)]
+        work = [(root, f"w{p}", args.threads, args.writes, shares[p]) for p in range(args.processes)]
+        if args.processes == 1:
+            failures = _worker(*work[0])
+        else:
+            with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+                failures = [f for fs in pool.starmap(_worker, work) for f in fs]
+
+        expected = args.writes * args.processes
+        projects = backend.read("Projects")
+        checks = {
+            "failed calls": (len(failures), 0),
+            "Projects rows": (len(projects), SEED_ROWS + expected),
+            "ReviewerState count": (int(backend.read("ReviewerState")["Count"].astype(int).sum()), expected),
+            "ResourceUtilization rows": (len(backend.read("ResourceUtilization")), SEED_ROWS + expected),
+        }
+        comments = dict(zip(projects["RowID"], projects["Comments"]))
+        lost = sum(comments.get(rid) != f"w{p}-u{i}" for p, share in enumerate(shares) for i, rid in enumerate(share))
+        checks["lost updates"] = (lost, 0)
+        history = backend.read("ProjectHistory")
+        logged = history[(history["Op"] == "update") & history["NewValue"].str.match(r"w\d+-u\d+$")]
+        checks["updates in ProjectHistory"] = (len(logged), args.updates * args.processes)
+        merged, fields, clash = _merge_check(root, args.threads)
+        checks["same-row fields merged"] = (merged, fields)
+        checks["same-field edits saved"] = (sum(r["status"] == "success" for r in clash), 1)
+        failures += [r for r in clash if "since you opened" not in r["message"] and r["status"] != "success"]
+
+        burst = [(root, f"w{p}", args.threads, args.qc_burst) for p in range(args.processes)]
+        if args.processes == 1:
+            failures += _balance_worker(*burst[0])
+        else:
+            with multiprocessing.get_context("spawn").Pool(args.processes) as pool:
+                failures += [f for fs in pool.starmap(_balance_worker, burst) for f in fs]
+        reviewers = backend.read("ReviewerState")["Reviewer"].tolist()
+        checks["QC burst over-assigned"] = (len(_balance(backend.read("Projects"), reviewers)), 0)
+        checks["failed calls"] = (len(failures), 0)
+        ok = True
+        for name, (got, want) in checks.items():
+            print(f"{name:<26} {got:>6}  (expected {want})")
+            ok &= got == want
+        for f in failures[:5]:
+            print("  ", f)
+        print("OK" if ok else "FAILED")
+        sys.exit(0 if ok else 1)
+    finally:
+        shutil.rmtree(root, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,163 @@
+"""
+load_test.py — Concurrent users against a running server
+=========================================================
+Each simulated user loads the page (/, /_dash-layout, /_dash-dependencies) and
+then replays the main read callbacks in a loop through /_dash-update-component
+(background callbacks are polled until their job answers, like the browser does),
+sending an RStudio-Connect-Credentials header like Posit Connect does.
+Reports p50/p95/p99 latency per callback plus overall throughput.
+
+    # server on local synthetic data
+    python benchmarks/synthetic_data.py --rows 10000 --root ./bench_lakehouse/10k
+    STORAGE_BACKEND=local LOCAL_DELTA_ROOT=./bench_lakehouse/10k gunicorn -c gunicorn.conf.py app:server
+
+    python benchmarks/load_test.py --url http://127.0.0.1:8000 --users 20 --duration 60
+    python benchmarks/load_test.py ... --save run.json / --baseline run.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, HERE)
+
+import report  # noqa: E402
+from synthetic_data import BENCH_YEAR  # noqa: E402
+
+# callback (by its first output) -> (input that triggers it, input / state values by "id.property").
+# Tab switches trigger the tab's tab-shown store, as in the browser: a
+# Refresh click would force a storage read every time.
+PROJECTS_SHOWN = '{"index":"tab-projects","type":"tab-shown"}.data'
+SCENARIOS = {
+    "projects_tab": ("proj-store.data", PROJECTS_SHOWN, {"proj-refresh-btn.n_clicks": None, PROJECTS_SHOWN: 1}),
+    "dropdowns": ("proj-lookup-store.data", PROJECTS_SHOWN, {
+        "proj-new-btn.n_clicks": None, "proj-refresh-btn.n_clicks": None, PROJECTS_SHOWN: 1}),
+    "resource_tab": ("tab-projects-body.children", "tab-wanted.data", {"tab-wanted.data": "tab-resource", "tabs-built.data": []}),
+    "calendar": ("cal-store.data", "cal-month.data", {
+        "cal-year.data": BENCH_YEAR, "cal-month.data": 6, "res-refresh-btn.n_clicks": None}),
+    "manager": ("manager-summary-content.children", "manager-collapse.is_open", {
+        "manager-collapse.is_open": True, "cal-year.data": BENCH_YEAR, "cal-month.data": 6,
+        "mgr-filters.data": {}}),
+}
+
+
+def _outputs(output):
+    """Dash output string → payload 'outputs' (dict for one output, list for several)."""
+    if output.startswith(".."):
+        parts = [p for p in output.strip(".").split("...")]
+        return [dict(zip(("id", "property"), p.rsplit(".", 1))) for p in parts]
+    return dict(zip(("id", "property"), output.rsplit(".", 1)))
+
+
+def build_payloads(dependencies):
+    """Match SCENARIOS against /_dash-dependencies and build request bodies."""
+    payloads = {}
+    for name, (first_output, trigger, values) in SCENARIOS.items():
+        dep = next((d for d in dependencies if d["output"].strip(".").split("...")[0] == first_output), None)
+        if dep is None:
+            print(f"skipping {name}: no callback with output {first_output}")
+            continue
+        def vals(items):
+            return [{"id": json.loads(i["id"]) if i["id"].startswith("{") else i["id"], "property": i["property"],
+                     "value": values.get(f"{i['id']}.{i['property']}")} for i in items]
+        payloads[name] = {
+            "output": dep["output"], "outputs": _outputs(dep["output"]),
+            "inputs": vals(dep["inputs"]), "state": vals(dep.get("state", [])),
+            "changedPropIds": [trigger],
+        }
+    return payloads
+
+
+def _call(http, url, body, poll=0.1):
+    """POST one callback; background callbacks are polled every poll seconds until their job answers."""
+    r = http.post(url + "/_dash-update-component", json=body, timeout=300)
+    if r.status_code != 200 or "cacheKey" not in r.text:
+        return r.status_code in (200, 204)
+    job = r.json()
+    params = {"cacheKey": job["cacheKey"], "job": job["job"]}
+    while True:
+        r = http.post(url + "/_dash-update-component", json=body, params=params, timeout=300)
+        if r.status_code != 200 or "response" in r.json():
+            return r.status_code in (200, 204)
+        time.sleep(poll)
+
+
+def user_loop(url, user, payloads, deadline, think, samples, errors, lock):
+    http = requests.Session()
+    http.headers["RStudio-Connect-Credentials"] = json.dumps({"user": user})
+    for path in ("/", "/_dash-layout", "/_dash-dependencies"):
+        t0 = time.perf_counter()
+        ok = http.get(url + path, timeout=300).ok
+        with lock:
+            samples.setdefault("page_load", []).append(time.perf_counter() - t0)
+            if not ok:
+                errors["page_load"] = errors.get("page_load", 0) + 1
+    while time.time() < deadline:
+        for name, body in payloads.items():
+            t0 = time.perf_counter()
+            try:
+                ok = _call(http, url, body)
+            except requests.RequestException:
+                ok = False
+            with lock:
+                samples.setdefault(name, []).append(time.perf_counter() - t0)
+                if not ok:
+                    errors[name] = errors.get(name, 0) + 1
+            if think:
+                time.sleep(think)
+            if time.time() >= deadline:
+                break
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--url", default="http://127.0.0.1:8000")
+    ap.add_argument("--users", type=int, default=10)
+    ap.add_argument("--duration", type=float, default=30, help="seconds")
+    ap.add_argument("--think", type=float, default=0.0, help="pause between requests per user (s)")
+    ap.add_argument("--user", default=os.getenv("BENCH_USER", "l034698"),
+        help="user id sent in RStudio-Connect-Credentials")
+    ap.add_argument("--save")
+    ap.add_argument("--baseline")
+    ap.add_argument("--tolerance", type=float, default=0.2)
+    args = ap.parse_args()
+
+    url = args.url.rstrip("/")
+    deps = requests.get(url + "/_dash-dependencies", timeout=60,
+        headers={"RStudio-Connect-Credentials": json.dumps({"user": args.user})}).json()
+    payloads = build_payloads(deps)
+
+    samples, errors, lock = {}, {}, threading.Lock()
+    start = time.time()
+    threads = [threading.Thread(target=user_loop, args=(url, args.user, payloads, start + args.duration,
+        args.think, samples, errors, lock), daemon=True) for _ in range(args.users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    wall = time.time() - start
+
+    rows = [{"users": args.users, "callback": name, "errors": errors.get(name, 0), **report.summarize(s, wall)}
+            for name, s in samples.items()]
+    all_samples = [x for s in samples.values() for x in s]
+    rows.append({"users": args.users, "callback": "ALL", "errors": sum(errors.values()),
+        **report.summarize(all_samples, wall)})
+    keys = ["users", "callback"]
+    report.print_table(rows, keys)
+    if args.save:
+        report.save(args.save, rows)
+    if args.baseline:
+        bad = report.regressions(args.baseline, rows, keys, args.tolerance)
+        for r, b in bad:
+            print(f"REGRESSION {r['callback']} @ {r['users']} users: p95 {b['p95_ms']} → {r['p95_ms']} ms")
+        sys.exit(1 if bad else 0)
+
+
+if __name__ == "__main__":
+    main()
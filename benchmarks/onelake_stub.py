@@ -0,0 +1,141 @@
+"""
+onelake_stub.py — Local stand-in for the OneLake DFS + Azure AD token endpoints
+================================================================================
+Just enough of the ADLS Gen2 file API (GET / PUT ?resource=file / PATCH append
++ flush / DELETE) and the client-credentials token POST for db_connection's
+parquet paths to run against it over plain HTTP/1.1 keep-alive.
+
+    python benchmarks/onelake_stub.py --port 8765
+    ONELAKE_DFS_URL=http://127.0.0.1:8765 AZURE_AUTHORITY_HOST=http://127.0.0.1:8765 python app.py
+
+--latency adds a fixed delay per request; --fail-every N answers every Nth
+request with 503 so retry behaviour can be exercised.
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+
+class OneLakeStub(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, latency=0.0, fail_every=0):
+        super().__init__(addr, _Handler)
+        self.files = {}
+        self.latency = latency
+        self.fail_every = fail_every
+        self.requests = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    disable_nagle_algorithm = True  # headers and body go out in separate writes
+
+    def setup(self):
+        super().setup()
+        with self.server._lock:
+            self.server.connections += 1
+
+    def log_message(self, *args):
+        pass
+
+    def _begin(self):
+        with self.server._lock:
+            self.server.requests += 1
+            n = self.server.requests
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length) if length else b""
+        if self.server.fail_every and n % self.server.fail_every == 0:
+            self._reply(503)
+            return None, None
+        url = urlparse(self.path)
+        return url, body
+
+    def _reply(self, status, body=b"", content_type="application/octet-stream"):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if body:
+            self.wfile.write(body)
+
+    def do_POST(self):
+        url, _ = self._begin()
+        if url is None:
+            return
+        if url.path.endswith("/oauth2/v2.0/token"):
+            token = json.dumps({"access_token": f"stub-{time.time()}", "expires_in": 3600}).encode()
+            return self._reply(200, token, "application/json")
+        self._reply(404)
+
+    def do_GET(self):
+        url, _ = self._begin()
+        if url is None:
+            return
+        if "resource=filesystem" in (url.query or ""):
+            return self._reply(200, b"{}", "application/json")
+        data = self.server.files.get(url.path)
+        if data is None or isinstance(data, bytearray):
+            return self._reply(404)
+        self._reply(200, data)
+
+    def do_PUT(self):
+        url, _ = self._begin()
+        if url is None:
+            return
+        self.server.files[url.path] = bytearray()
+        self._reply(201)
+
+    def do_PATCH(self):
+        url, body = self._begin()
+        if url is None:
+            return
+        q = parse_qs(url.query)
+        staged = self.server.files.get(url.path)
+        if staged is None:
+            return self._reply(404)
+        action = q.get("action", [""])[0]
+        if action == "append":
+            staged.extend(body)
+            return self._reply(202)
+        if action == "flush":
+            self.server.files[url.path] = bytes(staged)
+            return self._reply(200)
+        self._reply(400)
+
+    def do_DELETE(self):
+        url, _ = self._begin()
+        if url is None:
+            return
+        self._reply(200 if self.server.files.pop(url.path, None) is not None else 404)
+
+
+def start_stub(host="127.0.0.1", port=0, latency=0.0, fail_every=0):
+    """Start the stub on a background thread and return the server."""
+    server = OneLakeStub((host, port), latency=latency, fail_every=fail_every)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0)
+    ap.add_argument("--fail-every", type=int, default=0)
+    args = ap.parse_args()
+    srv = OneLakeStub((args.host, args.port), latency=args.latency, fail_every=args.fail_every)
+    print(f"OneLake stub on {srv.url}")
+    srv.serve_forever()
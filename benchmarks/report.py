@@ -0,0 +1,58 @@
+"""
+report.py — Latency summaries and baseline comparison shared by the benchmarks
+===============================================================================
+"""
+
+import json
+
+
+def percentile(sorted_values, q):
+    """Nearest-rank percentile of an already sorted list (q in 0..100)."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+def summarize(seconds, wall=None):
+    """p50/p95/p99/mean in ms; throughput (req/s) when the wall time is given."""
+    ms = sorted(s * 1000 for s in seconds)
+    out = {
+        "n": len(ms),
+        "p50_ms": round(percentile(ms, 50), 2),
+        "p95_ms": round(percentile(ms, 95), 2),
+        "p99_ms": round(percentile(ms, 99), 2),
+        "mean_ms": round(sum(ms) / len(ms), 2) if ms else 0.0,
+    }
+    if wall:
+        out["throughput_rps"] = round(len(ms) / wall, 2)
+    return out
+
+
+def print_table(rows, key_cols):
+    """rows: list of dicts. Prints key columns followed by the latency columns."""
+    cols = key_cols + ["n", "p50_ms", "p95_ms", "p99_ms", "mean_ms"]
+    if any("throughput_rps" in r for r in rows):
+        cols.append("throughput_rps")
+    if any("errors" in r for r in rows):
+        cols.append("errors")
+    print("".join(f"{c:>16}" for c in cols))
+    for r in rows:
+        print("".join(f"{str(r.get(c, '')):>16}" for c in cols))
+
+
+def save(path, rows):
+    with open(path, "w") as f:
+        json.dump(rows, f, indent=2)
+
+
+def regressions(baseline_path, rows, key_cols, tolerance=0.2, metric="p95_ms"):
+    """Rows whose metric grew more than tolerance (fraction) over the saved baseline."""
+    with open(baseline_path) as f:
+        base = {tuple(r[k] for k in key_cols): r for r in json.load(f)}
+    found = []
+    for r in rows:
+        b = base.get(tuple(r[k] for k in key_cols))
+        if b and b.get(metric) and r[metric] > b[metric] * (1 + tolerance):
+            found.append((r, b))
+    return found
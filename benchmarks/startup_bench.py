@@ -0,0 +1,190 @@
+"""
+startup_bench.py — Import profile, worker boot / recycle time and worker memory
+===============================================================================
+1. Import profile: `python -X importtime -c "import app"`, summed per top-level
+   package (self time) plus the slowest modules by cumulative time.
+2. gunicorn with GUNICORN_PRELOAD=0 and =1 (gunicorn.conf.py, local Delta
+   tables from benchmarks/synthetic_data.py):
+     boot     start → first /_dash-layout answered (1 worker)
+     recycle  worker SIGKILLed → its replacement answers (1 worker, median)
+     memory   --workers workers, once settled: per-worker USS (private pages)
+              and PSS (shared pages split between the processes sharing them)
+
+    python benchmarks/startup_bench.py
+    python benchmarks/startup_bench.py --workers 8 --recycles 10
+    python benchmarks/startup_bench.py --import-only --top 30
+"""
+
+import argparse
+import os
+import signal
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+sys.path.insert(0, HERE)
+sys.path.insert(0, ROOT)
+
+import synthetic_data  # noqa: E402
+
+
+# ── Import profile ──
+def import_profile(env):
+    """[(self_us, cumulative_us, depth, module)] in import order, and the wall time of `import app`."""
+    t0 = time.perf_counter()
+    out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app"], cwd=ROOT, env=env,
+        capture_output=True, text=True, check=True).stderr
+    wall = time.perf_counter() - t0
+    rows = []
+    for line in out.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cum_us, name = line[len("import time:"):].split("|", 2)
+        rows.append((int(self_us), int(cum_us), (len(name) - len(name.lstrip()) - 1) // 2, name.strip()))
+    return rows, wall
+
+
+def print_import_profile(rows, wall, top):
+    by_package = defaultdict(int)
+    for self_us, _, _, name in rows:
+        by_package[name.split(".")[0]] += self_us
+    total = sum(by_package.values())
+    print(f"import app: {wall * 1000:.0f} ms wall (interpreter start included), {total / 1000:.0f} ms importing\n")
+    print(f"{'package':<32} {'self ms':>8} {'share':>6}")
+    for package, us in sorted(by_package.items(), key=lambda kv: -kv[1])[:top]:
+        print(f"{package:<32} {us / 1000:>8.1f} {us / total:>6.1%}")
+    print(f"\n{'module (cumulative)':<48} {'ms':>8}")
+    for _, cum_us, depth, name in sorted(rows, key=lambda r: -r[1])[:top]:
+        print(f"{'  ' * min(depth, 6) + name:<48} {cum_us / 1000:>8.1f}")
+
+
+# ── gunicorn ──
+def _free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def _wait_ok(url, timeout=120):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if requests.get(url, timeout=5).ok:
+                return True
+        except requests.RequestException:
+            pass
+        time.sleep(0.01)
+    raise TimeoutError(url)
+
+
+def _workers(master):
+    out = subprocess.run(["pgrep", "-P", str(master)], capture_output=True, text=True).stdout
+    return [int(p) for p in out.split()]
+
+
+def _memory(pid):
+    """(USS, PSS) in MB from /proc/<pid>/smaps_rollup."""
+    kb = {}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                kb[parts[0].rstrip(":")] = int(parts[1])
+    return (kb.get("Private_Clean", 0) + kb.get("Private_Dirty", 0)) / 1024, kb.get("Pss", 0) / 1024
+
+
+def _gunicorn(env, preload, workers):
+    port = _free_port()
+    env = {**env, "GUNICORN_PRELOAD": "1" if preload else "0", "GUNICORN_WORKERS": str(workers)}
+    proc = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "gunicorn.conf.py", "-b", f"127.0.0.1:{port}",
+        "--log-level", "warning", "app:server"], cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return proc, f"http://127.0.0.1:{port}/_dash-layout"
+
+
+def _stop(proc):
+    proc.send_signal(signal.SIGTERM)
+    try:
+        proc.wait(30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def boot_and_recycle(env, preload, recycles):
+    t0 = time.perf_counter()
+    proc, url = _gunicorn(env, preload, 1)
+    try:
+        _wait_ok(url)
+        boot = time.perf_counter() - t0
+        times = []
+        for _ in range(recycles):
+            old = _workers(proc.pid)
+            t0 = time.perf_counter()
+            for pid in old:
+                os.kill(pid, signal.SIGKILL)
+            while set(_workers(proc.pid)) & set(old):
+                time.sleep(0.005)
+            _wait_ok(url)
+            times.append(time.perf_counter() - t0)
+        return boot, statistics.median(times)
+    finally:
+        _stop(proc)
+
+
+def worker_memory(env, preload, workers, settle=3.0):
+    proc, url = _gunicorn(env, preload, workers)
+    try:
+        _wait_ok(url)
+        while len(_workers(proc.pid)) < workers:
+            time.sleep(0.05)
+        for _ in range(workers * 4):  # every worker renders a layout, warms its caches
+            requests.get(url, headers={"Connection": "close"}, timeout=60)
+        last, stable_since = None, time.perf_counter()
+        while time.perf_counter() - stable_since < settle:   # until total PSS stops moving
+            pss = sum(_memory(p)[1] for p in _workers(proc.pid))
+            if last is None or abs(pss - last) > 0.01 * last:
+                last, stable_since = pss, time.perf_counter()
+            time.sleep(0.25)
+        per_worker = [_memory(p) for p in _workers(proc.pid)]
+        return statistics.mean(u for u, _ in per_worker), statistics.mean(p for _, p in per_worker), _memory(proc.pid)[1]
+    finally:
+        _stop(proc)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--top", type=int, default=15, help="rows per import table")
+    ap.add_argument("--workers", type=int, default=4, help="workers for the memory run")
+    ap.add_argument("--recycles", type=int, default=5)
+    ap.add_argument("--size", default="1k", choices=list(synthetic_data.SIZES))
+    ap.add_argument("--data-dir", default=os.path.join(ROOT, "bench_lakehouse"))
+    ap.add_argument("--import-only", action="store_true")
+    args = ap.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix="mcut-startup-")
+    env = {**os.environ, "STORAGE_BACKEND": "local",
+        "LOCAL_DELTA_ROOT": synthetic_data.ensure(os.path.join(args.data_dir, args.size), synthetic_data.SIZES[args.size]),
+        "METRICS_DIR": os.path.join(scratch, "metrics"), "BACKGROUND_CACHE_DIR": os.path.join(scratch, "jobs")}
+    rows, wall = import_profile(env)
+    print_import_profile(rows, wall, args.top)
+    if args.import_only:
+        return
+
+    print(f"\n{'gunicorn':<12} {'boot ms':>8} {'recycle ms':>11} {'worker USS MB':>14} {'worker PSS MB':>14} {'master PSS MB':>14}")
+    for preload in (False, True):
+        boot, recycle = boot_and_recycle(env, preload, args.recycles)
+        uss, pss, master = worker_memory(env, preload, args.workers)
+        print(f"{'preload' if preload else 'no preload':<12} {boot * 1000:>8.0f} {recycle * 1000:>11.0f} "
+            f"{uss:>14.1f} {pss:>14.1f} {master:>14.1f}", flush=True)
+    print(f"\nmemory with {args.workers} workers; recycle = median of {args.recycles}")
+
+
+if __name__ == "__main__":
+    main()
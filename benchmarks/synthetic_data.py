@@ -0,0 +1,152 @@
+"""
+synthetic_data.py — Synthetic Projects / ResourceUtilization tables on a local Delta store
+==========================================================================================
+Writes the four app tables under a directory the LocalDeltaBackend can serve
+(STORAGE_BACKEND=local LOCAL_DELTA_ROOT=<dir>), with the same columns the
+app's forms write. Dates fall in BENCH_YEAR so benchmarks can pick a month.
+
+    python benchmarks/synthetic_data.py --rows 10000 --root ./bench_lakehouse/10k
+"""
+
+import argparse
+import os
+import sys
+import uuid
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BENCH_YEAR = 2025
+SIZES = {"1k": 1_000, "10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+DESIGNERS = ["Anoosha Gopinath", "Aswin VM", "Karthikeyan M", "Muthamilselvan Uthandam", "Shashi Vishwakarma",
+    "Subhajit Das", "Vinothkumar A", "Chandesh Sirasapalli", "Manoj K", "Giridhar S", "Priya R", "Rahul N"]
+LOOKUPS = {
+    "BU": ["Oncology", "Immunology", "Neuroscience", "Diabetes", "Cardio"],
+    "ProjectType": ["New", "Revision", "Derivative"],
+    "ClassificationMedia": ["Print", "Digital", "Video", "Email"],
+    "TacticType": ["Leave Behind", "Banner", "Detail Aid", "Slide Deck"],
+    "InternalStatus": ["WIP", "Move to QC", "QC Done", "Completed", "On Hold"],
+    "AssignerName": ["Lead A", "Lead B", "Lead C"],
+    "DesignerAssigned": DESIGNERS,
+    "QCReviewer": DESIGNERS[:9],
+    "MailSent": ["Yes", "No"],
+    "TacticStage": ["Concept", "Layout", "Final"],
+    "Stakeholder": ["Brand", "Medical", "Legal"],
+    "Complexity": ["Simple", "Medium", "Complex"],
+    "ContentStatus": ["Draft", "Approved"],
+    "Revision1": ["Yes", "No"], "Revision2": ["Yes", "No"], "Revision3OrMore": ["Yes", "No"],
+    "ReportingManager": ["Manager X", "Manager Y"],
+}
+HOUR_FIELDS = ["ProjectTaskNA", "StakeholderTouchpoints", "InternalTeamMeetings", "GCHTrainings",
+    "ToolsTechTesting", "InnovationProcessImprovement", "CrossFunctionalSupports", "SiteGCHActivities",
+    "TownhallsHRIT", "OneOne", "SuccessFactorLinkedIn", "OtherTrainings", "HiringOnboarding",
+    "LeavesHolidays", "OpenTime"]
+
+
+def _dates(rng, n):
+    days = rng.integers(0, 365, n)
+    return (pd.Timestamp(f"{BENCH_YEAR}-01-01") + pd.to_timedelta(days, unit="D")).strftime("%Y-%m-%d")
+
+
+def _pick(rng, values, n):
+    return np.asarray(values, dtype=object)[rng.integers(0, len(values), n)]
+
+
+def _row_ids(n):
+    return [str(uuid.uuid4()) for _ in range(n)]
+
+
+def make_projects(n, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "AssignedDate": _dates(rng, n),
+        "ProjectName": [f"Project {i:07d}" for i in range(n)],
+        "ProjectID": [f"PID-{i:07d}" for i in range(n)],
+        "VeevaID": [f"VV-{i:07d}" for i in range(n)],
+        "PageSlide": rng.integers(1, 40, n),
+        "FirstProofDue": _dates(rng, n),
+        "Comments": _pick(rng, ["", "urgent", "client review pending", "resize banner set"], n),
+    })
+    for field in ["BU", "ProjectType", "ClassificationMedia", "TacticType", "InternalStatus", "AssignerName",
+                  "DesignerAssigned", "QCReviewer", "MailSent", "TacticStage", "Stakeholder", "Complexity",
+                  "ContentStatus", "Revision1", "Revision2", "Revision3OrMore"]:
+        df[field] = _pick(rng, LOOKUPS[field], n)
+    df["QCEmailer"] = ""
+    df["R1_Asset"] = rng.integers(0, 5, n)
+    for i in range(1, 12):
+        if i <= 4:
+            for f in ["Simple", "Medium", "Complex", "Derivatives"]:
+                df[f"R{i}_{f}"] = rng.integers(0, 4, n)
+        df[f"R{i}_Total"] = rng.integers(0, 10, n) if i <= 4 else rng.integers(0, 2, n)
+        df[f"R{i}_GDRework"] = rng.integers(0, 3, n) if i <= 4 else 0
+        df[f"R{i}_POCRework"] = rng.integers(0, 3, n) if i <= 4 else 0
+    df["TotalAssets"] = df[[f"R{i}_Total" for i in range(1, 12)]].sum(axis=1) + df["R1_Asset"]
+    df["TotalGDRework"] = df[[f"R{i}_GDRework" for i in range(1, 12)]].sum(axis=1)
+    df["TotalPOCRework"] = df[[f"R{i}_POCRework" for i in range(1, 12)]].sum(axis=1)
+    safe = df["TotalAssets"].where(df["TotalAssets"] > 0)
+    df["GDReworkPct"] = (df["TotalGDRework"] / safe * 100).round(1).fillna(0)
+    df["POCReworkPct"] = (df["TotalPOCRework"] / safe * 100).round(1).fillna(0)
+    stamp = f"{BENCH_YEAR}-01-01 00:00:00"
+    df["RowID"] = _row_ids(n)
+    df["CreatedBy"] = df["UpdatedBy"] = "bench"
+    df["CreatedAt"] = df["UpdatedAt"] = stamp
+    return df
+
+
+def make_resources(n, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Date": _dates(rng, n),
+        "BU": _pick(rng, LOOKUPS["BU"], n),
+        "DesignerName": _pick(rng, DESIGNERS, n),
+        "ReportingManager": _pick(rng, LOOKUPS["ReportingManager"], n),
+    })
+    for f in HOUR_FIELDS:
+        df[f] = rng.integers(0, 3, n).astype(float)
+    df["TotalHours"] = df[HOUR_FIELDS].sum(axis=1)
+    stamp = f"{BENCH_YEAR}-01-01 00:00:00"
+    df["RowID"] = _row_ids(n)
+    df["CreatedBy"] = df["UpdatedBy"] = "bench"
+    df["CreatedAt"] = df["UpdatedAt"] = stamp
+    return df
+
+
+def make_lookups():
+    rows = [(f, v) for f, vals in LOOKUPS.items() for v in vals]
+    return pd.DataFrame({"FieldName": [r[0] for r in rows], "Value": [r[1] for r in rows],
+        "UpdatedBy": "bench", "UpdatedAt": f"{BENCH_YEAR}-01-01 00:00:00"})
+
+
+def make_reviewer_state():
+    names = sorted(LOOKUPS["QCReviewer"])
+    return pd.DataFrame({"Reviewer": names, "Count": [0] * len(names)})
+
+
+def generate(root, rows, seed=0):
+    """Write all four tables under root (overwriting). Returns root."""
+    from db_connection import LocalDeltaBackend
+    backend = LocalDeltaBackend(root)
+    backend.write("Projects", make_projects(rows, seed))
+    backend.write("ResourceUtilization", make_resources(rows, seed + 1))
+    backend.write("Lookups", make_lookups())
+    backend.write("ReviewerState", make_reviewer_state())
+    return backend.root
+
+
+def ensure(root, rows, seed=0):
+    """Generate root unless it already holds the tables."""
+    if os.path.isdir(os.path.join(root, "Projects", "_delta_log")):
+        return os.path.abspath(root)
+    return generate(root, rows, seed)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=10_000)
+    ap.add_argument("--root", default="./bench_lakehouse/custom")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+    print(f"Wrote {args.rows} rows per table to {generate(args.root, args.rows, args.seed)}")
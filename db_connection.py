@@ -4,15 +4,32 @@ db_connection.py
 Connects to Microsoft Fabric Lakehouse via Delta Lake (deltalake library).
 Writes proper Delta tables to Tables/dbo/{table_name} — visible in SQL endpoint & Power BI.
 Falls back to parquet in Files/ if deltalake write fails.
+read_tables reads several tables at once on a thread pool.
+STORAGE_BACKEND=local keeps the same Delta tables in a local directory instead (no Fabric needed).
+Batch commits changes to several tables together — in parallel, journaled, replayable.
 """
 
 import os
 import io
+import json
 import time
+import uuid
+import random
 import logging
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor, wait
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import pandas as pd
+import pyarrow as pa
+from deltalake import CommitProperties, DeltaTable, Transaction, write_deltalake
+from deltalake.exceptions import CommitFailedError
+
+import metrics
 
 try:
     from dotenv import load_dotenv
@@ -30,44 +47,139 @@ WORKSPACE_NAME = os.getenv("FABRIC_WORKSPACE_NAME", "DPA_PowerPlatform")
 LAKEHOUSE_NAME = os.getenv("FABRIC_LAKEHOUSE_NAME", "MC_ProjectManagement_LH")
 APP_USER = os.getenv("APP_USER", "unknown")
 
-ONELAKE_DFS = "https://onelake.dfs.fabric.microsoft.com"
+ONELAKE_DFS = os.getenv("ONELAKE_DFS_URL", "https://onelake.dfs.fabric.microsoft.com")
+AUTHORITY_HOST = os.getenv("AZURE_AUTHORITY_HOST", "https://login.microsoftonline.com")
 ABFSS_BASE = f"abfss://{WORKSPACE_NAME}@onelake.dfs.fabric.microsoft.com/{LAKEHOUSE_NAME}.Lakehouse"
 
-# ── Token Cache ───────────────────────────────────────────────────────
-_token_cache = {}
+# ── HTTP Session ──────────────────────────────────────────────────────
+# One keep-alive connection pool per worker process for OneLake DFS and the
+# token endpoint, with retry + exponential backoff on throttling / 5xx.
+HTTP_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+HTTP_BACKOFF = float(os.getenv("HTTP_BACKOFF", "0.5"))
 
+_session_obj = None
+_session_pid = None
+_session_lock = threading.Lock()
 
-def _get_token(scope):
-    """Get Azure AD token with caching."""
-    cached = _token_cache.get(scope)
-    if cached and cached["expires"] > time.time():
-        return cached["token"]
 
-    resp = requests.post(
-        f"https://login.microsoftonline.com/{FABRIC_TENANT_ID}/oauth2/v2.0/token",
-        data={
-            "grant_type": "client_credentials",
-            "client_id": FABRIC_CLIENT_ID,
-            "client_secret": FABRIC_CLIENT_SECRET,
-            "scope": scope,
-        },
-        timeout=30,
+def _new_session():
+    retry = Retry(
+        total=HTTP_RETRIES, backoff_factor=HTTP_BACKOFF,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD", "PUT", "PATCH", "DELETE", "POST"}),
+        respect_retry_after_header=True, raise_on_status=False,
     )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _session():
+    """Shared pooled session. Rebuilt after fork so workers never share sockets."""
+    global _session_obj, _session_pid
+    if _session_obj is None or _session_pid != os.getpid():
+        with _session_lock:
+            if _session_obj is None or _session_pid != os.getpid():
+                _session_obj = _new_session()
+                _session_pid = os.getpid()
+    return _session_obj
+
+
+# ── Token Manager ─────────────────────────────────────────────────────
+# Tokens are fetched once per scope under a per-scope lock (single flight) and
+# renewed by a background thread at TOKEN_REFRESH_AT of their lifetime, so user
+# requests only ever read the cached value. The Delta reader / writer reuse one
+# storage_options dict whose bearer_token is swapped in place on renewal.
+STORAGE_SCOPE = "https://storage.azure.com/.default"
+TOKEN_REFRESH_AT = float(os.getenv("TOKEN_REFRESH_AT", "0.8"))
+TOKEN_RETRY_SECONDS = 30
+
+_token_cache = {}   # scope -> {"token", "refresh_at", "expires"}
+_token_locks = {}   # scope -> Lock
+_token_refresher_pid = None
+_STORAGE_OPTIONS = {"use_fabric_endpoint": "true"}
+
+
+def _fetch_token(scope):
+    """POST to the token endpoint and store the result. Call with the scope lock held."""
+    with metrics.timed("token_fetch_seconds"):
+        resp = _session().post(
+            f"{AUTHORITY_HOST}/{FABRIC_TENANT_ID}/oauth2/v2.0/token",
+            data={
+                "grant_type": "client_credentials",
+                "client_id": FABRIC_CLIENT_ID,
+                "client_secret": FABRIC_CLIENT_SECRET,
+                "scope": scope,
+            },
+            timeout=30,
+        )
     resp.raise_for_status()
     data = resp.json()
+    now = time.time()
+    lifetime = float(data.get("expires_in", 3600))
     _token_cache[scope] = {
         "token": data["access_token"],
-        "expires": time.time() + data.get("expires_in", 3600) - 60,
+        "refresh_at": now + lifetime * TOKEN_REFRESH_AT,
+        "expires": now + lifetime - 60,
     }
+    if scope == STORAGE_SCOPE:
+        _STORAGE_OPTIONS["bearer_token"] = data["access_token"]
     return data["access_token"]
 
 
+def _get_token(scope):
+    """Get Azure AD token with caching. Concurrent misses share one fetch."""
+    cached = _token_cache.get(scope)
+    if cached and cached["expires"] > time.time():
+        return cached["token"]
+    with _token_locks.setdefault(scope, threading.Lock()):
+        cached = _token_cache.get(scope)
+        if cached and cached["expires"] > time.time():
+            return cached["token"]
+        return _fetch_token(scope)
+
+
+def _refresh_tokens_loop():
+    while True:
+        scopes = set(_token_cache) | {STORAGE_SCOPE}
+        wait = None
+        for scope in scopes:
+            cached = _token_cache.get(scope)
+            if cached and cached["refresh_at"] > time.time():
+                due = cached["refresh_at"] - time.time()
+            else:
+                try:
+                    with _token_locks.setdefault(scope, threading.Lock()):
+                        _fetch_token(scope)
+                    due = _token_cache[scope]["refresh_at"] - time.time()
+                    logger.info("Refreshed token for %s", scope)
+                except Exception as e:
+                    logger.warning("Token refresh failed for %s: %s", scope, e)
+                    due = TOKEN_RETRY_SECONDS
+            wait = due if wait is None else min(wait, due)
+        time.sleep(max(wait or TOKEN_RETRY_SECONDS, 1))
+
+
+def start_token_refresher():
+    """Start the background token renewal thread once per process."""
+    global _token_refresher_pid
+    if _token_refresher_pid == os.getpid() or STORAGE_BACKEND != "onelake":
+        return
+    _token_refresher_pid = os.getpid()
+    threading.Thread(target=_refresh_tokens_loop, name="token-refresher", daemon=True).start()
+
+
 def _storage_token():
-    return _get_token("https://storage.azure.com/.default")
+    return _get_token(STORAGE_SCOPE)
 
 
 def _storage_options():
-    return {"bearer_token": _storage_token(), "use_fabric_endpoint": "true"}
+    """The shared storage_options dict (token kept current in place)."""
+    _storage_token()
+    return _STORAGE_OPTIONS
 
 
 def _storage_headers():
@@ -78,66 +190,369 @@ def _onelake_base():
     return f"{ONELAKE_DFS}/{WORKSPACE_NAME}/{LAKEHOUSE_NAME}.Lakehouse"
 
 
+# ═══════════════════════════════════════════════════════════════════════
+#  STORAGE BACKENDS
+# ═══════════════════════════════════════════════════════════════════════
+# STORAGE_BACKEND=onelake (default) → Fabric Lakehouse Tables/dbo, parquet fallback in Files/app_data
+# STORAGE_BACKEND=local             → Delta tables under LOCAL_DELTA_ROOT (dev, load tests, benchmarks)
+
+STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "onelake").lower()
+LOCAL_DELTA_ROOT = os.getenv("LOCAL_DELTA_ROOT", "./local_lakehouse")
+FORMAT_HINT_TTL = float(os.getenv("FORMAT_HINT_TTL", "300"))  # seconds before a parquet-only table gets Delta probed first again
+
+
+class DeltaBackend(ABC):
+    """Delta tables under some root. Subclasses say where they live and how to authenticate."""
+    name = "delta"
+
+    @abstractmethod
+    def table_uri(self, table_name):
+        """Where table_name's Delta table lives."""
+
+    def storage_options(self):
+        return None
+
+    def read_delta(self, table_name, columns=None, filters=None, as_of=None):
+        try:
+            with metrics.timed("storage_read_seconds", table=table_name, format="delta"):
+                dt = DeltaTable(self.table_uri(table_name), storage_options=self.storage_options())
+                if as_of is not None:
+                    dt.load_as_version(as_of)
+                df = dt.to_pandas(columns=columns, filters=filters)
+        except Exception:
+            metrics.inc("storage_errors_total", op="read", table=table_name, format="delta")
+            raise
+        df.attrs["delta_version"] = dt.version()  # for conditional writes (write_table read_version)
+        if as_of is None:
+            metrics.set_gauge("delta_table_version", dt.version(), table=table_name)
+        metrics.inc("storage_read_bytes_total",
+            int(pa.table(dt.get_add_actions()).column("size_bytes").to_pandas().sum()), table=table_name)
+        logger.info("Read %d rows from Delta table %s", len(df), table_name)
+        return df
+
+    def write_delta(self, table_name, df, read_version=None, mode="overwrite", **kwargs):
+        try:
+            with metrics.timed("storage_write_seconds", table=table_name, format="delta"):
+                if read_version is None:
+                    target = self.table_uri(table_name)
+                else:  # pinned at the version the caller read → commit fails if anyone committed since
+                    target = DeltaTable(self.table_uri(table_name), version=read_version,
+                        storage_options=self.storage_options())
+                write_deltalake(target, df, mode=mode, storage_options=self.storage_options(),
+                    commit_properties=_commit_properties(), **kwargs)
+        except CommitFailedError as e:
+            metrics.inc("storage_conflicts_total", op="write", table=table_name)
+            raise ConcurrencyError(f"{table_name} changed since version {read_version}: {e}") from e
+        except Exception:
+            metrics.inc("storage_errors_total", op="write", table=table_name, format="delta")
+            raise
+        metrics.inc("storage_write_bytes_total", int(df.memory_usage(index=False).sum()), table=table_name)
+        logger.info("Wrote %d rows to Delta table %s", len(df), table_name)
+
+    def update_row(self, table_name, key, values, expected=None):
+        """
+        MERGE one row in place; no other row is rewritten by the app.
+        key: (column, value). expected: {column: value} the row must still hold
+        (NULL-safe compare). Returns rows updated — 0 if the row is gone or no
+        longer matches expected. ConcurrencyError if a concurrent commit won.
+        Values for columns the table doesn't have yet go through _rewrite_row.
+        """
+        key_col, key_val = key
+        expected = expected or {}
+        values = {c: v for c, v in values.items() if c != key_col}
+        try:
+            with metrics.timed("storage_write_seconds", table=table_name, format="delta-merge"):
+                dt = DeltaTable(self.table_uri(table_name), storage_options=self.storage_options())
+                schema = pa.schema(dt.schema().to_arrow())
+                widen = any(c not in schema.names for c in values)
+                if widen:
+                    version = dt.version()
+                else:
+                    source = {key_col: key_val, **values, **{f"__expected_{c}": v for c, v in expected.items()}}
+                    source = pa.table({c: pa.array([v]).cast(schema.field(c.removeprefix("__expected_")).type)
+                        for c, v in source.items()})
+                    predicate = " AND ".join([f't."{key_col}" = s."{key_col}"'] +
+                        [f'(t."{c}" IS NOT DISTINCT FROM s."__expected_{c}")' for c in expected])
+                    result = (dt.merge(source, predicate, source_alias="s", target_alias="t")
+                        .when_matched_update({c: f's."{c}"' for c in values}).execute())
+        except CommitFailedError as e:
+            metrics.inc("storage_conflicts_total", op="update", table=table_name)
+            raise ConcurrencyError(f"{table_name} changed during update: {e}") from e
+        except Exception:
+            metrics.inc("storage_errors_total", op="update", table=table_name, format="delta")
+            raise
+        if widen:
+            return self._rewrite_row(table_name, version, key, values, expected)
+        logger.info("Updated %d row(s) in Delta table %s", result["num_target_rows_updated"], table_name)
+        return result["num_target_rows_updated"]
+
+    def _rewrite_row(self, table_name, version, key, values, expected):
+        """update_row when values add columns (MERGE can't): the row is checked and set on
+        the table as of version, written back conditionally with the new columns ("" elsewhere)."""
+        df = self.read_delta(table_name, as_of=version)
+        mask = df[key[0]] == key[1]
+        for c, v in expected.items():
+            mask &= df[c].isna() if v is None else df[c] == v
+        if not mask.any():
+            return 0
+        added = [c for c in values if c not in df.columns]
+        for c, v in values.items():
+            if c not in df.columns:
+                df[c] = ""
+            df.loc[mask, c] = v
+        self.write_delta(table_name, df, version, schema_mode="merge")
+        logger.info("Updated %d row(s) in Delta table %s, adding columns %s", int(mask.sum()), table_name, added)
+        return int(mask.sum())
+
+    def has_transaction(self, table_name, app_id, version=None):
+        """Whether the table's log (as of version) holds a commit stamped with app transaction app_id."""
+        try:
+            dt = DeltaTable(self.table_uri(table_name), version=version, storage_options=self.storage_options())
+        except Exception:  # no Delta table (yet)
+            return False
+        return dt.transaction_version(app_id) is not None
+
+    def read(self, table_name, **query):
+        return self.read_delta(table_name, **query)
+
+    def write(self, table_name, df, read_version=None):
+        self.write_delta(table_name, df, read_version)
+
+    def append(self, table_name, df):
+        self.write_delta(table_name, df, mode="append")
+
+    def test_connection(self):
+        return True
+
+
+class OneLakeBackend(DeltaBackend):
+    """Fabric Lakehouse over OneLake: Delta first, parquet in Files/app_data as fallback."""
+    name = "onelake"
+
+    def __init__(self):
+        self._parquet_since = {}  # table -> when it was last found only as parquet (read order hint)
+
+    def table_uri(self, table_name):
+        return f"{ABFSS_BASE}/Tables/dbo/{table_name}"
+
+    def storage_options(self):
+        return _storage_options()
+
+    def read(self, table_name, **query):
+        # Delta first, then parquet in Files/ — no time travel; filters applied
+        # after the read. A table last found only as parquet is read as parquet
+        # first for FORMAT_HINT_TTL, skipping the Delta probe that fails anyway.
+        since = self._parquet_since.get(table_name)
+        hinted = since is not None and "as_of" not in query and time.time() - since < FORMAT_HINT_TTL
+        for fmt in ("parquet", "delta") if hinted else ("delta", "parquet"):
+            try:
+                if fmt == "delta":
+                    df = self.read_delta(table_name, **query)
+                    self._parquet_since.pop(table_name, None)
+                    return df
+                df = _read_parquet_fallback(table_name)
+                if df is not None:
+                    if not hinted:
+                        self._parquet_since[table_name] = time.time()
+                    return _apply_query(df, query.get("columns"), query.get("filters"))
+            except Exception as e:
+                logger.debug("%s read failed for %s: %s", fmt.capitalize(), table_name, e)
+
+        return pd.DataFrame()
+
+    def write(self, table_name, df, read_version=None):
+        # Try Delta Lake write
+        try:
+            self.write_delta(table_name, df, read_version)
+            self._parquet_since.pop(table_name, None)
+            return
+        except ConcurrencyError:
+            raise
+        except Exception as e:
+            logger.warning("Delta write failed for %s: %s, falling back to parquet", table_name, e)
+
+        # Fallback to parquet — now the newest copy, read it first
+        _write_parquet_fallback(table_name, df)
+        self._parquet_since[table_name] = time.time()
+
+    def append(self, table_name, df):
+        try:
+            self.write_delta(table_name, df, mode="append")
+            return
+        except Exception as e:
+            logger.warning("Delta append failed for %s: %s, falling back to parquet", table_name, e)
+        existing = _read_parquet_fallback(table_name)
+        _write_parquet_fallback(table_name, df if existing is None else pd.concat([existing, df], ignore_index=True))
+
+    def update_row(self, table_name, key, values, expected=None):
+        try:
+            return super().update_row(table_name, key, values, expected)
+        except ConcurrencyError:
+            raise
+        except Exception as e:
+            logger.warning("Delta merge failed for %s: %s, rewriting the table", table_name, e)
+        # Parquet fallback has no conditional commit — check and rewrite (best effort)
+        df = self.read(table_name)
+        mask = df[key[0]] == key[1]
+        for c, v in (expected or {}).items():
+            mask &= df[c].astype(str) == str(v)
+        if not mask.any():
+            return 0
+        for c, v in values.items():
+            if c not in df.columns: df[c] = ""
+            df.loc[mask, c] = v
+        self.write(table_name, df)
+        return int(mask.sum())
+
+    def test_connection(self):
+        url = f"{_onelake_base()}/Files"
+        resp = _session().get(url, headers=_storage_headers(),
+            params={"resource": "filesystem", "recursive": "false"}, timeout=15)
+        return resp.status_code == 200
+
+
+class LocalDeltaBackend(DeltaBackend):
+    """Delta tables in a local directory — same Delta semantics, no Fabric credentials."""
+    name = "local"
+
+    def __init__(self, root=None):
+        self.root = os.path.abspath(root or LOCAL_DELTA_ROOT)
+
+    def table_uri(self, table_name):
+        return os.path.join(self.root, table_name)
+
+    def read(self, table_name, **query):
+        if not os.path.isdir(os.path.join(self.table_uri(table_name), "_delta_log")):
+            return pd.DataFrame()
+        return self.read_delta(table_name, **query)
+
+    def write(self, table_name, df, read_version=None):
+        os.makedirs(self.root, exist_ok=True)
+        # Tables gain columns over time (append_row) — let the schema follow
+        self.write_delta(table_name, df, read_version, schema_mode="overwrite")
+
+    def test_connection(self):
+        os.makedirs(self.root, exist_ok=True)
+        return os.access(self.root, os.W_OK)
+
+
+BACKENDS = {"onelake": OneLakeBackend, "local": LocalDeltaBackend}
+_backend = None
+
+
+def get_backend():
+    """The configured storage backend (STORAGE_BACKEND), created on first use."""
+    global _backend
+    if _backend is None:
+        if STORAGE_BACKEND not in BACKENDS:
+            raise ValueError(f"Unknown STORAGE_BACKEND {STORAGE_BACKEND!r} (expected one of {sorted(BACKENDS)})")
+        _backend = BACKENDS[STORAGE_BACKEND]()
+    return _backend
+
+
 # ═══════════════════════════════════════════════════════════════════════
 #  READ — Delta Lake (with fallback to parquet in Files/)
 # ═══════════════════════════════════════════════════════════════════════
 
-def read_table(table_name):
+def read_table(table_name, columns=None, filters=None, as_of=None):
     """
-    Read a table. Tries Delta Lake first (Tables/dbo/), 
-    then falls back to parquet (Files/app_data/).
-    Returns a pandas DataFrame.
+    Read a table from the configured backend.
+    OneLake: tries Delta Lake first (Tables/dbo/), then parquet (Files/app_data/).
+    Returns a pandas DataFrame (empty if the table doesn't exist).
+    columns / filters (pyarrow DNF, e.g. [("RowID", "=", rid)]) are pushed down
+    to Delta, so only matching columns and files are read. as_of (Delta version
+    or datetime) time-travels.
     """
-    # Try Delta Lake first
-    try:
-        from deltalake import DeltaTable
-        delta_path = f"{ABFSS_BASE}/Tables/dbo/{table_name}"
-        dt = DeltaTable(delta_path, storage_options=_storage_options())
-        df = dt.to_pandas()
-        logger.info("Read %d rows from Delta table %s", len(df), table_name)
-        return df
-    except Exception as e:
-        logger.debug("Delta read failed for %s: %s, trying parquet", table_name, e)
+    query = {k: v for k, v in (("columns", columns), ("filters", filters), ("as_of", as_of)) if v is not None}
+    return get_backend().read(table_name, **query)
 
-    # Fallback to parquet in Files/
-    try:
-        url = f"{_onelake_base()}/Files/app_data/{table_name}.parquet"
-        resp = requests.get(url, headers=_storage_headers(), timeout=60)
-        if resp.status_code == 200:
-            df = pd.read_parquet(io.BytesIO(resp.content))
-            logger.info("Read %d rows from parquet %s", len(df), table_name)
-            return df
-    except Exception as e:
-        logger.debug("Parquet read also failed for %s: %s", table_name, e)
 
-    return pd.DataFrame()
+# ── Several tables at once ────────────────────────────────────────────
+# Cold paths often need more than one table (the edit modal: Projects and
+# Lookups; a worker's warm-up: all of them). Reads are network and native
+# Delta / Arrow I/O that release the GIL, so read_tables runs them side by side
+# on a per-process pool (rebuilt after fork) and waits for the slowest only.
+READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", "8"))
+
+_read_pool_obj = None
+_read_pool_pid = None
+_read_pool_lock = threading.Lock()
+
+
+def _read_pool():
+    global _read_pool_obj, _read_pool_pid
+    if _read_pool_obj is None or _read_pool_pid != os.getpid():
+        with _read_pool_lock:
+            if _read_pool_obj is None or _read_pool_pid != os.getpid():
+                _read_pool_obj = ThreadPoolExecutor(READ_POOL_SIZE, thread_name_prefix="read")
+                _read_pool_pid = os.getpid()
+    return _read_pool_obj
+
+
+def read_tables(table_names, columns=None, filters=None, as_of=None):
+    """
+    {table: DataFrame} for several tables, read concurrently — read_table for
+    each with the same query. Raises the first table's error once all are done.
+    """
+    names = list(dict.fromkeys(table_names))
+    if len(names) <= 1:
+        return {t: read_table(t, columns, filters, as_of) for t in names}
+    futures = {t: _read_pool().submit(read_table, t, columns, filters, as_of) for t in names}
+    wait(futures.values())
+    return {t: f.result() for t, f in futures.items()}
+
+
+def _apply_query(df, columns=None, filters=None):
+    """columns / filters for frames that came from a format without pushdown."""
+    ops = {"=": "__eq__", "==": "__eq__", "!=": "__ne__", "<": "__lt__", "<=": "__le__", ">": "__gt__", ">=": "__ge__"}
+    for col, op, val in filters or []:
+        df = df[df[col].isin(val) if op == "in" else getattr(df[col], ops[op])(val)]
+    return df[columns] if columns else df
+
+
+def _read_parquet_fallback(table_name):
+    """Read parquet from Files/app_data/ (fallback). None if the file isn't there."""
+    url = f"{_onelake_base()}/Files/app_data/{table_name}.parquet"
+    with metrics.timed("storage_read_seconds", table=table_name, format="parquet"):
+        resp = _session().get(url, headers=_storage_headers(), timeout=60)
+        if resp.status_code != 200:
+            return None
+        df = pd.read_parquet(io.BytesIO(resp.content))
+    metrics.inc("storage_read_bytes_total", len(resp.content), table=table_name)
+    logger.info("Read %d rows from parquet %s", len(df), table_name)
+    return df
 
 
 # ═══════════════════════════════════════════════════════════════════════
 #  WRITE — Delta Lake (with fallback to parquet)
 # ═══════════════════════════════════════════════════════════════════════
 
-def write_table(table_name, df):
+class ConcurrencyError(Exception):
+    """A conditional write lost to a concurrent commit — re-read and try again."""
+
+
+def write_table(table_name, df, read_version=None):
     """
-    Write a DataFrame as a Delta Lake table to Tables/dbo/{table_name}.
-    Falls back to parquet in Files/ if Delta write fails.
+    Overwrite a table in the configured backend.
+    OneLake: Delta table in Tables/dbo/{table_name}, parquet in Files/ if that fails.
+    read_version (the Delta version df was read at, df.attrs["delta_version"])
+    makes it a conditional commit: ConcurrencyError if a concurrent overwrite
+    or row update committed since. Rows added by append_table in between are
+    not protected — they commit without a conflict and stay next to the
+    overwrite — so don't rely on it for a table that is both appended to and
+    overwritten.
     """
-    # Try Delta Lake write
-    try:
-        from deltalake import write_deltalake
-        delta_path = f"{ABFSS_BASE}/Tables/dbo/{table_name}"
-        write_deltalake(
-            delta_path, df,
-            mode="overwrite",
-            storage_options=_storage_options(),
-        )
-        logger.info("Wrote %d rows to Delta table %s", len(df), table_name)
-        return
-    except Exception as e:
-        logger.warning("Delta write failed for %s: %s, falling back to parquet", table_name, e)
+    get_backend().write(table_name, df, read_version)
+
+
+def append_table(table_name, df):
+    """Append rows without reading the table (Delta append — never conflicts with other appends)."""
+    get_backend().append(table_name, df)
 
-    # Fallback to parquet
-    _write_parquet_fallback(table_name, df)
+
+def update_row(table_name, key, values, expected=None):
+    """Conditional single-row update (Delta MERGE) — see DeltaBackend.update_row."""
+    return get_backend().update_row(table_name, key, values, expected)
 
 
 def _write_parquet_fallback(table_name, df):
@@ -148,46 +563,44 @@ def _write_parquet_fallback(table_name, df):
     df.to_parquet(buf, index=False, engine="pyarrow")
     parquet_bytes = buf.getvalue()
 
-    try:
-        requests.delete(url, headers=headers, timeout=15)
-    except Exception:
-        pass
-
-    requests.put(url, headers={**headers, "Content-Length": "0"},
-        params={"resource": "file"}, timeout=15).raise_for_status()
-    requests.patch(url, headers={**headers, "Content-Length": str(len(parquet_bytes)),
-        "Content-Type": "application/octet-stream"},
-        params={"action": "append", "position": "0"},
-        data=parquet_bytes, timeout=30).raise_for_status()
-    requests.patch(url, headers=headers,
-        params={"action": "flush", "position": str(len(parquet_bytes))},
-        timeout=15).raise_for_status()
+    http = _session()
+    with metrics.timed("storage_write_seconds", table=table_name, format="parquet"):
+        try:
+            http.delete(url, headers=headers, timeout=15)
+        except Exception:
+            pass
+
+        http.put(url, headers={**headers, "Content-Length": "0"},
+            params={"resource": "file"}, timeout=15).raise_for_status()
+        http.patch(url, headers={**headers, "Content-Length": str(len(parquet_bytes)),
+            "Content-Type": "application/octet-stream"},
+            params={"action": "append", "position": "0"},
+            data=parquet_bytes, timeout=30).raise_for_status()
+        http.patch(url, headers=headers,
+            params={"action": "flush", "position": str(len(parquet_bytes))},
+            timeout=15).raise_for_status()
+    metrics.inc("storage_write_bytes_total", len(parquet_bytes), table=table_name)
     logger.info("Wrote %d rows to parquet %s (fallback)", len(df), table_name)
 
 
-def append_row(table_name, row_dict):
-    """Append a single row. Ensures consistent schema across all rows."""
-    existing = read_table(table_name)
-    new_row = pd.DataFrame([row_dict])
-
+def _appended(existing, new):
+    """existing + new rows, columns unioned (missing cells "") so the schema stays consistent."""
     if existing.empty:
-        combined = new_row
+        combined = new
     else:
         # Ensure both DataFrames have the same columns
-        all_cols = list(dict.fromkeys(list(existing.columns) + list(new_row.columns)))
-        for col in all_cols:
-            if col not in existing.columns:
-                existing[col] = ""
-            if col not in new_row.columns:
-                new_row[col] = ""
-        # Reorder to match
-        new_row = new_row[all_cols]
-        existing = existing[all_cols]
-        combined = pd.concat([existing, new_row], ignore_index=True)
-
+        all_cols = list(dict.fromkeys(list(existing.columns) + list(new.columns)))
+        combined = pd.concat([existing.reindex(columns=all_cols, fill_value=""),
+            new.reindex(columns=all_cols, fill_value="")], ignore_index=True)
     # Fill any NaN with empty string to prevent schema issues
-    combined = combined.fillna("")
-    write_table(table_name, combined)
+    return combined.fillna("")
+
+
+def append_row(table_name, row_dict):
+    """Append a single row. Ensures consistent schema across all rows."""
+    existing = read_table(table_name)
+    combined = _appended(existing, pd.DataFrame([row_dict]))
+    write_table(table_name, combined, existing.attrs.get("delta_version"))
     return len(combined)
 
 
@@ -196,26 +609,251 @@ def update_table(table_name, df):
     write_table(table_name, df)
 
 
+# ═══════════════════════════════════════════════════════════════════════
+#  BATCHES — one save across several tables
+# ═══════════════════════════════════════════════════════════════════════
+# Delta commits are per table; nothing spans two. A Batch stages changes to
+# several tables, journals them to BATCH_JOURNAL_DIR/<key>.json and commits
+# every table at once, one thread each — a combined save takes as long as its
+# slowest commit, not their sum. Changes are re-applied to the table as read
+# (append rows / replace a key's rows / bump a counter) and committed
+# conditionally, re-read on conflict, and each commit is stamped with the
+# Delta app transaction "batch-<key>". A table whose log already holds it is
+# skipped, so replay_batch(key) finishes a batch that failed half way without
+# applying anything twice (at least once on the OneLake parquet fallback,
+# which has no log). The journal goes once every table has committed, or at
+# once on an error a replay would only repeat (bad data, schema mismatch).
+BATCH_JOURNAL_DIR = os.getenv("BATCH_JOURNAL_DIR", os.path.join(tempfile.gettempdir(), "mcut-batches"))
+BATCH_RETRIES = int(os.getenv("BATCH_RETRIES", "20"))
+BATCH_REPLAY_AFTER = float(os.getenv("BATCH_REPLAY_AFTER", "60"))       # younger journals may still be committing
+BATCH_GIVE_UP_AFTER = float(os.getenv("BATCH_GIVE_UP_AFTER", "86400"))  # then moved to BATCH_JOURNAL_DIR/failed
+
+REPLAYABLE_ERRORS = (ConcurrencyError, OSError)  # OSError: storage / network I/O (requests errors included)
+
+_batch_txn = threading.local()  # app transaction of the batch commit running on this thread
+
+
+def _commit_properties():
+    app_id = getattr(_batch_txn, "app_id", None)
+    return CommitProperties(app_transactions=[Transaction(app_id, 1)]) if app_id else None
+
+
+class BatchError(Exception):
+    """
+    Tables of a batch that did not commit ({table: exception}). replayable:
+    every error was a lost race or I/O, so the journal stays for
+    replay_batch(key); otherwise (bad data, schema) it is dropped.
+    """
+
+    def __init__(self, key, errors):
+        super().__init__(f"batch {key}: " + "; ".join(f"{t}: {e}" for t, e in errors.items()))
+        self.key, self.errors = key, errors
+        self.replayable = all(isinstance(e, REPLAYABLE_ERRORS) for e in errors.values())
+
+
+class Batch:
+    """
+    Changes to several tables, committed together:
+
+        batch = Batch()
+        batch.increment("ReviewerState", ("Reviewer", name), "Count")
+        batch.append("Projects", row)
+        batch.log("ProjectHistory", *entries)
+        batch.commit()   # → tables committed; BatchError if any did not
+    """
+
+    def __init__(self, key=None):
+        self.key = key or uuid.uuid4().hex
+        self.changes = []
+
+    @property
+    def tables(self):
+        return list(dict.fromkeys(c["table"] for c in self.changes))
+
+    def append(self, table_name, *rows):
+        """Add rows (dicts), columns unioned as in append_row."""
+        self.changes.append({"table": table_name, "kind": "append", "rows": list(rows)})
+        return self
+
+    def log(self, table_name, *rows):
+        """Add rows to an append-only table: a Delta append, the table is not read or rewritten."""
+        self.changes.append({"table": table_name, "kind": "log", "rows": list(rows)})
+        return self
+
+    def replace(self, table_name, key, rows):
+        """Drop the rows where key[0] == key[1], then add rows."""
+        self.changes.append({"table": table_name, "kind": "replace", "key": list(key), "rows": list(rows)})
+        return self
+
+    def increment(self, table_name, key, column, by=1):
+        """column += by in the row where key[0] == key[1] (added if missing)."""
+        self.changes.append({"table": table_name, "kind": "increment", "key": list(key), "column": column, "by": by})
+        return self
+
+    def commit(self):
+        if not self.changes:
+            return []
+        _write_journal(self.key, self.changes)
+        return _commit_batch(self.key, self.changes)
+
+
+def _apply_change(df, change):
+    col, val = change.get("key") or (None, None)
+    if change["kind"] == "increment":
+        hit = df[col] == val if col in df.columns else pd.Series(False, index=df.index)
+        if not hit.any():
+            return _appended(df, pd.DataFrame([{col: val, change["column"]: change["by"]}]))
+        df.loc[hit, change["column"]] = pd.to_numeric(df.loc[hit, change["column"]],
+            errors="coerce").fillna(0).astype(int) + change["by"]
+        return df
+    if change["kind"] == "replace" and col in df.columns:
+        df = df[df[col] != val]
+    return _appended(df, pd.DataFrame(change["rows"])) if change["rows"] else df
+
+
+def _commit_table(table_name, changes, app_id, replay=False):
+    """Apply changes to the table as read and commit, re-reading on conflict. False if nothing was written."""
+    if all(c["kind"] == "log" for c in changes):
+        if replay and get_backend().has_transaction(table_name, app_id):
+            return False
+        _batch_txn.app_id = app_id
+        try:
+            append_table(table_name, pd.DataFrame([r for c in changes for r in c["rows"]]))
+            return True
+        finally:
+            _batch_txn.app_id = None
+    for attempt in range(BATCH_RETRIES):
+        df = read_table(table_name)
+        version = df.attrs.get("delta_version")
+        if replay and get_backend().has_transaction(table_name, app_id, version):
+            return False  # committed before the batch failed, or by another replay
+        for change in changes:
+            df = _apply_change(df, change)
+        if not len(df.columns):
+            return False  # nothing to create
+        _batch_txn.app_id = app_id
+        try:
+            write_table(table_name, df, version)
+            return True
+        except ConcurrencyError:
+            if attempt == BATCH_RETRIES - 1: raise
+            time.sleep(random.uniform(0, min(1.0, 0.02 * 2 ** attempt)))
+        finally:
+            _batch_txn.app_id = None
+
+
+def _commit_batch(key, changes, replay=False):
+    by_table = {}
+    for change in changes:
+        by_table.setdefault(change["table"], []).append(change)
+    app_id, errors = f"batch-{key}", {}
+    with metrics.timed("storage_batch_seconds"):
+        if len(by_table) == 1:
+            (table_name, table_changes), = by_table.items()
+            try:
+                _commit_table(table_name, table_changes, app_id, replay)
+            except Exception as e:
+                errors[table_name] = e
+        else:
+            with ThreadPoolExecutor(len(by_table), thread_name_prefix="batch") as pool:
+                futures = {t: pool.submit(_commit_table, t, cs, app_id, replay) for t, cs in by_table.items()}
+            for table_name, future in futures.items():
+                try:
+                    future.result()
+                except Exception as e:
+                    errors[table_name] = e
+    if errors:
+        error = BatchError(key, errors)
+        metrics.inc("storage_batches_total", result="failed")
+        if error.replayable:
+            logger.warning("Batch %s: %s did not commit — journal kept for replay", key, sorted(errors))
+        else:  # replaying would fail the same way
+            logger.error("Batch %s failed, not replayable: %s", key, error)
+            _drop_journal(key)
+        raise error
+    _drop_journal(key)
+    metrics.inc("storage_batches_total", result="replayed" if replay else "committed")
+    return list(by_table)
+
+
+def _journal_path(key):
+    return os.path.join(BATCH_JOURNAL_DIR, f"{key}.json")
+
+
+def _drop_journal(key):
+    try:
+        os.remove(_journal_path(key))
+    except FileNotFoundError:  # another replay finished it
+        pass
+
+
+def _write_journal(key, changes):
+    os.makedirs(BATCH_JOURNAL_DIR, exist_ok=True)
+    tmp = f"{_journal_path(key)}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump({"key": key, "changes": changes}, f, default=str)
+    os.replace(tmp, _journal_path(key))
+
+
+def replay_batch(key):
+    """Finish a journaled batch; tables already holding its commit are skipped. Returns its tables."""
+    with open(_journal_path(key)) as f:
+        changes = json.load(f)["changes"]
+    return _commit_batch(key, changes, replay=True)
+
+
+def replay_batches(older_than=BATCH_REPLAY_AFTER):
+    """
+    Replay every journaled batch older than older_than seconds (a failed save,
+    or a worker that died mid-commit). Ones still failing past
+    BATCH_GIVE_UP_AFTER move to BATCH_JOURNAL_DIR/failed. Returns the tables
+    of the batches tried — their caches are stale.
+    """
+    try:
+        names = sorted(n for n in os.listdir(BATCH_JOURNAL_DIR) if n.endswith(".json"))
+    except FileNotFoundError:
+        return set()
+    touched = set()
+    for name in names:
+        key, path, age = name[:-len(".json")], os.path.join(BATCH_JOURNAL_DIR, name), 0.0
+        try:
+            age = time.time() - os.stat(path).st_mtime
+            if age < older_than:
+                continue
+            with open(path) as f:
+                touched.update(c["table"] for c in json.load(f)["changes"])
+            replay_batch(key)
+            logger.info("Replayed batch %s", key)
+        except FileNotFoundError:  # committed meanwhile
+            continue
+        except Exception as e:
+            if age < BATCH_GIVE_UP_AFTER:
+                logger.warning("Replay of batch %s failed: %s", key, e)
+                continue
+            logger.error("Giving up on batch %s after %.0f s: %s", key, age, e)
+            os.makedirs(os.path.join(BATCH_JOURNAL_DIR, "failed"), exist_ok=True)
+            os.replace(path, os.path.join(BATCH_JOURNAL_DIR, "failed", name))
+    return touched
+
+
 # ═══════════════════════════════════════════════════════════════════════
 #  CONNECTION TEST
 # ═══════════════════════════════════════════════════════════════════════
 
 def test_connection():
-    """Test OneLake connectivity."""
+    """Test storage connectivity."""
     try:
-        url = f"{_onelake_base()}/Files"
-        resp = requests.get(url, headers=_storage_headers(),
-            params={"resource": "filesystem", "recursive": "false"}, timeout=15)
-        return resp.status_code == 200
+        return get_backend().test_connection()
     except Exception as e:
         logger.error("Connection test failed: %s", e)
         return False
 
 
 if __name__ == "__main__":
+    print(f"Backend:    {get_backend().name}")
     print(f"Workspace:  {WORKSPACE_NAME}")
     print(f"Lakehouse:  {LAKEHOUSE_NAME}")
-    print(f"Delta path: {ABFSS_BASE}/Tables/dbo/")
+    print(f"Delta path: {get_backend().table_uri('')}")
     print()
     if test_connection():
         print("SUCCESS - Connected!")
@@ -7,10 +7,24 @@ Security:
   - Row-Level Security based on authenticated user
 """
 
-import os, uuid, logging, subprocess, json
+import os, re, uuid, logging, subprocess, json, threading, time, tempfile, random
+from collections import OrderedDict
+from contextlib import contextmanager, ExitStack
 from datetime import datetime, timezone
+try:
+    import fcntl
+except ImportError:  # Windows dev box — thread locks only
+    fcntl = None
+import numpy as np
 import pandas as pd
-from db_connection import read_table, write_table, append_row, test_connection
+from dash import callback_context
+from flask import has_request_context, request
+import metrics
+import search_index
+from analytics_cube import cube as analytics, DIMENSIONS as ANALYTICS_DIMENSIONS
+from qc_scheduler import scheduler as qc_scheduler
+from db_connection import (read_table, read_tables, write_table, append_row, append_table, update_row, test_connection,
+    ConcurrencyError, Batch, BatchError, replay_batches)
 
 logger = logging.getLogger(__name__)
 
@@ -41,10 +55,11 @@ REQUIRED_AD_GROUP = os.getenv("REQUIRED_AD_GROUP", "")
 
 def get_current_user():
     """Get authenticated user ID from Flask request header.
-    Returns the real user ID set by Posit Connect (cannot be spoofed)."""
+    Returns the real user ID set by Posit Connect (cannot be spoofed).
+    Background callback jobs have no request — they read the headers Dash
+    captured from the request that started the job."""
     try:
-        from flask import request
-        creds = request.headers.get("RStudio-Connect-Credentials", "")
+        creds = _request_header("RStudio-Connect-Credentials")
         if creds:
             data = json.loads(creds)
             return data.get("user", APP_USER_FALLBACK)
@@ -53,7 +68,15 @@ def get_current_user():
     return APP_USER_FALLBACK
 
 
+def _request_header(name):
+    if has_request_context():
+        return request.headers.get(name, "")
+    headers = callback_context.headers or {}
+    return next((v for k, v in headers.items() if k.lower() == name.lower()), "")
+
+
 _name_cache = {}  # Cache AD name lookups
+_name_locks = {}  # user -> Lock; one adquery per user at a time
 
 def get_user_display_name(user_id=None):
     """Get user's display name. Priority: USER_NAME_MAP > AD lookup > empty."""
@@ -68,12 +91,20 @@ def get_user_display_name(user_id=None):
     if user_id in _name_cache:
         return _name_cache[user_id]
 
+    with _name_locks.setdefault(user_id, threading.Lock()):
+        if user_id in _name_cache:
+            return _name_cache[user_id]
+        return _lookup_display_name(user_id)
+
+
+def _lookup_display_name(user_id):
     # 3. Auto-detect from AD via adquery
     try:
-        result = subprocess.run(
-            ["adquery", "user", user_id],
-            capture_output=True, text=True, timeout=10
-        )
+        with metrics.timed("adquery_seconds", kind="name"):
+            result = subprocess.run(
+                ["adquery", "user", user_id],
+                capture_output=True, text=True, timeout=10
+            )
         if result.returncode == 0 and result.stdout.strip():
             # Format: userid:x:uid:gid:Full Name:/home/dir:/bin/bash
             parts = result.stdout.strip().split(":")
@@ -111,10 +142,11 @@ def check_ad_group(user_id=None, group_name=None):
     if not group_name:
         return True  # No group check configured
     try:
-        result = subprocess.run(
-            ["adquery", "user", "-a", user_id],
-            capture_output=True, text=True, timeout=10
-        )
+        with metrics.timed("adquery_seconds", kind="group"):
+            result = subprocess.run(
+                ["adquery", "user", "-a", user_id],
+                capture_output=True, text=True, timeout=10
+            )
         return group_name in result.stdout
     except Exception as e:
         logger.warning("AD group check failed for %s: %s — denying access", user_id, e)
@@ -140,26 +172,219 @@ PROJECTS_TABLE = "Projects"
 RESOURCE_TABLE = "ResourceUtilization"
 LOOKUPS_TABLE = "Lookups"
 REVIEWER_STATE_TABLE = "ReviewerState"
+PROJECT_HISTORY_TABLE = "ProjectHistory"
 
 # ── Cache ─────────────────────────────────────────────────────────────
+# Stale-while-revalidate with single-flight loads, per table:
+#   age < soft TTL          → serve cached frame
+#   soft <= age < hard TTL  → serve stale frame, one background reload runs
+#   age >= hard TTL / miss  → block; concurrent callers share one read_table
+# get_tables loads all the tables it is missing in one go (read_tables).
+# Override per table with CACHE_TTLS='{"Lookups": [900, 7200]}' (soft, hard seconds).
 _cache = {}
-_cache_ts = {}
-CACHE_TTL = 300
-
-def _get_cached(tn, force=False):
-    now = datetime.now().timestamp()
-    if not force and tn in _cache and (now - _cache_ts.get(tn, 0)) < CACHE_TTL:
-        return _cache[tn].copy()
-    df = read_table(tn)
-    _cache[tn] = df
-    _cache_ts[tn] = now
-    return df.copy()
+_cache_ts = {}          # table -> time the load that produced the entry started
+_cache_cleared = {}     # table -> time of last clear_cache (drops loads that started earlier)
+_cache_locks = {}       # table -> Lock; one in-flight load per table
+_reloading = set()      # tables with a background reload running
+_reloading_lock = threading.Lock()
+CACHE_TTL = int(os.getenv("CACHE_TTL", "300"))
+CACHE_HARD_TTL = int(os.getenv("CACHE_HARD_TTL", "3600"))
+CACHE_TTLS = {}
+try:
+    CACHE_TTLS = {tn: (float(v[0]), float(v[1])) for tn, v in json.loads(os.getenv("CACHE_TTLS", "{}")).items()}
+except Exception as e:
+    logger.warning("Ignoring invalid CACHE_TTLS: %s", e)
+
+def _ttls(tn):
+    return CACHE_TTLS.get(tn, (CACHE_TTL, CACHE_HARD_TTL))
+
+def _load(tns, fresh_after=None):
+    """Single-flight load of tables, read concurrently: {table: frame}. Waiters that queued
+    behind a load reuse its result: any entry within soft TTL, or (fresh_after set) any
+    load started after that time."""
+    with ExitStack() as held:
+        for tn in sorted(tns):  # one lock order, so overlapping loads can't deadlock
+            held.enter_context(_cache_locks.setdefault(tn, threading.Lock()))
+        out = {}
+        for tn in tns:
+            if tn in _cache:
+                ts = _cache_ts.get(tn, 0)
+                fresh = ts >= fresh_after if fresh_after is not None else time.time() - ts < _ttls(tn)[0]
+                if fresh:
+                    out[tn] = _cache[tn]
+        started = time.time()
+        for tn, df in read_tables([tn for tn in tns if tn not in out]).items():
+            if started >= _cache_cleared.get(tn, 0):  # a write landed mid-read → don't cache old data
+                _cache[tn] = df
+                _cache_ts[tn] = started
+            out[tn] = df
+        return out
+
+def _reload_in_background(tn):
+    with _reloading_lock:
+        if tn in _reloading: return
+        _reloading.add(tn)
+    def run():
+        try: _load([tn], fresh_after=time.time())
+        except Exception as e: logger.warning("Background reload failed for %s: %s", tn, e)
+        finally:
+            with _reloading_lock: _reloading.discard(tn)
+    threading.Thread(target=run, name=f"reload-{tn}", daemon=True).start()
+
+def get_tables(tns, force=False, copy=True):
+    """Cached reads of several tables: {table: frame}. The ones not cached (all of
+    them with force) are read concurrently, so a cold call waits for the slowest
+    read, not the sum. copy=False hands back the cached frames — read-only callers only."""
+    requested = time.time()
+    out, missing = {}, []
+    for tn in dict.fromkeys(tns):
+        _check_generation(tn)
+        df = None if force else _cache.get(tn)
+        if df is not None:
+            age = requested - _cache_ts.get(tn, 0)
+            soft, hard = _ttls(tn)
+            if age < hard:
+                stale = age >= soft
+                metrics.inc("cache_requests_total", table=tn, result="stale" if stale else "hit")
+                if stale: _reload_in_background(tn)
+                out[tn] = df
+                continue
+        metrics.inc("cache_requests_total", table=tn, result="forced" if force else "miss")
+        missing.append(tn)
+    if missing:
+        out.update(_load(missing, fresh_after=requested if force else None))
+    return {tn: df.copy() if copy else df for tn, df in out.items()}
+
+def _get_cached(tn, force=False, copy=True):
+    """Cached table read. copy=False hands back the cached frame itself — read-only callers only."""
+    return get_tables([tn], force, copy)[tn]
 
 def clear_cache(tn=None):
-    if tn:
+    now = time.time()
+    for t in ([tn] if tn else set(_cache.copy()) | set(WARM_TABLES)):
+        _cache_cleared[t] = _bump_generation(t) or now
+        _cache.pop(t, None); _cache_ts.pop(t, None)
+
+# ── Cross-process invalidation ────────────────────────────────────────
+# Writes can happen in another gunicorn worker or in a background-callback
+# job process. clear_cache touches CACHE_GEN_DIR/<table>; every process
+# compares that mtime with its own last clear on each _get_cached.
+CACHE_GEN_DIR = os.getenv("CACHE_GEN_DIR", os.path.join(tempfile.gettempdir(), "mcut-cache-gen"))
+
+def _bump_generation(tn):
+    try:
+        os.makedirs(CACHE_GEN_DIR, exist_ok=True)
+        path = os.path.join(CACHE_GEN_DIR, tn)
+        with open(path, "a"): pass
+        os.utime(path)
+        return os.stat(path).st_mtime
+    except OSError as e:
+        logger.warning("Could not bump cache generation for %s: %s", tn, e)
+
+def data_version(tn):
+    """Time of the last write to tn from any process on this host (0 if none yet)."""
+    try: return os.stat(os.path.join(CACHE_GEN_DIR, tn)).st_mtime
+    except OSError: return 0.0
+
+def cached_version(tn, df=None):
+    """Tag of this process's cached copy of tn (df if given): its Delta version,
+    the same in every worker, or without one the time it was loaded."""
+    df = _get_cached(tn, copy=False) if df is None else df
+    v = df.attrs.get("delta_version")
+    return f"v{v}" if v is not None else f"t{_cache_ts.get(tn, 0)}"
+
+def _check_generation(tn):
+    gen = data_version(tn)
+    if gen > _cache_cleared.get(tn, 0):
+        _cache_cleared[tn] = gen
         _cache.pop(tn, None); _cache_ts.pop(tn, None)
-    else:
-        _cache.clear(); _cache_ts.clear()
+
+# ── Background refresh ────────────────────────────────────────────────
+# Started per gunicorn worker from post_fork (gunicorn.conf.py): warms every
+# table at boot, then reloads each one before its soft TTL so user
+# callbacks always find a fresh entry instead of paying for the OneLake read.
+WARM_TABLES = [PROJECTS_TABLE, RESOURCE_TABLE, LOOKUPS_TABLE, REVIEWER_STATE_TABLE]
+CACHE_REFRESH_AHEAD = float(os.getenv("CACHE_REFRESH_AHEAD", "0.8"))  # reload at 80% of TTL
+CACHE_REFRESH_INTERVAL = float(os.getenv("CACHE_REFRESH_INTERVAL", "30"))
+_refresher_pid = None
+
+def refresh_tables(tables=None, ahead=CACHE_REFRESH_AHEAD):
+    """Reload tables that are missing or older than ahead * their soft TTL, all at once."""
+    due = [tn for tn in tables or WARM_TABLES
+        if tn not in _cache or time.time() - _cache_ts.get(tn, 0) >= _ttls(tn)[0] * ahead]
+    try:
+        if due: get_tables(due, force=True, copy=False)
+    except Exception:  # one table failing mustn't keep the others stale
+        for tn in due:
+            try: _get_cached(tn, force=True, copy=False)
+            except Exception as e: logger.warning("Background refresh failed for %s: %s", tn, e)
+
+def replay_pending():
+    """Finish batches that a failed save or a dead worker left journaled (db_connection.replay_batches)."""
+    for tn in replay_batches():
+        clear_cache(tn)
+
+def _refresh_loop(interval):
+    while True:
+        replay_pending()
+        refresh_tables()
+        time.sleep(interval)
+
+def start_cache_refresher(interval=None):
+    """Start the warm-up/refresh thread once per process."""
+    global _refresher_pid
+    if _refresher_pid == os.getpid():
+        return
+    _refresher_pid = os.getpid()
+    threading.Thread(target=_refresh_loop, args=(interval or CACHE_REFRESH_INTERVAL,),
+        name="cache-refresher", daemon=True).start()
+    logger.info("Cache refresher started in pid %s", _refresher_pid)
+
+# ── Write locks ───────────────────────────────────────────────────────
+# Whole-table writes are read → modify → overwrite, so two concurrent writers
+# would silently drop one another's change. table_lock serializes them per
+# table: a thread lock for gthread workers plus an flock on
+# TABLE_LOCK_DIR/<table>.lock for the other workers on this host.
+# Project edits take it too: their row merges are conditional, but a QC
+# assignment must see the last one committed (update_project).
+# Not reentrant. Order when nesting: Projects → ReviewerState.
+TABLE_LOCK_DIR = os.getenv("TABLE_LOCK_DIR", os.path.join(tempfile.gettempdir(), "mcut-locks"))
+_write_locks = {}
+
+@contextmanager
+def table_lock(tn):
+    with _write_locks.setdefault(tn, threading.Lock()):
+        if fcntl is None:
+            yield
+            return
+        os.makedirs(TABLE_LOCK_DIR, exist_ok=True)
+        with open(os.path.join(TABLE_LOCK_DIR, f"{tn}.lock"), "w") as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+# ── Conflict retries ──────────────────────────────────────────────────
+# Whole-table writes commit against the Delta version they read
+# (write_table read_version) and row edits are conditional merges
+# (update_row), so a write that lost a race raises ConcurrencyError instead
+# of silently overwriting the winner. The loser re-reads and tries again.
+# Delta conflicts are per data file, so on a small (one-file) table every
+# concurrent commit clashes: full-jitter backoff, capped at a second.
+WRITE_RETRIES = int(os.getenv("WRITE_RETRIES", "20"))
+
+def _backoff(attempt):
+    time.sleep(random.uniform(0, min(1.0, 0.02 * 2 ** attempt)))
+
+def _retry_conflicts(fn):
+    """fn() re-run on ConcurrencyError, up to WRITE_RETRIES times."""
+    for attempt in range(WRITE_RETRIES):
+        try:
+            return fn()
+        except ConcurrencyError:
+            if attempt == WRITE_RETRIES - 1: raise
+            _backoff(attempt)
 
 # ── Numeric fields ────────────────────────────────────────────────────
 NUMERIC_FIELDS = {
@@ -205,14 +430,20 @@ def get_lookup_values(fn):
 def get_dropdown_options(fn):
     return [{"label": v, "value": v} for v in get_lookup_values(fn)]
 
+def get_lookup_options(fields):
+    """Dropdown options for several fields from a single cached read: {field: [options]}."""
+    df = _get_cached(LOOKUPS_TABLE, copy=False)
+    if df.empty or "FieldName" not in df.columns: return {f: [] for f in fields}
+    return {f: [{"label": v, "value": v} for v in df[df["FieldName"] == f].sort_values("Value")["Value"].tolist()]
+            for f in fields}
+
 def save_lookup_values(fn, vals):
-    df = _get_cached(LOOKUPS_TABLE, force=True)
-    if not df.empty: df = df[df["FieldName"] != fn]
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
-    new = pd.DataFrame({"FieldName": [fn]*len(vals), "Value": vals,
-        "UpdatedBy": [get_current_user()]*len(vals), "UpdatedAt": [now]*len(vals)})
-    write_table(LOOKUPS_TABLE, pd.concat([df, new], ignore_index=True))
-    clear_cache(LOOKUPS_TABLE)
+    now, user = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S"), get_current_user()
+    batch = Batch().replace(LOOKUPS_TABLE, ("FieldName", fn),
+        [{"FieldName": fn, "Value": v, "UpdatedBy": user, "UpdatedAt": now} for v in vals])
+    with table_lock(LOOKUPS_TABLE):
+        try: batch.commit()
+        finally: clear_cache(LOOKUPS_TABLE)
 
 def get_all_lookup_fields():
     df = _get_cached(LOOKUPS_TABLE)
@@ -236,7 +467,7 @@ REVIEWER_EMAILS = {
 }
 
 def _get_reviewer_state():
-    """Get or initialize reviewer assignment counts."""
+    """Get or initialize reviewer assignment counts. Call with the ReviewerState lock held."""
     df = _get_cached(REVIEWER_STATE_TABLE, force=True)
     if df.empty or "Reviewer" not in df.columns:
         # Initialize with all reviewers at count 0
@@ -246,39 +477,49 @@ def _get_reviewer_state():
         clear_cache(REVIEWER_STATE_TABLE)
     return df
 
-def assign_qc_reviewer(designer_name):
+def assign_qc_reviewer(designer_name, project=None, batch=None):
     """
-    Auto-assign QC reviewer (VBA macro logic):
-    1. Get all reviewers sorted alphabetically
-    2. Find reviewer with LOWEST assignment count
-    3. Skip the designer (reviewer != designer)
-    4. On tie, pick first alphabetically
-    5. Increment count and save
+    Auto-assign QC reviewer (qc_scheduler):
+    1. Skip the designer (reviewer != designer) and reviewers with leave
+       logged today in ResourceUtilization
+    2. Pick the LOWEST open QC load (projects in "Move to QC", weighted by
+       Complexity and PageSlide); project is charged to them
+    3. On tie, lowest lifetime assignment count, then first alphabetically
+    4. Increment count and save
+    If everyone else is on leave, leave is ignored rather than assign nobody.
+    With batch the count bump is staged there (committed with the caller's
+    other writes), otherwise it is committed at once.
     Returns: (reviewer_name, reviewer_email)
     """
-    state = _get_reviewer_state()
-    designer_upper = str(designer_name).upper().strip()
+    with table_lock(REVIEWER_STATE_TABLE):
+        return _assign_qc_reviewer(designer_name, project or {}, batch)
 
-    # Filter out the designer
-    eligible = state[state["Reviewer"].str.upper().str.strip() != designer_upper].copy()
-    if eligible.empty:
-        return "", ""
-
-    # Ensure Count is numeric
-    eligible["Count"] = pd.to_numeric(eligible["Count"], errors="coerce").fillna(0).astype(int)
+def _reviewers_on_leave(day=None):
+    df = get_resources_by_date(day or datetime.now().strftime("%Y-%m-%d"), unfiltered=True, copy=False)
+    if df.empty or not {"DesignerName", "LeavesHolidays"} <= set(df.columns): return set()
+    on_leave = pd.to_numeric(df["LeavesHolidays"], errors="coerce").fillna(0) > 0
+    return set(df.loc[on_leave, "DesignerName"].astype(str).str.strip().str.upper())
 
-    # Find minimum count
-    min_count = eligible["Count"].min()
-    candidates = eligible[eligible["Count"] == min_count]
-
-    # Tie-break: first alphabetically (already sorted)
-    chosen = candidates.iloc[0]
-    reviewer_name = chosen["Reviewer"]
+def _assign_qc_reviewer(designer_name, project, batch=None):
+    state = _get_reviewer_state()
+    counts = pd.to_numeric(state["Count"], errors="coerce").fillna(0).astype(int)
+    qc_scheduler.set_counts(dict(zip(state["Reviewer"], counts)))
+    qc_scheduler.sync(_get_cached(PROJECTS_TABLE, copy=False))
+
+    away = _reviewers_on_leave()
+    reviewer_name = qc_scheduler.assign(project, {designer_name, *away})
+    if reviewer_name is None and away:
+        logger.warning("All eligible QC reviewers are on leave today (%s) — assigning anyway", sorted(away))
+        reviewer_name = qc_scheduler.assign(project, {designer_name})
+    if reviewer_name is None:
+        return "", ""
 
     # Increment count in state
-    state.loc[state["Reviewer"] == reviewer_name, "Count"] = int(chosen["Count"]) + 1
-    write_table(REVIEWER_STATE_TABLE, state)
-    clear_cache(REVIEWER_STATE_TABLE)
+    if batch is not None:
+        batch.increment(REVIEWER_STATE_TABLE, ("Reviewer", reviewer_name), "Count")
+    else:
+        try: Batch().increment(REVIEWER_STATE_TABLE, ("Reviewer", reviewer_name), "Count").commit()
+        finally: clear_cache(REVIEWER_STATE_TABLE)
 
     email = REVIEWER_EMAILS.get(reviewer_name, "")
     return reviewer_name, email
@@ -291,30 +532,104 @@ def get_all_projects(force=False):
     df = _get_cached(PROJECTS_TABLE, force)
     return apply_rls(df, "DesignerAssigned")
 
+def search_projects(text="", facets=None, force=False):
+    """
+    Projects matching the search box (word prefixes over name / IDs / comments)
+    and facet filters ({field: [values]}), RLS applied, via the shared
+    search_index. Returns (frame, {facet field: {value: count}}).
+    """
+    df = _get_cached(PROJECTS_TABLE, force, copy=False)
+    if df.empty: return df, {}
+    idx = search_index.index_for(df)
+    allowed = None
+    user_id = get_current_user()
+    if not is_admin(user_id) and "DesignerAssigned" in df.columns:
+        name = (get_user_display_name(user_id) or "").strip().upper()
+        allowed = idx.mask_for("DesignerAssigned", lambda v: bool(name) and v.upper() == name)
+    pos, counts = idx.search(text, facets, allowed)
+    return df.iloc[pos], counts
+
+# ── Browser sync ──────────────────────────────────────────────────────
+# The Projects tab keeps its table rows in a dcc.Store tagged with the cached
+# frame's version (Delta version — the same in every worker). A tab switch
+# with nothing new sends nothing; after a write only rows whose UpdatedAt
+# moved are sent. RowID → UpdatedAt of the last few versions is kept to diff
+# against; an older tag gets the whole table again.
+SYNC_SNAPSHOTS = int(os.getenv("SYNC_SNAPSHOTS", "8"))
+_stamps = OrderedDict()  # version -> Series(UpdatedAt, index=RowID)
+_stamps_lock = threading.Lock()
+
+def _row_stamps(version, df):
+    with _stamps_lock:
+        if version not in _stamps:
+            _stamps[version] = pd.Series(df["UpdatedAt"].astype(str).to_numpy(), index=df["RowID"].astype(str).to_numpy())
+            while len(_stamps) > SYNC_SNAPSHOTS: _stamps.popitem(last=False)
+        _stamps.move_to_end(version)
+        return _stamps[version]
+
+def project_changes(since=None, force=False):
+    """
+    What the browser's rows (tagged since = {"version", "user"}) are missing.
+    Returns (tag, rows, gone), RLS applied:
+      rows None → since is current, nothing to send
+      gone None → rows is the whole table
+      otherwise → rows are changed / new, gone the RowIDs to drop
+    """
+    df = _get_cached(PROJECTS_TABLE, force, copy=False)
+    tag = {"version": cached_version(PROJECTS_TABLE, df), "user": get_current_user()}
+    since = since or {}
+    if since == tag: return tag, None, None
+    if df.empty or not {"RowID", "UpdatedAt"} <= set(df.columns):
+        return tag, apply_rls(df, "DesignerAssigned"), None
+    cur = _row_stamps(tag["version"], df)
+    with _stamps_lock:
+        old = _stamps.get(since.get("version")) if since.get("user") == tag["user"] else None
+    if old is None: return tag, apply_rls(df, "DesignerAssigned"), None
+    changed = cur.index[cur.ne(old.reindex(cur.index)).to_numpy()]
+    if len(changed) > len(cur) // 2: return tag, apply_rls(df, "DesignerAssigned"), None
+    rows = apply_rls(df[df["RowID"].astype(str).isin(changed)], "DesignerAssigned")
+    gone = old.index.difference(cur.index).union(changed.difference(rows["RowID"].astype(str)))
+    return tag, rows, list(gone)
+
 def submit_project(form_data):
     now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
     form_data.update({"RowID": str(uuid.uuid4()), "CreatedBy": get_current_user(),
         "CreatedAt": now, "UpdatedBy": get_current_user(), "UpdatedAt": now})
 
-    # Auto-assign QC when status is "Move to QC"
-    if str(form_data.get("InternalStatus", "")).strip().upper() == "MOVE TO QC":
-        designer = form_data.get("DesignerAssigned", "")
-        if designer:
-            qc_name, qc_email = assign_qc_reviewer(designer)
-            form_data["QCReviewer"] = qc_name
-            form_data["QCEmailer"] = qc_email
-
     # Calculate totals
     form_data = _calc_project_totals(form_data)
     form_data = _clean(form_data)
+    batch = Batch()
     try:
-        append_row(PROJECTS_TABLE, form_data)
-        clear_cache(PROJECTS_TABLE)
+        # Assignment through commit under the Projects lock (then ReviewerState),
+        # so the next assignment sees this row and its count bump committed
+        with table_lock(PROJECTS_TABLE):
+            # Auto-assign QC when status is "Move to QC" — the count bump commits with the row
+            if str(form_data.get("InternalStatus", "")).strip().upper() == "MOVE TO QC":
+                designer = form_data.get("DesignerAssigned", "")
+                if designer:
+                    qc_name, qc_email = assign_qc_reviewer(designer, form_data, batch)
+                    form_data["QCReviewer"] = qc_name
+                    form_data["QCEmailer"] = qc_email
+            batch.append(PROJECTS_TABLE, form_data)
+            # The history entry replays with the row if the commit is left pending
+            batch.log(PROJECT_HISTORY_TABLE, *_history_rows("insert", form_data["RowID"], {}, form_data))
+            try: batch.commit()
+            finally:
+                for tn in batch.tables: clear_cache(tn)
+        analytics.apply([form_data])
         qc_msg = ""
         if form_data.get("QCReviewer"):
             qc_msg = f" QC assigned: {form_data['QCReviewer']}"
         return {"status": "success", "message": f"Project saved!{qc_msg}"}
+    except BatchError as e:
+        if not e.replayable:
+            qc_scheduler.release(form_data["RowID"])
+            return {"status": "error", "message": f"Failed: {e}"}
+        logger.warning("Project %s not fully saved, left for replay: %s", form_data["RowID"], e)
+        return {"status": "pending", "message": "Saving is delayed — it will finish on its own, please don't submit again."}
     except Exception as e:
+        qc_scheduler.release(form_data["RowID"])
         return {"status": "error", "message": f"Failed: {e}"}
 
 def _calc_project_totals(d):
@@ -341,50 +656,197 @@ def _calc_project_totals(d):
     d["POCReworkPct"] = round(total_poc / total_assets * 100, 1) if total_assets > 0 else 0
     return d
 
-def update_project(row_id, changes):
-    df = _get_cached(PROJECTS_TABLE, force=True)
-    if df.empty: return {"status": "error", "message": "No projects"}
-    mask = df["RowID"] == row_id
-    if mask.sum() == 0: return {"status": "error", "message": "Not found"}
+_REVISION_FIELD = re.compile(r"R\d+_(Total|GDRework|POCRework|Asset)$")
+_TOTAL_FIELDS = ["TotalAssets", "TotalGDRework", "TotalPOCRework", "GDReworkPct", "POCReworkPct"]
 
-    now = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+def _norm(v):
+    return "" if v is None or (isinstance(v, float) and pd.isna(v)) else str(v).strip()
 
-    # Check if status changed to "Move to QC"
-    old_status = str(df.loc[mask, "InternalStatus"].values[0]) if "InternalStatus" in df.columns else ""
-    new_status = changes.get("InternalStatus", old_status)
-    if str(new_status).strip().upper() == "MOVE TO QC" and old_status.strip().upper() != "MOVE TO QC":
-        designer = changes.get("DesignerAssigned", str(df.loc[mask, "DesignerAssigned"].values[0]) if "DesignerAssigned" in df.columns else "")
-        if designer:
-            qc_name, qc_email = assign_qc_reviewer(designer)
-            changes["QCReviewer"] = qc_name
-            changes["QCEmailer"] = qc_email
-
-    for col, val in changes.items():
-        if col in df.columns:
-            col_dtype = df[col].dtype
-            try:
-                if pd.api.types.is_integer_dtype(col_dtype):
-                    val = int(float(val)) if val and str(val).strip() else 0
-                elif pd.api.types.is_float_dtype(col_dtype):
-                    val = float(val) if val and str(val).strip() else 0.0
-            except: val = str(val)
-        df.loc[mask, col] = val
-    df.loc[mask, "UpdatedBy"] = get_current_user()
-    df.loc[mask, "UpdatedAt"] = now
-    write_table(PROJECTS_TABLE, df)
-    clear_cache(PROJECTS_TABLE)
-    qc_msg = ""
-    if "QCReviewer" in changes and changes["QCReviewer"]:
-        qc_msg = f" QC assigned: {changes['QCReviewer']}"
-    return {"status": "success", "message": f"Project updated!{qc_msg}"}
+def update_project(row_id, changes, base=None):
+    """
+    Optimistic edit under the Projects lock (like submit, so a QC assignment
+    sees the last one). base is the row as the edit modal opened
+    it: {"values": {col: str}, "UpdatedAt": ..., "version": <Delta version>}.
+    Only fields the user actually changed are written, merged into the current
+    row, so edits by others to other fields (or other rows) survive. If
+    someone else changed one of the same fields since base, nothing is written.
+    Without base every field in changes is written.
+    A QC assignment's count bump is staged and committed only once the row is.
+    """
+    batch = Batch()
+    r = {"status": "error"}
+    try:
+        with table_lock(PROJECTS_TABLE):
+            r = _update_project(row_id, changes, base, batch)
+        return r
+    finally:
+        if batch.changes and r["status"] != "success":  # assigned, but the row never moved to QC
+            qc_scheduler.release(row_id)
+
+def _update_project(row_id, changes, base, batch):
+    qc = {}
+    for attempt in range(WRITE_RETRIES):
+        df = _get_cached(PROJECTS_TABLE, force=True)
+        if df.empty: return {"status": "error", "message": "No projects"}
+        mask = df["RowID"] == row_id
+        if mask.sum() == 0: return {"status": "error", "message": "Not found"}
+        row = df[mask].iloc[0]
+
+        mine = dict(changes)
+        if base:
+            was = base.get("values", {})
+            mine = {c: v for c, v in changes.items() if _norm(v) != _norm(was.get(c))}
+            # Field by field, not by UpdatedAt — that has one-second resolution
+            clash = [c for c, v in mine.items() if _norm(row.get(c)) not in (_norm(was.get(c)), _norm(v))]
+            if clash:
+                logger.info("Edit conflict on %s (opened at version %s, now %s, UpdatedAt %s → %s): %s",
+                    row_id, base.get("version"), df.attrs.get("delta_version"), base.get("UpdatedAt"),
+                    row.get("UpdatedAt"), clash)
+                return {"status": "error", "message": f"{row.get('UpdatedBy', 'Someone')} changed "
+                    f"{', '.join(clash)} since you opened this project. Reopen it to see their changes."}
+            if not mine and not qc: return {"status": "success", "message": "No changes."}
+
+        # Check if status changed to "Move to QC" (once — assigning bumps ReviewerState)
+        old_status = _norm(row.get("InternalStatus"))
+        new_status = mine.get("InternalStatus", old_status)
+        if not qc and str(new_status).strip().upper() == "MOVE TO QC" and old_status.upper() != "MOVE TO QC":
+            designer = mine.get("DesignerAssigned", _norm(row.get("DesignerAssigned")))
+            if designer:
+                qc_name, qc_email = assign_qc_reviewer(designer, {**row.to_dict(), **mine}, batch)
+                qc = {"QCReviewer": qc_name, "QCEmailer": qc_email}
+        mine.update(qc)
+        if any(_REVISION_FIELD.match(c) for c in mine):  # keep the stored totals (and the cube) right
+            totals = _calc_project_totals({**row.to_dict(), **mine})
+            mine.update({c: totals[c] for c in _TOTAL_FIELDS})
+
+        for col, val in mine.items():
+            if col in df.columns:
+                col_dtype = df[col].dtype
+                try:
+                    if pd.api.types.is_integer_dtype(col_dtype):
+                        val = int(float(val)) if val and str(val).strip() else 0
+                    elif pd.api.types.is_float_dtype(col_dtype):
+                        val = float(val) if val and str(val).strip() else 0.0
+                except: val = str(val)
+            mine[col] = val
+        mine["UpdatedBy"] = get_current_user()
+        mine["UpdatedAt"] = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+        # Compare-and-set on UpdatedAt plus the written fields as just read:
+        # UpdatedAt alone has one-second resolution.
+        expected = {c: None if pd.isna(row[c]) else row[c] for c in ["UpdatedAt", *mine]
+            if c in df.columns and not (isinstance(row[c], float) and pd.isna(row[c]))}
+        # A lost commit only needs the merge re-run (its predicate re-checks
+        # the new version); 0 rows means the row itself moved.
+        try:
+            updated = _retry_conflicts(lambda: update_row(PROJECTS_TABLE, ("RowID", row_id), mine, expected))
+        except ConcurrencyError:
+            updated = 0
+        if updated:
+            clear_cache(PROJECTS_TABLE)
+            try: batch.commit()
+            except BatchError as e:  # the row is saved; a replayable bump finishes on its own
+                log = logger.warning if e.replayable else logger.error
+                log("QC count for %s not saved: %s", row_id, e)
+            finally:
+                for tn in batch.tables: clear_cache(tn)
+            analytics.apply([{**row.to_dict(), **mine}])
+            _record_history("update", row_id, {c: row.get(c) for c in mine}, mine)
+            qc_msg = f" QC assigned: {qc['QCReviewer']}" if qc.get("QCReviewer") else ""
+            return {"status": "success", "message": f"Project updated!{qc_msg}"}
+        _backoff(attempt)  # row or table moved under us — re-read and re-check
+    return {"status": "error", "message": "Project is busy with other edits — please try again."}
 
 def delete_project(row_id):
-    df = _get_cached(PROJECTS_TABLE, force=True)
-    df = df[df["RowID"] != row_id]
-    write_table(PROJECTS_TABLE, df)
-    clear_cache(PROJECTS_TABLE)
+    def delete():
+        df = _get_cached(PROJECTS_TABLE, force=True)
+        write_table(PROJECTS_TABLE, df[df["RowID"] != row_id], df.attrs.get("delta_version"))
+        return df[df["RowID"] == row_id]
+    with table_lock(PROJECTS_TABLE):
+        gone = _retry_conflicts(delete)
+        clear_cache(PROJECTS_TABLE)
+    analytics.remove([row_id])
+    for _, row in gone.iterrows():
+        _record_history("delete", row_id, row.to_dict(), {})
     return {"status": "success", "message": "Deleted!"}
 
+# ── History ───────────────────────────────────────────────────────────
+# ProjectHistory is an append-only change log, one row per changed field:
+#   RowID | Op (insert / update / delete) | Field | OldValue | NewValue | ChangedBy | ChangedAt
+# Every project mutation appends its diff after it commits (Delta append, no
+# lock, no read). Audit queries read only the log files whose RowID stats
+# match; "whole table at T" is Delta time travel with column pruning.
+HISTORY_COLUMNS = ["RowID", "Op", "Field", "OldValue", "NewValue", "ChangedBy", "ChangedAt"]
+_HISTORY_SKIP = {"RowID", "CreatedBy", "CreatedAt", "UpdatedBy", "UpdatedAt"}  # ChangedBy / ChangedAt say it
+
+def _history_ts(ts):
+    """ChangedAt format (UTC, microseconds so changes within a second keep their order)."""
+    if isinstance(ts, datetime):
+        ts = ts.astimezone(timezone.utc) if ts.tzinfo else ts
+        return ts.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return str(ts).replace("T", " ").rstrip("Z")
+
+def _history_rows(op, row_id, old, new):
+    """ProjectHistory entries ({column: value}) for the field-level diff of one mutation."""
+    changed_by, changed_at = get_current_user(), _history_ts(datetime.now(timezone.utc))
+    rows = [[row_id, op, f, _norm(old.get(f)), _norm(new.get(f)), changed_by, changed_at]
+        for f in dict.fromkeys([*old, *new]) if f not in _HISTORY_SKIP and _norm(old.get(f)) != _norm(new.get(f))]
+    if op == "delete" and not rows:
+        rows = [[row_id, op, "", "", "", changed_by, changed_at]]
+    return [dict(zip(HISTORY_COLUMNS, r)) for r in rows]
+
+def _record_history(op, row_id, old, new):
+    """Append the field-level diff of one mutation. Logs instead of failing the write it describes."""
+    rows = _history_rows(op, row_id, old, new)
+    if not rows: return
+    try:
+        append_table(PROJECT_HISTORY_TABLE, pd.DataFrame(rows, columns=HISTORY_COLUMNS))
+    except Exception as e:
+        logger.warning("Could not record %s history for project %s: %s", op, row_id, e)
+
+def get_project_history(row_id):
+    """All recorded changes of one project, oldest first. No RLS — callers check access."""
+    df = read_table(PROJECT_HISTORY_TABLE, filters=[("RowID", "=", row_id)])
+    if df.empty: return pd.DataFrame(columns=HISTORY_COLUMNS)
+    return df.sort_values("ChangedAt", kind="stable").reset_index(drop=True)
+
+def get_project_as_of(row_id, ts):
+    """
+    One project as it was at ts ({field: value}, None if it didn't exist),
+    rolled back from the current row through its later changes — no snapshot read.
+    Fields the log never saw (rows older than ProjectHistory) keep current values.
+    """
+    ts = _history_ts(ts)
+    h = get_project_history(row_id)
+    before, later = h[h["ChangedAt"] <= ts], h[h["ChangedAt"] > ts]
+    if (later["Op"] == "insert").any() or (before["Op"].tail(1) == "delete").any():
+        return None
+    cur = _get_cached(PROJECTS_TABLE, copy=False)
+    cur = cur[cur["RowID"] == row_id] if "RowID" in cur.columns else cur.iloc[0:0]
+    if cur.empty and not (later["Op"] == "delete").any():
+        return None
+    state = {k: _norm(v) for k, v in (cur.iloc[0].items() if not cur.empty else []) if k not in _HISTORY_SKIP}
+    for _, c in later.iloc[::-1].iterrows():
+        if c["Field"]: state[c["Field"]] = c["OldValue"]
+    return {"RowID": row_id, **state}
+
+def get_projects_as_of(ts, columns=None):
+    """
+    The whole Projects table at ts (tz-aware datetime or Delta version) via
+    time travel; columns prunes the read. Reaches back as far as
+    delta_maintenance keeps files (DELTA_VACUUM_RETENTION_HOURS) — per-project
+    history beyond that is in get_project_as_of.
+    """
+    return read_table(PROJECTS_TABLE, columns=columns, as_of=ts)
+
+# ── Analytics ─────────────────────────────────────────────────────────
+# Rework and QC-load aggregates come from analytics_cube, which the write
+# paths above update row by row; reading only catches up with rows other
+# workers changed since the cached frame was last seen.
+def get_project_analytics(force=False):
+    """{dimension: frame of sums + rework %} for Designer, BU, Complexity, Month, QC."""
+    analytics.sync(_get_cached(PROJECTS_TABLE, force, copy=False))
+    return {dim: analytics.view(dim) for dim in ANALYTICS_DIMENSIONS}
+
 # ═══════════════════════════════════════════════════════════════════════
 #  RESOURCE UTILIZATION
 # ═══════════════════════════════════════════════════════════════════════
@@ -397,6 +859,46 @@ def get_all_resources_unfiltered(force_refresh=False):
     """Manager view — returns ALL data regardless of RLS."""
     return _get_cached(RESOURCE_TABLE, force_refresh)
 
+# ── Date index ────────────────────────────────────────────────────────
+# The cached ResourceUtilization frame sorted by Date once per load, next to
+# its "YYYY-MM-DD" keys; a month or a day is then two searchsorted calls
+# instead of a string scan of the whole table. Shared by the calendar, the
+# day modal, the manager view and exports; rebuilt whenever the cached frame
+# is replaced (reload, clear_cache, another process's write).
+_date_index = {}  # table -> (cached frame it was built from, sorted frame, sorted keys)
+_date_index_lock = threading.Lock()
+
+def _dated(tn, force=False):
+    df = _get_cached(tn, force, copy=False)
+    with _date_index_lock:
+        built = _date_index.get(tn)
+        if built is None or built[0] is not df:
+            dates = df["Date"].astype(str).str[:10] if "Date" in df.columns else pd.Series("", index=df.index)
+            keys = dates.to_numpy(dtype="U10")
+            order = np.argsort(keys, kind="stable")
+            built = _date_index[tn] = (df, df.iloc[order], keys[order])
+    return built[1], built[2]
+
+def get_resources_by_date(prefix, unfiltered=False, force_refresh=False, copy=True):
+    """Rows whose Date starts with prefix ("YYYY-MM" or "YYYY-MM-DD"), RLS applied unless unfiltered.
+    copy=False returns a slice of the shared index — read-only callers only."""
+    df, keys = _dated(RESOURCE_TABLE, force_refresh)
+    lo, hi = np.searchsorted(keys, prefix, "left"), np.searchsorted(keys, prefix + "~", "left")
+    df = df.iloc[lo:hi]
+    if copy: df = df.copy()
+    return df if unfiltered else apply_rls(df, "DesignerName")
+
+def filter_resources(df, year, month, designer=None, bu=None):
+    """Manager-view filter: calendar month plus optional designer / BU."""
+    if df.empty: return df
+    if "Date" in df.columns:
+        df = df[df["Date"].astype(str).str.startswith(f"{year}-{int(month):02d}")]
+    if designer and "DesignerName" in df.columns:
+        df = df[df["DesignerName"] == designer]
+    if bu and "BU" in df.columns:
+        df = df[df["BU"] == bu]
+    return df
+
 def submit_resource(form_data):
     # Backend validation — prevent empty/dummy rows
     if not form_data.get("BU") or not form_data.get("DesignerName"):
@@ -420,15 +922,43 @@ def submit_resource(form_data):
 
     form_data = _clean(form_data)
     try:
-        append_row(RESOURCE_TABLE, form_data)
-        clear_cache(RESOURCE_TABLE)
+        with table_lock(RESOURCE_TABLE):
+            append_row(RESOURCE_TABLE, form_data)
+            clear_cache(RESOURCE_TABLE)
         return {"status": "success", "message": "Entry saved!"}
     except Exception as e:
         return {"status": "error", "message": f"Failed: {e}"}
 
 def delete_resource(row_id):
-    df = _get_cached(RESOURCE_TABLE, force=True)
-    df = df[df["RowID"] != row_id]
-    write_table(RESOURCE_TABLE, df)
-    clear_cache(RESOURCE_TABLE)
+    def delete():
+        df = _get_cached(RESOURCE_TABLE, force=True)
+        write_table(RESOURCE_TABLE, df[df["RowID"] != row_id], df.attrs.get("delta_version"))
+    with table_lock(RESOURCE_TABLE):
+        _retry_conflicts(delete)
+        clear_cache(RESOURCE_TABLE)
     return {"status": "success", "message": "Deleted!"}
+
+# ═══════════════════════════════════════════════════════════════════════
+#  EXPORT
+# ═══════════════════════════════════════════════════════════════════════
+
+def get_export_frame(view, year=None, month=None, designer=None, bu=None, text="", facets=None):
+    """
+    Filtered, RLS-applied frame for a download. Reads the cached table without
+    copying it — exports only stream it out, they never modify it.
+    view: "projects" or "resources". Projects are narrowed by the search box
+    text and facets like the table (search_projects). Resources are
+    unfiltered for admins (same as the Manager View) and RLS-filtered for
+    everyone else.
+    """
+    if view == "projects":
+        if text or any((facets or {}).values()):
+            return search_projects(text, facets)[0]
+        return apply_rls(_get_cached(PROJECTS_TABLE, copy=False), "DesignerAssigned")
+    if view != "resources":
+        raise ValueError(f"Unknown export view: {view}")
+    if year and month:
+        df = get_resources_by_date(f"{year}-{int(month):02d}", unfiltered=is_admin(), copy=False)
+        return filter_resources(df, year, month, designer, bu)
+    df = _get_cached(RESOURCE_TABLE, copy=False)
+    return df if is_admin() else apply_rls(df, "DesignerName")
@@ -0,0 +1,140 @@
+"""
+delta_maintenance.py — Compaction, checkpoints and vacuum for the app's Delta tables
+====================================================================================
+Every save in the app is a new Delta commit (most of them full overwrites), so
+_delta_log and the orphaned parquet files grow until each DeltaTable(...) open
+in read_table spends its time replaying log. This keeps them in check:
+
+  1. optimize.compact()   — merge small files into fewer large ones
+                            (z_order for tables queried by key, see ZORDER)
+  2. vacuum()             — delete files no longer referenced (older than retention)
+  3. create_checkpoint()  — readers start from the checkpoint, not commit 0
+  4. cleanup_metadata()   — drop expired commit JSON behind the checkpoint
+
+Usage:
+    python delta_maintenance.py                          # all app tables on OneLake
+    python delta_maintenance.py --stats-only
+    python delta_maintenance.py --root ./local_lakehouse --tables Projects Lookups
+    STORAGE_BACKEND=local python delta_maintenance.py    # tables of the configured backend
+    python delta_maintenance.py --every 86400            # repeat daily
+"""
+
+import os
+import json
+import time
+import logging
+import argparse
+
+from db_connection import DeltaTable, get_backend, LocalDeltaBackend, _storage_headers, _onelake_base, _session
+
+logger = logging.getLogger(__name__)
+
+APP_TABLES = ["Projects", "ResourceUtilization", "Lookups", "ReviewerState", "ProjectHistory"]
+# ProjectHistory gets one small file per mutation and is read by RowID:
+# clustering on it keeps the per-file RowID stats tight, so lookups skip files.
+ZORDER = {"ProjectHistory": ["RowID"]}
+VACUUM_RETENTION_HOURS = int(os.getenv("DELTA_VACUUM_RETENTION_HOURS", "168"))
+
+
+def _open(table_name, backend):
+    return DeltaTable(backend.table_uri(table_name), storage_options=backend.storage_options())
+
+
+def _last_checkpoint_version(table_name, backend):
+    """Version of the latest checkpoint (from _delta_log/_last_checkpoint), or None."""
+    try:
+        if isinstance(backend, LocalDeltaBackend):
+            with open(os.path.join(backend.table_uri(table_name), "_delta_log", "_last_checkpoint")) as f:
+                return json.load(f).get("version")
+        url = f"{_onelake_base()}/Tables/dbo/{table_name}/_delta_log/_last_checkpoint"
+        resp = _session().get(url, headers=_storage_headers(), timeout=15)
+        return resp.json().get("version") if resp.status_code == 200 else None
+    except Exception:
+        return None
+
+
+def table_stats(table_name, backend=None):
+    """File count, log length and open latency for one table."""
+    backend = backend or get_backend()
+    t0 = time.perf_counter()
+    dt = _open(table_name, backend)
+    open_ms = (time.perf_counter() - t0) * 1000
+    version = dt.version()
+    checkpoint = _last_checkpoint_version(table_name, backend)
+    return {
+        "table": table_name,
+        "version": version,
+        "files": len(dt.file_uris()),
+        "log_commits": version + 1,
+        "since_checkpoint": version - checkpoint if checkpoint is not None else version + 1,
+        "open_ms": round(open_ms, 1),
+    }
+
+
+def maintain_table(table_name, backend=None, retention_hours=VACUUM_RETENTION_HOURS, dry_run=False):
+    """Compact, vacuum and checkpoint one table. Returns what was done."""
+    backend = backend or get_backend()
+    dt = _open(table_name, backend)
+    result = {"table": table_name}
+    if dry_run:
+        result["vacuum_candidates"] = len(dt.vacuum(retention_hours=retention_hours, dry_run=True,
+            enforce_retention_duration=retention_hours >= VACUUM_RETENTION_HOURS))
+        return result
+    compact = dt.optimize.z_order(ZORDER[table_name]) if table_name in ZORDER else dt.optimize.compact()
+    result["files_added"] = compact.get("numFilesAdded", 0)
+    result["files_removed"] = compact.get("numFilesRemoved", 0)
+    result["vacuumed"] = len(dt.vacuum(retention_hours=retention_hours, dry_run=False,
+        enforce_retention_duration=retention_hours >= VACUUM_RETENTION_HOURS))
+    dt = _open(table_name, backend)  # checkpoint the latest version (vacuum commits too)
+    dt.create_checkpoint()
+    dt.cleanup_metadata()
+    return result
+
+
+def run(tables=None, backend=None, retention_hours=VACUUM_RETENTION_HOURS, stats_only=False, dry_run=False):
+    """Report stats, maintain each table, report again. One failing table doesn't stop the rest."""
+    backend = backend or get_backend()
+    report = []
+    for tn in tables or APP_TABLES:
+        try:
+            before = table_stats(tn, backend)
+            if stats_only:
+                report.append({"before": before})
+                continue
+            done = maintain_table(tn, backend, retention_hours, dry_run)
+            report.append({"before": before, "done": done, "after": table_stats(tn, backend)})
+        except Exception as e:
+            logger.warning("Maintenance failed for %s: %s", tn, e)
+            report.append({"before": {"table": tn}, "error": str(e)})
+    return report
+
+
+def _print_report(report):
+    cols = ["table", "version", "files", "log_commits", "since_checkpoint", "open_ms"]
+    print("".join(f"{c:>18}" for c in ["stage"] + cols))
+    for entry in report:
+        for stage in ("before", "after"):
+            if stage in entry:
+                print("".join(f"{str(v):>18}" for v in [stage] + [entry[stage].get(c, "") for c in cols]))
+        if "done" in entry:
+            print(f"{'':>18}{json.dumps(entry['done'])}")
+        if "error" in entry:
+            print(f"{'':>18}ERROR: {entry['error']}")
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--tables", nargs="+", default=APP_TABLES)
+    ap.add_argument("--root", help="local Delta directory instead of the configured backend")
+    ap.add_argument("--retention-hours", type=int, default=VACUUM_RETENTION_HOURS)
+    ap.add_argument("--stats-only", action="store_true")
+    ap.add_argument("--dry-run", action="store_true", help="only count files vacuum would delete")
+    ap.add_argument("--every", type=int, default=0, help="repeat every N seconds")
+    args = ap.parse_args()
+    target = LocalDeltaBackend(args.root) if args.root else get_backend()
+    while True:
+        _print_report(run(args.tables, target, args.retention_hours, args.stats_only, args.dry_run))
+        if not args.every:
+            break
+        time.sleep(args.every)
@@ -0,0 +1,107 @@
+"""
+exports.py — Streaming CSV / Parquet export
+============================================
+Converts a DataFrame to Arrow record batches one chunk at a time and yields
+the encoded bytes as they are produced, so a download never holds a second
+full copy of the table (or one giant CSV string) in memory.
+"""
+
+import io
+import os
+
+import pandas as pd
+import pyarrow as pa
+
+EXPORT_CHUNK_ROWS = int(os.getenv("EXPORT_CHUNK_ROWS", "5000"))
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "parquet": "application/vnd.apache.parquet",
+}
+
+
+class _ChunkSink:
+    """Write-only file object; drain() hands back the bytes written since the last drain."""
+
+    def __init__(self):
+        self._buf = io.BytesIO()
+        self._pos = 0
+        self.closed = False
+
+    def write(self, data):
+        self._buf.write(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def flush(self):
+        pass
+
+    def writable(self):
+        return True
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = self._buf.getvalue()
+        self._buf.seek(0)
+        self._buf.truncate()
+        return data
+
+
+def _string_columns(df):
+    """Columns that must be exported as text (lakehouse tables mix "" and numbers in one column)."""
+    return [c for c in df.columns
+            if not (pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_bool_dtype(df[c])
+                    or pd.api.types.is_datetime64_any_dtype(df[c]))]
+
+
+def _record_batches(df, chunk_rows=None):
+    """Yield one Arrow record batch per chunk of rows, converting only that chunk."""
+    chunk_rows = chunk_rows or EXPORT_CHUNK_ROWS
+    str_cols = _string_columns(df)
+    for start in range(0, max(len(df), 1), chunk_rows):
+        chunk = df.iloc[start:start + chunk_rows]
+        if str_cols:
+            chunk = chunk.astype({c: "string" for c in str_cols})
+        yield pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+
+
+def stream_csv(df, chunk_rows=None):
+    """Yield CSV bytes (header first) chunk by chunk."""
+    import pyarrow.csv as pacsv
+    sink = _ChunkSink()
+    writer = None
+    for batch in _record_batches(df, chunk_rows):
+        if writer is None:
+            writer = pacsv.CSVWriter(sink, batch.schema)
+        writer.write_batch(batch)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+def stream_parquet(df, chunk_rows=None):
+    """Yield Parquet bytes with one row group per chunk; the footer comes last."""
+    import pyarrow.parquet as pq
+    sink = _ChunkSink()
+    writer = None
+    for batch in _record_batches(df, chunk_rows):
+        if writer is None:
+            writer = pq.ParquetWriter(sink, batch.schema)
+        writer.write_batch(batch)
+        yield sink.drain()
+    if writer is not None:
+        writer.close()
+    tail = sink.drain()
+    if tail:
+        yield tail
+
+
+EXPORT_WRITERS = {"csv": stream_csv, "parquet": stream_parquet}
@@ -1,2 +1,59 @@
+import os
+
 timeout = 300
-workers = 2
+
+# Threaded workers: callbacks spend most of their time waiting on OneLake,
+# the token endpoint or adquery, so one slow write no longer blocks a whole
+# worker. Shared state is thread-safe (cache single-flight, per-table write
+# locks in db_operations.table_lock, token / name / auth caches under locks).
+# gevent is not an option: deltalake's reads and writes run in Rust and
+# would block the event loop.
+#
+# benchmarks/load_test.py --users 10 --duration 20, 1k-row local tables with
+# 300 ms added to every Delta read (OneLake round trip), 1 CPU:
+#   sync    2 workers              81 requests  p50 402 ms
+#   gthread 2 workers x 4 threads  84 requests  p50 511 ms
+#   gthread 2 workers x 8 threads  98 requests  p50 388 ms
+# CPU-bound renders (Project Summary) still share the GIL, so raise workers
+# rather than threads where there are spare cores.
+workers = int(os.getenv("GUNICORN_WORKERS", "2"))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+threads = int(os.getenv("GUNICORN_THREADS", "8"))
+
+# The app (dash, pandas, pyarrow, deltalake, plotly — ~1.7 s of imports) is
+# loaded once in the master and workers fork from it: a new or recycled worker
+# is up in milliseconds and shares the imported code and data copy-on-write.
+# Nothing storage- or thread-related starts before the fork (see post_fork).
+# Code changes need a full restart (HUP re-forks the already loaded app).
+# benchmarks/startup_bench.py measures boot, recycle and per-worker memory.
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+# Recycling is cheap with preload_app; 0 = never (gunicorn default)
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+
+
+def on_starting(server):
+    # Metric snapshots from a previous run would be summed into /metrics
+    import metrics
+    metrics.reset_dir()
+
+
+def when_ready(server):
+    # Master, app loaded, no worker forked yet
+    if server.cfg.preload_app:
+        import app
+        app.preload()
+
+
+def post_fork(server, worker):
+    # Fetch the storage token and warm the table cache in the background
+    # so neither is ever paid for inside a user request
+    from db_connection import start_token_refresher
+    from db_operations import start_cache_refresher
+    import metrics
+    import app
+    start_token_refresher()
+    start_cache_refresher()
+    metrics.start_flusher()
+    # Job workers warm up the same way, before the first background callback
+    app.start_job_workers()
@@ -0,0 +1,199 @@
+"""
+metrics.py — Hot-path timings and counters in Prometheus text format
+====================================================================
+Instrumented: storage reads / writes (time, bytes, Delta version), token
+fetches, adquery calls, _get_cached hit / stale / miss, and every Dash
+callback request (time + response bytes, so JSON serialization is included).
+
+Each gunicorn worker and job worker (background callbacks, where the writes
+run) keeps its own numbers in memory and snapshots them to
+METRICS_DIR/metrics-<pid>.json every few seconds, a job worker also after
+each job; /metrics — whichever worker answers it — merges all snapshots so
+counters and histograms are totals across workers. Gauges (e.g. Delta
+version) take the max over workers.
+"""
+
+import os
+import json
+import time
+import tempfile
+import threading
+import logging
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+METRICS_DIR = os.getenv("METRICS_DIR", os.path.join(tempfile.gettempdir(), "mcut-metrics"))
+METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", "5"))
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+HELP = {
+    "storage_read_seconds": ("histogram", "Table read time by table and format"),
+    "storage_write_seconds": ("histogram", "Table write time by table and format"),
+    "storage_read_bytes_total": ("counter", "Bytes read per table (Delta file sizes / parquet payload)"),
+    "storage_write_bytes_total": ("counter", "Bytes written per table (Arrow size / parquet payload)"),
+    "storage_errors_total": ("counter", "Failed storage operations"),
+    "storage_conflicts_total": ("counter", "Conditional writes / row updates that lost to a concurrent commit"),
+    "storage_batch_seconds": ("histogram", "Batch commit time (all its tables, committed in parallel)"),
+    "storage_batches_total": ("counter", "Batches by result (committed / replayed / failed)"),
+    "delta_table_version": ("gauge", "Latest Delta version seen per table"),
+    "token_fetch_seconds": ("histogram", "Azure AD token endpoint time"),
+    "adquery_seconds": ("histogram", "adquery subprocess time by lookup kind"),
+    "cache_requests_total": ("counter", "_get_cached lookups by table and result (hit / stale / miss / forced)"),
+    "report_cache_requests_total": ("counter", "Manager report requests answered from the memo (hit) or by a job (miss)"),
+    "dash_callback_seconds": ("histogram", "Dash callback request time incl. serialization"),
+    "dash_callback_response_bytes_total": ("counter", "Dash callback response payload bytes"),
+    "dash_callback_errors_total": ("counter", "Dash callback requests answered with status >= 500"),
+}
+
+_lock = threading.Lock()
+_counters = {}     # (name, labels) -> value
+_gauges = {}       # (name, labels) -> value
+_histograms = {}   # (name, labels) -> [per-bucket counts..., +Inf count, sum]
+_flusher_pid = None
+
+
+def _key(name, labels):
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def inc(name, value=1, **labels):
+    k = _key(name, labels)
+    with _lock:
+        _counters[k] = _counters.get(k, 0) + value
+
+
+def set_gauge(name, value, **labels):
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def observe(name, seconds, **labels):
+    k = _key(name, labels)
+    with _lock:
+        h = _histograms.get(k)
+        if h is None:
+            h = _histograms[k] = [0] * (len(BUCKETS) + 2)
+        for i, b in enumerate(BUCKETS):
+            if seconds <= b:
+                h[i] += 1
+        h[-2] += 1
+        h[-1] += seconds
+
+
+@contextmanager
+def timed(name, **labels):
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(name, time.perf_counter() - t0, **labels)
+
+
+# ── Cross-worker aggregation ──────────────────────────────────────────
+def _snapshot():
+    with _lock:
+        return {
+            "counters": [[n, list(l), v] for (n, l), v in _counters.items()],
+            "gauges": [[n, list(l), v] for (n, l), v in _gauges.items()],
+            "histograms": [[n, list(l), h] for (n, l), h in _histograms.items()],
+        }
+
+
+def flush():
+    """Write this process's snapshot atomically."""
+    try:
+        os.makedirs(METRICS_DIR, exist_ok=True)
+        path = os.path.join(METRICS_DIR, f"metrics-{os.getpid()}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump(_snapshot(), f, default=float)  # numpy scalars
+        os.replace(tmp, path)
+    except Exception as e:
+        logger.warning("Metrics flush failed: %s", e)
+
+
+def _flush_loop():
+    while True:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        flush()
+
+
+def start_flusher():
+    """Start the snapshot thread once per process (gunicorn post_fork, job workers)."""
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name="metrics-flusher", daemon=True).start()
+
+
+def reset_dir():
+    """Drop snapshots from a previous run (gunicorn on_starting)."""
+    if not os.path.isdir(METRICS_DIR):
+        return
+    for name in os.listdir(METRICS_DIR):
+        if name.startswith("metrics-"):
+            try:
+                os.remove(os.path.join(METRICS_DIR, name))
+            except OSError:
+                pass
+
+
+def _merged():
+    flush()
+    counters, gauges, hists = {}, {}, {}
+    for name in os.listdir(METRICS_DIR):
+        if not (name.startswith("metrics-") and name.endswith(".json")):
+            continue
+        try:
+            with open(os.path.join(METRICS_DIR, name)) as f:
+                snap = json.load(f)
+        except (OSError, ValueError):
+            continue
+        for n, l, v in snap["counters"]:
+            k = (n, tuple(map(tuple, l)))
+            counters[k] = counters.get(k, 0) + v
+        for n, l, v in snap["gauges"]:
+            k = (n, tuple(map(tuple, l)))
+            gauges[k] = max(gauges.get(k, v), v)
+        for n, l, h in snap["histograms"]:
+            k = (n, tuple(map(tuple, l)))
+            hists[k] = [a + b for a, b in zip(hists[k], h)] if k in hists else list(h)
+    return counters, gauges, hists
+
+
+def _labels(labels, extra=()):
+    items = list(labels) + list(extra)
+    if not items:
+        return ""
+    esc = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+
+
+def render():
+    """All workers' metrics in Prometheus text exposition format."""
+    counters, gauges, hists = _merged()
+    lines, seen = [], set()
+
+    def header(name):
+        if name not in seen:
+            seen.add(name)
+            kind, text = HELP.get(name, ("untyped", name))
+            lines.append(f"# HELP {name} {text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+    for (n, l), v in sorted(counters.items()):
+        header(n)
+        lines.append(f"{n}{_labels(l)} {v}")
+    for (n, l), v in sorted(gauges.items()):
+        header(n)
+        lines.append(f"{n}{_labels(l)} {v}")
+    for (n, l), h in sorted(hists.items()):
+        header(n)
+        for b, c in zip(BUCKETS, h):
+            lines.append(f"{n}_bucket{_labels(l, [('le', b)])} {c}")
+        lines.append(f"{n}_bucket{_labels(l, [('le', '+Inf')])} {h[-2]}")
+        lines.append(f"{n}_sum{_labels(l)} {h[-1]}")
+        lines.append(f"{n}_count{_labels(l)} {h[-2]}")
+    return "\n".join(lines) + "\n"
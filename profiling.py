@@ -0,0 +1,157 @@
+"""
+profiling.py — Opt-in per-callback profiles
+===========================================
+Profiles single Dash callback requests and keeps one file per request under
+PROFILE_DIR, named <epoch-ms>_<callback>_<duration-ms>.<ext>:
+
+  PROFILE_MODE=cprofile (default) → .prof   (pstats; snakeviz / python -m pstats)
+  PROFILE_MODE=sample             → .folded (collapsed stacks; speedscope.app,
+                                             flamegraph.pl) — low overhead, line-level
+
+Enabled for every callback with PROFILE_CALLBACKS=1, or per browser by an
+admin opening any page with ?profile=1 (cookie, off again with ?profile=0).
+Only one request per process is profiled at a time; the rest run normally.
+"""
+
+import os
+import sys
+import time
+import pstats
+import cProfile
+import tempfile
+import threading
+from collections import Counter
+
+PROFILE_CALLBACKS = os.getenv("PROFILE_CALLBACKS", "").lower() in ("1", "true", "yes")
+PROFILE_MODE = os.getenv("PROFILE_MODE", "cprofile").lower()
+PROFILE_DIR = os.getenv("PROFILE_DIR", os.path.join(tempfile.gettempdir(), "mcut-profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "200"))
+PROFILE_SAMPLE_INTERVAL = float(os.getenv("PROFILE_SAMPLE_INTERVAL", "0.005"))
+PROFILE_COOKIE = "mcut_profile"
+
+_busy = threading.Lock()
+
+
+class _Sampler(threading.Thread):
+    """Samples one thread's stack every interval into folded-stack counts."""
+
+    def __init__(self, target, interval):
+        super().__init__(name="profile-sampler", daemon=True)
+        self.target, self.interval = target, interval
+        self.stacks = Counter()
+        self._stop_evt = threading.Event()
+
+    def run(self):
+        while not self._stop_evt.wait(self.interval):
+            frame = sys._current_frames().get(self.target)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.stacks[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_evt.set()
+        self.join()
+
+
+class Profile:
+    """One profiled request: start() in before_request, finish() in after_request."""
+
+    def __init__(self, mode=None):
+        self.mode = mode or PROFILE_MODE
+        self._impl = None
+
+    def start(self):
+        if not _busy.acquire(blocking=False):
+            return False
+        try:
+            if self.mode == "sample":
+                self._impl = _Sampler(threading.get_ident(), PROFILE_SAMPLE_INTERVAL)
+                self._impl.start()
+            else:
+                self._impl = cProfile.Profile()
+                self._impl.enable()
+        except Exception:
+            _busy.release()
+            raise
+        self.started = time.perf_counter()
+        return True
+
+    def finish(self, callback):
+        """Stop profiling and save. Returns the file path."""
+        try:
+            if self.mode == "sample":
+                self._impl.stop()
+            else:
+                self._impl.disable()
+            ms = int((time.perf_counter() - self.started) * 1000)
+        finally:
+            _busy.release()
+        os.makedirs(PROFILE_DIR, exist_ok=True)
+        safe = "".join(c if c.isalnum() or c in "-_" else "-" for c in callback)
+        stem = os.path.join(PROFILE_DIR, f"{int(time.time() * 1000)}_{safe}_{ms}")
+        if self.mode == "sample":
+            path = f"{stem}.folded"
+            with open(path, "w") as f:
+                f.writelines(f"{s} {n}\n" for s, n in self._impl.stacks.items())
+        else:
+            path = f"{stem}.prof"
+            self._impl.dump_stats(path)
+        _prune()
+        return path
+
+
+def _parse(name):
+    stem, ext = os.path.splitext(name)
+    try:
+        ts, rest = stem.split("_", 1)
+        callback, ms = rest.rsplit("_", 1)
+        return {"file": name, "ts": int(ts) / 1000, "callback": callback, "ms": int(ms), "kind": ext[1:]}
+    except ValueError:
+        return None
+
+
+def list_profiles():
+    """Saved profiles, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    found = [p for p in map(_parse, os.listdir(PROFILE_DIR)) if p]
+    return sorted(found, key=lambda p: p["ts"], reverse=True)
+
+
+def slowest(n=50):
+    """The n slowest of the PROFILE_KEEP most recent profiles."""
+    return sorted(list_profiles(), key=lambda p: p["ms"], reverse=True)[:n]
+
+
+def _prune():
+    for p in list_profiles()[PROFILE_KEEP:]:
+        try:
+            os.remove(os.path.join(PROFILE_DIR, p["file"]))
+        except OSError:
+            pass
+
+
+def profile_path(name):
+    """Absolute path of a saved profile, or None for anything that isn't one."""
+    if _parse(os.path.basename(name)) is None or os.path.basename(name) != name:
+        return None
+    path = os.path.join(PROFILE_DIR, name)
+    return path if os.path.isfile(path) else None
+
+
+def summary(path, limit=40):
+    """Text report: top functions by cumulative time (.prof) or hottest stacks (.folded)."""
+    import io
+    if path.endswith(".folded"):
+        with open(path) as f:
+            rows = [line.rsplit(" ", 1) for line in f if line.strip()]
+        total = sum(int(n) for _, n in rows) or 1
+        rows.sort(key=lambda r: int(r[1]), reverse=True)
+        return "\n".join(f"{int(n) / total:6.1%}  {s.split(';')[-1]}\n        {s}" for s, n in rows[:limit])
+    out = io.StringIO()
+    pstats.Stats(path, stream=out).sort_stats("cumulative").print_stats(limit)
+    return out.getvalue()
@@ -0,0 +1,142 @@
+"""
+qc_scheduler.py — Workload-aware QC reviewer assignment
+=======================================================
+Each reviewer carries a live load score: the sum of the weights of the
+projects currently sitting with them in QC (InternalStatus "Move to QC"),
+
+  weight = COMPLEXITY_WEIGHTS[Complexity] × (1 + PageSlide / QC_PAGES_PER_UNIT)
+
+Reviewers sit in a min-heap keyed (load, lifetime Count, name), so the next
+reviewer is a pop — O(log n) — skipping the designer and anyone on leave.
+Entries are never updated in place: a load change pushes a fresh entry and the
+old one is dropped when it surfaces (lazy deletion).
+
+Loads are kept incrementally, per RowID:
+  assign()  — adds the project's weight to the chosen reviewer at once
+  release() — takes it back if the project's save failed
+  sync(df)  — a new cached Projects frame: only open QC rows whose UpdatedAt
+              changed, or that left QC / the table, move; the rest are skipped.
+"""
+
+import heapq
+import os
+import threading
+
+import pandas as pd
+
+COMPLEXITY_WEIGHTS = {"SIMPLE": 1.0, "MEDIUM": 2.0, "COMPLEX": 3.0}
+QC_PAGES_PER_UNIT = float(os.getenv("QC_PAGES_PER_UNIT", "10"))
+OPEN_STATUS = "MOVE TO QC"
+
+
+def weights(df):
+    """Load weight per row from Complexity and PageSlide."""
+    comp = df["Complexity"].fillna("").astype(str).str.strip().str.upper() if "Complexity" in df.columns \
+        else pd.Series("", index=df.index)
+    pages = pd.to_numeric(df["PageSlide"], errors="coerce").fillna(0).clip(lower=0) if "PageSlide" in df.columns else 0
+    return comp.map(COMPLEXITY_WEIGHTS).fillna(1.0) * (1 + pages / QC_PAGES_PER_UNIT)
+
+
+def _upper(v):
+    return str(v or "").strip().upper()
+
+
+class QCScheduler:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._items = {}    # RowID -> (UpdatedAt, reviewer, weight) for projects open in QC
+        self._load = {}     # reviewer -> sum of open weights
+        self._counts = {}   # reviewer -> lifetime Count (ReviewerState); also the reviewer pool
+        self._heap = []     # (load, count, reviewer), possibly stale
+        self._frame = None
+
+    # ── Heap ──
+    def _push(self, reviewer):
+        if reviewer in self._counts:
+            heapq.heappush(self._heap, (self._load.get(reviewer, 0.0), self._counts[reviewer], reviewer))
+        if len(self._heap) > 4 * len(self._counts) + 64:  # too many stale entries — compact
+            self._heap = [(self._load.get(r, 0.0), c, r) for r, c in self._counts.items()]
+            heapq.heapify(self._heap)
+
+    def _current(self, entry):
+        load, count, reviewer = entry
+        return self._counts.get(reviewer) == count and self._load.get(reviewer, 0.0) == load
+
+    def _move(self, row_id, item):
+        """Set (or clear, item=None) one project's contribution — lock held."""
+        old = self._items.pop(row_id, None)
+        if old:
+            self._load[old[1]] = self._load.get(old[1], 0.0) - old[2]
+            self._push(old[1])
+        if item:
+            self._items[row_id] = item
+            self._load[item[1]] = self._load.get(item[1], 0.0) + item[2]
+            self._push(item[1])
+
+    # ── State ──
+    def set_counts(self, counts):
+        """Reviewer pool and lifetime counts ({name: Count}, from ReviewerState)."""
+        with self._lock:
+            changed = [r for r in counts.keys() | self._counts.keys() if counts.get(r) != self._counts.get(r)]
+            self._counts = dict(counts)
+            for r in changed:
+                self._push(r)
+
+    def sync(self, df):
+        """Catch up with a (new) cached Projects frame."""
+        with self._lock:
+            if df is self._frame:
+                return
+            if {"RowID", "InternalStatus", "QCReviewer"} <= set(df.columns):
+                open_ = df[df["InternalStatus"].fillna("").astype(str).str.strip().str.upper() == OPEN_STATUS]
+            else:
+                open_ = df.iloc[:0]
+            ids = open_["RowID"].astype(str).tolist() if len(open_) else []
+            stamps = open_["UpdatedAt"].astype(str).tolist() if "UpdatedAt" in open_.columns else [""] * len(ids)
+            for rid in self._items.keys() - set(ids):
+                self._move(rid, None)
+            changed = [i for i, (rid, ts) in enumerate(zip(ids, stamps)) if self._items.get(rid, (None,))[0] != ts]
+            if changed:
+                part = open_.iloc[changed]
+                names = part["QCReviewer"].fillna("").astype(str).str.strip().tolist()
+                for i, name, w in zip(changed, names, weights(part).tolist()):
+                    self._move(ids[i], (stamps[i], name, w) if name else None)
+            self._frame = df
+
+    # ── Assignment ──
+    def assign(self, project, exclude=()):
+        """
+        Least-loaded reviewer not in exclude (upper-cased names) for project
+        (a dict with RowID / Complexity / PageSlide), whose weight is charged
+        to them right away. None if nobody is eligible.
+        """
+        exclude = {_upper(x) for x in exclude}
+        with self._lock:
+            chosen, seen = None, []
+            while self._heap:
+                entry = heapq.heappop(self._heap)
+                if not self._current(entry):
+                    continue
+                seen.append(entry)
+                if _upper(entry[2]) not in exclude:
+                    chosen = entry[2]
+                    break
+            for entry in seen:
+                heapq.heappush(self._heap, entry)
+            if chosen is not None and project.get("RowID"):
+                w = float(weights(pd.DataFrame([project])).iloc[0])
+                self._move(str(project.get("RowID", "")), (str(project.get("UpdatedAt", "")), chosen, w))
+            return chosen
+
+    def release(self, row_id):
+        """Drop the charge assign() made for a project that was not saved after all."""
+        with self._lock:
+            self._move(str(row_id), None)
+
+    def loads(self):
+        """{reviewer: open QC load} for the pool."""
+        with self._lock:
+            return {r: round(self._load.get(r, 0.0), 2) for r in sorted(self._counts)}
+
+
+scheduler = QCScheduler()
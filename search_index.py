@@ -0,0 +1,129 @@
+"""
+search_index.py — In-memory full-text and faceted search over Projects
+======================================================================
+Built from the cached Projects frame, one index shared by every request:
+
+  text   — ProjectName, ProjectID, VeevaID, Comments lower-cased and split
+           into word tokens. Postings are stored CSR-style in sorted token
+           order, so every token that starts with a query word is one
+           contiguous slice (prefix search as you type).
+  facets — BU, InternalStatus, DesignerAssigned, QCReviewer, Complexity:
+           one boolean mask per value; filters AND across fields, OR within.
+
+Documents are row positions in the indexed frame. A new cached frame (data
+version change) rebuilds the index, re-tokenizing only rows whose
+RowID / UpdatedAt changed; assembling the arrays is vectorized.
+"""
+
+import re
+import threading
+
+import numpy as np
+import pandas as pd
+
+TEXT_FIELDS = ["ProjectName", "ProjectID", "VeevaID", "Comments"]
+FACET_FIELDS = ["BU", "InternalStatus", "DesignerAssigned", "QCReviewer", "Complexity"]
+_TOKEN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return _TOKEN.findall(str(text).lower())
+
+
+class ProjectIndex:
+    """Immutable index over one frame. search() is safe from any thread."""
+
+    def __init__(self, df, previous=None):
+        self.frame = df
+        self.size = len(df)
+        self._tokens = self._tokenize(df, previous._tokens if previous else {})
+        self._build_text()
+        self._build_facets()
+
+    @staticmethod
+    def _tokenize(df, cache):
+        """RowID -> (UpdatedAt, unique tokens); rows unchanged since the previous index are reused."""
+        ids = df["RowID"].astype(str).tolist() if "RowID" in df.columns else [str(i) for i in range(len(df))]
+        stamps = df["UpdatedAt"].astype(str).tolist() if "UpdatedAt" in df.columns else [""] * len(df)
+        stale = [i for i, (rid, ts) in enumerate(zip(ids, stamps)) if cache.get(rid, (None,))[0] != ts]
+        tokens = {rid: cache[rid] for rid, ts in zip(ids, stamps) if rid in cache and cache[rid][0] == ts}
+        for i in stale:
+            tokens[ids[i]] = (stamps[i], [])
+        cols = [c for c in TEXT_FIELDS if c in df.columns]
+        if stale and cols:
+            part = df.iloc[stale]
+            text = part[cols[0]].fillna("").astype(str)
+            for c in cols[1:]:
+                text = text + " " + part[c].fillna("").astype(str)
+            for i, toks in zip(stale, text.str.lower().str.findall(_TOKEN)):
+                tokens[ids[i]] = (stamps[i], sorted(set(toks)))
+        return tokens
+
+    def _build_text(self):
+        ids = self.frame["RowID"].astype(str).tolist() if "RowID" in self.frame.columns else [str(i) for i in range(self.size)]
+        per_doc = [self._tokens[rid][1] for rid in ids]
+        lengths = np.fromiter((len(t) for t in per_doc), dtype=np.int64, count=self.size)
+        docs = np.repeat(np.arange(self.size, dtype=np.int32), lengths)
+        codes, vocab = pd.factorize(pd.Series([t for toks in per_doc for t in toks], dtype=object), sort=True)
+        order = np.argsort(codes, kind="stable")
+        self.vocab = np.asarray(vocab, dtype=str)
+        self.postings = docs[order]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(codes, minlength=len(vocab)))])
+
+    def _build_facets(self):
+        self.facets = {}
+        for field in FACET_FIELDS:
+            if field not in self.frame.columns:
+                continue
+            codes, values = pd.factorize(self.frame[field].fillna("").astype(str).str.strip())
+            self.facets[field] = {v: codes == i for i, v in enumerate(values) if v}
+
+    def _prefix(self, word):
+        """Docs containing any token that starts with word."""
+        lo, hi = np.searchsorted(self.vocab, word), np.searchsorted(self.vocab, word + "\U0010ffff")
+        mask = np.zeros(self.size, dtype=bool)
+        mask[self.postings[self.offsets[lo]:self.offsets[hi]]] = True
+        return mask
+
+    def mask_for(self, field, match):
+        """OR of the facet masks whose value satisfies match(value) (e.g. the RLS name check)."""
+        mask = np.zeros(self.size, dtype=bool)
+        for value, m in self.facets.get(field, {}).items():
+            if match(value):
+                mask |= m
+        return mask
+
+    def search(self, text="", facets=None, allowed=None):
+        """
+        Row positions matching every word of text (prefix) and every facet
+        filter ({field: [values]}), within the allowed mask. Also returns
+        {field: {value: count}} for the facet controls; each field's counts
+        ignore that field's own filter, so picking one BU still shows the others.
+        """
+        base = np.ones(self.size, dtype=bool) if allowed is None else allowed.copy()
+        for word in tokenize(text or ""):
+            base &= self._prefix(word)
+        chosen = {f: self.mask_for(f, set(v).__contains__) for f, v in (facets or {}).items() if v and f in self.facets}
+        mask = base.copy()
+        for m in chosen.values():
+            mask &= m
+        counts = {}
+        for field, masks in self.facets.items():
+            scope = base.copy()
+            for other, m in chosen.items():
+                if other != field: scope &= m
+            counts[field] = {v: int(np.count_nonzero(m & scope)) for v, m in masks.items()}
+        return np.flatnonzero(mask), counts
+
+
+_index = None
+_lock = threading.Lock()
+
+
+def index_for(df):
+    """The index of this frame — rebuilt (incrementally) when the cached frame is replaced."""
+    global _index
+    with _lock:
+        if _index is None or _index.frame is not df:
+            _index = ProjectIndex(df, _index)
+        return _index